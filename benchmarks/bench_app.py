@@ -0,0 +1,142 @@
+"""
+End-to-end benchmark of the web app with no network access or API quota.
+
+Drives create_app() in-process over ASGI while every external service is
+replaced by a local stand-in (see benchmarks/stubs.py): a FunctionModel
+agent, a fake DDGS client and a stub Tableau REST server. Hyper files are
+built by the real local Hyper process. Reports p50/p95/p99 per endpoint and
+per pipeline stage, job throughput and peak RSS, and compares them with the
+stored baseline.
+
+Usage:
+    python -m benchmarks.bench_app [--topics 200] [--concurrency 20]
+        [--llm-latency 0.5] [--search-latency 0.2] [--tableau-latency 0.05]
+        [--job-seconds 1] [--env KEY=VALUE ...] [--save-baseline]
+"""
+from typing import Dict, List
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks import stubs
+from benchmarks.harness import latency_metrics, peak_rss_mb, report
+
+
+async def run_client(
+    client: httpx.AsyncClient,
+    topics: "asyncio.Queue[str]",
+    samples: Dict[str, List[float]],
+    poll_interval: float
+) -> None:
+    while not topics.empty():
+        topic = topics.get_nowait()
+        started = time.perf_counter()
+        response = await client.post("/api/analyze", json={"topic": topic})
+        samples["POST /api/analyze"].append(time.perf_counter() - started)
+        response.raise_for_status()
+        job_id = response.json()["details"]["job_id"]
+
+        while True:
+            await asyncio.sleep(poll_interval)
+            request_started = time.perf_counter()
+            job = (await client.get(f"/api/jobs/{job_id}")).json()
+            samples["GET /api/jobs/{id}"].append(time.perf_counter() - request_started)
+            if job["status"] in ("succeeded", "failed"):
+                break
+        samples["job"].append(time.perf_counter() - started)
+        if job["status"] == "failed":
+            samples["failed"].append(1.0)
+
+
+async def run(args: argparse.Namespace, stub: stubs.StubTableau) -> Dict[str, float]:
+    # configure the app for the stub before anything reads the environment
+    os.environ.update({
+        "TABLEAU_SERVER_URL": stub.url,
+        "TABLEAU_SITE_NAME": "stub",
+        "TABLEAU_TOKEN_NAME": "benchmark",
+        "TABLEAU_TOKEN_VALUE": "benchmark",
+        "TABLEAU_DATASOURCE_NAME": "Top10 Rankings",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "offline-benchmark"),
+        "RANKING_CACHE_TTL": "0",
+        "RANKING_HISTORY_PATH": os.path.join(tempfile.mkdtemp(), "rankings.sqlite"),
+        "LOG_LEVEL": "WARNING",
+    })
+    os.environ.update(dict(item.split("=", 1) for item in args.env))
+
+    from src.agent import search
+    from src.agent.ranking_agent import ranking_agent
+    from src.core.telemetry import STAGE_SECONDS
+    from src.web.app import create_app
+
+    stubs.FakeDDGS.latency = args.search_latency
+    search.DDGS = stubs.FakeDDGS
+
+    # every span, including those of micro-batches that run outside any request
+    stages: Dict[str, List[float]] = {}
+    observe = STAGE_SECONDS.observe
+
+    def record_stage(value: float, **labels: str) -> None:
+        stages.setdefault(labels["stage"], []).append(value)
+        observe(value, **labels)
+
+    STAGE_SECONDS.observe = record_stage
+
+    app = create_app()
+    topics: "asyncio.Queue[str]" = asyncio.Queue()
+    for index in range(args.topics):
+        topics.put_nowait(f"Benchmark topic {index}")
+    samples: Dict[str, List[float]] = {"POST /api/analyze": [], "GET /api/jobs/{id}": [], "job": [], "failed": []}
+
+    with ranking_agent.override(model=stubs.ranking_model(args.llm_latency)):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                started = time.perf_counter()
+                await asyncio.gather(*(
+                    run_client(client, topics, samples, args.poll_interval)
+                    for _ in range(args.concurrency)
+                ))
+                elapsed = time.perf_counter() - started
+
+    failed = len(samples.pop("failed"))
+    job = samples.pop("job")
+    metrics = {
+        "throughput/jobs_per_s": round((len(job) - failed) / elapsed, 2),
+        "jobs/failed": failed,
+    }
+    metrics.update(latency_metrics("endpoint", samples))
+    metrics.update(latency_metrics("job", {"end_to_end": job}))
+    metrics.update(latency_metrics("stage", stages))
+    metrics["memory/peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topics", type=int, default=200, help="Analyses to run")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent clients")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per model request")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="Seconds per search call")
+    parser.add_argument("--tableau-latency", type=float, default=0.05, help="Seconds per Tableau request")
+    parser.add_argument("--job-seconds", type=float, default=1.0, help="Seconds a Tableau update job takes")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Seconds between job status polls")
+    parser.add_argument("--env", nargs="*", default=[], help="Extra app settings, e.g. JOB_WORKERS=8")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    with stubs.StubTableau(latency=args.tableau_latency, job_seconds=args.job_seconds) as stub:
+        metrics = asyncio.run(run(args, stub))
+        metrics["tableau/requests"] = sum(stub.counts().values())
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "tolerance")}
+    return report("app", metrics, config, save=args.save_baseline, tolerance=args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
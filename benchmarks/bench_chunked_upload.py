@@ -0,0 +1,154 @@
+"""
+Chunked Hyper upload against a local stub of Tableau's file upload endpoints.
+
+Uploads a sparse multi-GB file through TableauCloudPublisher's chunked
+uploader, with the stub failing every Nth chunk with a 503, and checks that
+every byte arrived exactly once while peak memory stays around one chunk.
+The stub runs in a child process so only the uploader's memory is measured.
+
+Usage:
+    python -m benchmarks.bench_chunked_upload [--size-gb 2] [--chunk-mb 4] [--fail-every 7]
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict
+import argparse
+import multiprocessing
+import resource
+import tempfile
+import time
+import uuid
+
+import tableauserverclient as TSC
+from tableauserverclient.server import RequestFactory
+
+from src.pipeline.tableau_cloud import TableauCloudPublisher
+
+NAMESPACE = "http://tableau.com/api"
+
+
+class StubTableau(BaseHTTPRequestHandler):
+    """Minimal fileUploads and datasource data endpoints"""
+    fail_every = 0
+    requests_seen = 0
+    # multipart framing around each chunk (constant length)
+    overhead = len(RequestFactory.Fileupload.chunk_req(b"")[0])
+    received = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: str) -> None:
+        payload = f'<tsResponse xmlns="{NAMESPACE}">{body}</tsResponse>'.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _drain(self) -> int:
+        remaining = int(self.headers.get("Content-Length", 0))
+        received = 0
+        while remaining:
+            data = self.rfile.read(min(remaining, 1024 * 1024))
+            remaining -= len(data)
+            received += len(data)
+        return received
+
+    def do_POST(self):
+        self._drain()
+        upload_id = uuid.uuid4().hex
+        self._reply(201, f'<fileUpload uploadSessionId="{upload_id}" fileSize="0"/>')
+
+    def do_PUT(self):
+        upload_id = self.path.rsplit("/", 1)[-1]
+        received = self._drain()
+        type(self).requests_seen += 1
+        if self.fail_every and self.requests_seen % self.fail_every == 0:
+            self._reply(503, "")
+            return
+        with self.received.get_lock():
+            self.received.value += received - self.overhead
+            size_mb = self.received.value // (1024 * 1024)
+        self._reply(200, f'<fileUpload uploadSessionId="{upload_id}" fileSize="{size_mb}"/>')
+
+    def do_PATCH(self):
+        self._drain()
+        self._reply(202, '<job id="stub-job" mode="Asynchronous" type="UpdateUploadedFile"/>')
+
+
+def serve(port, received, fail_every: int) -> None:
+    StubTableau.received = received
+    StubTableau.fail_every = fail_every
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubTableau)
+    port.value = httpd.server_port
+    httpd.serve_forever()
+
+
+def run_upload(size: int, chunk_mb: int, fail_every: int) -> Dict[str, float]:
+    """Upload a sparse file of size bytes through the stub; returns what arrived and the memory used"""
+    port = multiprocessing.Value("i", 0)
+    received = multiprocessing.Value("q", 0)
+    stub = multiprocessing.Process(target=serve, args=(port, received, fail_every), daemon=True)
+    stub.start()
+    while not port.value:
+        time.sleep(0.01)
+    url = f"http://127.0.0.1:{port.value}"
+
+    try:
+        server = TSC.Server(url)
+        server.version = "3.20"
+        server._set_auth("site", "user", "token")
+        publisher = TableauCloudPublisher(
+            url, "site", "name", "token", "datasource",
+            server=server, upload_chunk_mb=chunk_mb
+        )
+        publisher.uploader.backoff = 0.01
+        # the stub has no sign-in endpoint; the token set above is all it needs
+        publisher.uploader.call = lambda fn, *args: fn(*args)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "backfill.hyper"
+            with open(path, "wb") as f:
+                f.truncate(size)  # sparse: no disk space or write time needed
+
+            rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            upload_id = publisher.uploader.upload(path)
+            elapsed = time.perf_counter() - start
+            job = publisher._request_update("ds", upload_id, publisher._update_actions(), "bench")
+            rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    finally:
+        stub.terminate()
+
+    return {
+        "size": size,
+        "received": received.value,
+        "seconds": elapsed,
+        "chunks": publisher.uploader.chunks_uploaded,
+        "chunk_retries": publisher.uploader.chunk_retries,
+        # ru_maxrss is in KB on Linux
+        "rss_growth_mb": (rss_after - rss_before) / 1024,
+        "job_id": job.id,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-gb", type=float, default=2.0)
+    parser.add_argument("--chunk-mb", type=int, default=4)
+    parser.add_argument("--fail-every", type=int, default=7, help="Fail every Nth chunk request (0 = never)")
+    args = parser.parse_args()
+
+    result = run_upload(int(args.size_gb * 1024 ** 3), args.chunk_mb, args.fail_every)
+    size, received = result["size"], result["received"]
+    print(f"file size        : {size / 1024 ** 2:,.0f} MB")
+    print(f"received by stub : {received / 1024 ** 2:,.0f} MB ({'ok' if received == size else 'MISMATCH'})")
+    print(f"throughput       : {size / 1024 ** 2 / result['seconds']:,.0f} MB/s")
+    print(f"chunk retries    : {result['chunk_retries']}")
+    print(f"peak RSS growth  : {result['rss_growth_mb']:,.0f} MB (chunk size {args.chunk_mb} MB)")
+    print(f"update job       : {result['job_id']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Extract size and upload time of the flat vs the normalized Hyper layout.
+
+Upload time is estimated from the file size at --mbps, since it is dominated
+by transfer time for these file sizes.
+
+Usage:
+    python -m benchmarks.bench_hyper_layout [--rankings 1 100 10000] [--mbps 20]
+"""
+from pathlib import Path
+import argparse
+import tempfile
+import time
+
+from benchmarks.bench_hyper_writer import make_rankings
+from src.pipeline.hyper import FLAT_LAYOUT, NORMALIZED_LAYOUT, HyperFileManager, get_hyper_runtime
+from src.pipeline.tableau import TableauDataConverter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rankings", type=int, nargs="+", default=[1, 100, 10_000])
+    parser.add_argument("--mbps", type=float, default=20.0, help="Upload bandwidth in Mbit/s")
+    args = parser.parse_args()
+
+    output_dir = Path(tempfile.mkdtemp(prefix="bench-layout-"))
+    managers = {layout: HyperFileManager(output_dir, layout=layout) for layout in (FLAT_LAYOUT, NORMALIZED_LAYOUT)}
+    for manager in managers.values():
+        manager.create_hyper_file("warmup", TableauDataConverter.to_table(make_rankings(10))).unlink()
+
+    print(f"{'rankings':>9} {'layout':>11} {'build ms':>9} {'size KiB':>10} {'upload s':>9}")
+    for count in args.rankings:
+        table = TableauDataConverter.to_table(make_rankings(count * 10))
+        for layout, manager in managers.items():
+            start = time.perf_counter()
+            path = manager.create_hyper_file(f"{layout}_{count}", table)
+            elapsed = time.perf_counter() - start
+            size = path.stat().st_size
+            path.unlink()
+            upload = size * 8 / (args.mbps * 1_000_000)
+            print(f"{count:>9} {layout:>11} {elapsed * 1000:>9.1f} {size / 1024:>10.1f} {upload:>9.2f}")
+    get_hyper_runtime().shutdown()
+    output_dir.rmdir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Rows/sec of building a Rankings Hyper file from RankingResults.
+
+Compares the row path (TableauDataConverter.convert + Inserter on a
+connection to the file) with the columnar path (TableauDataConverter.to_table
++ COPY from an Arrow stream).
+
+Usage:
+    python -m benchmarks.bench_hyper_writer [--sizes 10 10000 1000000]
+"""
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Callable, List
+import argparse
+import shutil
+import tempfile
+import time
+
+from tableauhyperapi import Connection, Inserter
+
+from src.models.ranking import RankingItem, RankingResult
+from src.pipeline.hyper import HyperFileManager, get_hyper_runtime
+from src.pipeline.tableau import TableauDataConverter
+
+
+def make_rankings(rows: int) -> List[RankingResult]:
+    """Build rankings with rows items in total (10 per ranking, the last one may be shorter)"""
+    rankings = []
+    for index in range(0, rows, 10):
+        count = min(10, rows - index)
+        items = [
+            RankingItem.model_construct(
+                rank=rank,
+                name=f"Item {index + rank}",
+                description="Benchmark item description " * 3,
+                advantages=["Fast", "Reliable", "Popular"],
+                metrics={"popularity": 8.5, "growth": 7.25},
+                score=8.0,
+            )
+            for rank in range(1, count + 1)
+        ]
+        rankings.append(RankingResult.model_construct(
+            topic=f"Benchmark topic {index // 10}",
+            generated_at=datetime.now(UTC),
+            items=items,
+            sources=[f"https://example.com/{index}/a", f"https://example.org/{index}/b"],
+            methodology=f"Benchmark methodology for ranking {index}: " + "search, review, score. " * 8,
+            year=2024,
+        ))
+    return rankings
+
+
+def row_path(manager: HyperFileManager, rankings: List[RankingResult], name: str) -> Path:
+    data = [row for ranking in rankings for row in TableauDataConverter.convert(ranking)]
+    runtime = get_hyper_runtime()
+    hyper_path = manager.output_dir / f"{name}.hyper"
+    shutil.copyfile(runtime.template("rankings", manager._build_template), hyper_path)
+    with Connection(runtime._ensure_process().endpoint, str(hyper_path)) as connection:
+        manager._insert_rows(connection, manager.table_def, data)
+    return hyper_path
+
+
+def columnar_path(manager: HyperFileManager, rankings: List[RankingResult], name: str) -> Path:
+    return manager.create_hyper_file(name, TableauDataConverter.to_table(rankings))
+
+
+def measure(build: Callable[..., Path], manager: HyperFileManager, rankings, name: str) -> float:
+    start = time.perf_counter()
+    path = build(manager, rankings, name)
+    elapsed = time.perf_counter() - start
+    path.unlink()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 10_000, 1_000_000])
+    args = parser.parse_args()
+
+    output_dir = Path(tempfile.mkdtemp(prefix="bench-hyper-"))
+    manager = HyperFileManager(output_dir)
+    # Start the Hyper process and build the template outside the measurement
+    measure(columnar_path, manager, make_rankings(10), "warmup")
+
+    print(f"{'rows':>10} {'row path rows/s':>18} {'columnar rows/s':>18} {'speedup':>8}")
+    for size in args.sizes:
+        rankings = make_rankings(size)
+        row_seconds = measure(row_path, manager, rankings, f"rows_{size}")
+        columnar_seconds = measure(columnar_path, manager, rankings, f"columnar_{size}")
+        print(
+            f"{size:>10} {size / row_seconds:>18,.0f} {size / columnar_seconds:>18,.0f} "
+            f"{row_seconds / columnar_seconds:>7.1f}x"
+        )
+    get_hyper_runtime().shutdown()
+    output_dir.rmdir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Cold-start cost of the web app: imports, app construction and first response.
+
+Every measurement runs in a fresh interpreter. `python -X importtime` gives
+the cumulative import time of the dev runner (src.web.run) and of the app
+module the launcher loads (src.web.app); probe processes then build the app
+with create_app(), start its services against the stub Tableau server and
+time the first GET /api over ASGI, once as a plain start and once with
+WARMUP_ON_START. "deferred" is what the first ranking still
+has to load afterwards (the agent, its model clients and the Hyper process).
+
+Fails when building the app imports any of the heavy dependencies or when
+importing src.web.app takes longer than --budget-ms.
+
+Usage:
+    python -m benchmarks.bench_startup [--repeat 5] [--budget-ms 300] [--save-baseline]
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Loaded on first use, never by create_app()
+HEAVY_MODULES = (
+    "pydantic_ai", "openai", "tableauserverclient", "tableauhyperapi",
+    "pyarrow", "pantab", "numpy", "duckduckgo_search",
+)
+
+
+def probe() -> None:
+    """Child process: print the startup timings of this interpreter as JSON"""
+    import asyncio
+    import httpx
+
+    started = time.perf_counter()
+    from src.web.app import create_app
+    app = create_app()
+    built = time.perf_counter()
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    async def serve() -> Dict[str, float]:
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                (await client.get("/api")).raise_for_status()
+            answered = time.perf_counter()
+            # a no-op when the app already warmed up
+            await app.state.services.warm_up()
+            deferred = time.perf_counter() - answered
+        return {
+            "create_app": built - started,
+            "ready": ready - started,
+            "first_response": answered - started,
+            "deferred": deferred,
+        }
+
+    timings = asyncio.run(serve())
+    print(json.dumps({"timings": timings, "heavy": heavy}))
+
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        fields = [field.strip() for field in line.removeprefix("import time:").split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def run_probe(env: Dict[str, str]) -> Dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--probe"],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def run(args: argparse.Namespace, stub_url: str) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    for module in ("src.web.run", "src.web.app"):
+        imports = [import_time_ms(module) for _ in range(args.repeat)]
+        metrics[f"import_ms/{module}"] = round(statistics.median(imports), 1)
+
+    env = dict(
+        os.environ,
+        TABLEAU_SERVER_URL=stub_url,
+        TABLEAU_SITE_NAME="stub",
+        TABLEAU_TOKEN_NAME="benchmark",
+        TABLEAU_TOKEN_VALUE="benchmark",
+        TABLEAU_DATASOURCE_NAME="Top10 Rankings",
+        OPENAI_API_KEY=os.environ.get("OPENAI_API_KEY", "offline-benchmark"),
+        RANKING_HISTORY_PATH=os.path.join(tempfile.mkdtemp(), "rankings.sqlite"),
+        LOG_LEVEL="WARNING",
+    )
+    heavy: List[str] = []
+    for mode, warmup in (("cold", "false"), ("warm", "true")):
+        samples: Dict[str, List[float]] = {}
+        for _ in range(args.repeat):
+            result = run_probe(dict(env, WARMUP_ON_START=warmup))
+            heavy = sorted(set(heavy) | set(result["heavy"]))
+            for name, seconds in result["timings"].items():
+                samples.setdefault(name, []).append(seconds)
+        for name, values in samples.items():
+            metrics[f"startup_ms/{mode}/{name}"] = round(statistics.median(values) * 1000, 1)
+
+    metrics["import/heavy_modules"] = len(heavy)
+    if heavy:
+        print(f"create_app() imported: {', '.join(heavy)}")
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float, default=300.0, help="Largest import time of src.web.app")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.probe:
+        probe()
+        return 0
+
+    from benchmarks import stubs
+    from benchmarks.harness import report
+
+    with stubs.StubTableau(latency=0.0) as stub:
+        metrics = run(args, stub.url)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "tolerance", "probe")}
+    status = report("startup", metrics, config, save=args.save_baseline, tolerance=args.tolerance)
+
+    imported = metrics["import_ms/src.web.app"]
+    print(f"\nsrc.web.app imports in {imported:g} ms ({'OK' if imported < args.budget_ms else 'over'} "
+          f"{args.budget_ms:g} ms); heavy modules loaded by create_app(): {metrics['import/heavy_modules']:g}")
+    return status or int(imported >= args.budget_ms or metrics["import/heavy_modules"] > 0)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+Tableau-side latency against the local Tableau stub and the real Hyper process.
+
+Scenarios:
+- hyper: concurrent builds of 1, 100 and 1000 single-ranking Hyper files on
+  the shared Hyper runtime, as concurrent requests would trigger them
+- datasources: resolving the target datasource on a site with thousands of
+  datasources (cold filtered lookup, warm lookup, full index rebuild)
+- waiters: many concurrent waiters on Tableau jobs, through the shared
+  TableauJobMonitor and through one wait_for_job poll loop per job
+
+Usage:
+    python -m benchmarks.bench_tableau [--scenarios hyper datasources waiters]
+        [--datasources 5000] [--waiters 100] [--tableau-latency 0.02] [--save-baseline]
+"""
+from pathlib import Path
+from typing import Dict, List
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+
+from benchmarks import stubs
+from benchmarks.bench_hyper_writer import make_rankings
+from benchmarks.harness import latency_metrics, peak_rss_mb, report
+from src.core.aio import configure_executor, run_blocking, shutdown_executor
+from src.pipeline.hyper import HyperFileManager, configure_hyper_runtime, shutdown_hyper_runtime
+from src.pipeline.job_monitor import TableauJobMonitor
+from src.pipeline.tableau import TableauDataConverter
+from src.pipeline.tableau_cloud import TableauCloudPublisher
+
+DATASOURCE = "Top10 Rankings"
+
+
+def build_publisher(url: str) -> TableauCloudPublisher:
+    return TableauCloudPublisher(url, "stub", "benchmark", "benchmark", DATASOURCE, timeout=60)
+
+
+async def bench_hyper(counts: List[int]) -> Dict[str, float]:
+    rows = TableauDataConverter.convert(make_rankings(10)[0])
+    metrics = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = HyperFileManager(Path(tmp))
+        # first build starts the Hyper process; keep it out of the measurements
+        await run_blocking(manager.create_hyper_file, "warmup", rows)
+        for count in counts:
+            durations: List[float] = []
+
+            async def build(index: int) -> None:
+                started = time.perf_counter()
+                path = await run_blocking(manager.create_hyper_file, f"bench_{count}_{index}", rows)
+                durations.append(time.perf_counter() - started)
+                Path(path).unlink()
+
+            started = time.perf_counter()
+            await asyncio.gather(*(build(index) for index in range(count)))
+            metrics[f"throughput/hyper_files_per_s_{count}"] = round(count / (time.perf_counter() - started), 1)
+            metrics.update(latency_metrics("hyper_build", {f"{count}_files": durations}))
+    return metrics
+
+
+async def bench_datasources(url: str, lookups: int) -> Dict[str, float]:
+    publisher = build_publisher(url)
+    cold: List[float] = []
+    warm: List[float] = []
+    for _ in range(lookups):
+        publisher.invalidate_datasource_cache()
+        started = time.perf_counter()
+        await publisher._get_datasource_id()
+        cold.append(time.perf_counter() - started)
+        started = time.perf_counter()
+        await publisher._get_datasource_id()
+        warm.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    indexed = await run_blocking(publisher.call_with_session, publisher.resolver.rebuild_index)
+    rebuild = time.perf_counter() - started
+    await run_blocking(publisher.close)
+
+    metrics = latency_metrics("datasource_lookup", {"cold": cold, "warm": warm})
+    metrics.update(latency_metrics("datasource_index", {f"rebuild_{indexed}": [rebuild]}))
+    return metrics
+
+
+async def start_jobs(publisher: TableauCloudPublisher, count: int) -> List[str]:
+    datasource_id = await publisher._get_datasource_id()
+    jobs = await asyncio.gather(*(
+        run_blocking(
+            publisher.call_with_session,
+            publisher._request_update,
+            datasource_id, "bench-upload", [], f"bench-{index}"
+        )
+        for index in range(count)
+    ))
+    return [job.id for job in jobs]
+
+
+async def bench_waiters(stub: stubs.StubTableau, count: int) -> Dict[str, float]:
+    publisher = build_publisher(stub.url)
+    metrics = {}
+
+    def job_requests() -> int:
+        return sum(value for route, value in stub.counts().items() if "/jobs" in route)
+
+    monitor = TableauJobMonitor(publisher, min_interval=0.25, max_interval=2.0)
+    job_ids = await start_jobs(publisher, count)
+    before = job_requests()
+    durations: List[float] = []
+
+    async def wait_shared(job_id: str) -> None:
+        started = time.perf_counter()
+        await monitor.wait(job_id, timeout=120)
+        durations.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(wait_shared(job_id) for job_id in job_ids))
+    await monitor.stop()
+    metrics.update(latency_metrics("job_wait", {f"monitor_{count}": durations}))
+    metrics[f"tableau/job_requests_monitor_{count}"] = job_requests() - before
+
+    job_ids = await start_jobs(publisher, count)
+    before = job_requests()
+    durations = []
+
+    async def wait_each(job_id: str) -> None:
+        started = time.perf_counter()
+        await publisher.wait_for_job(job_id, timeout=120)
+        durations.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(wait_each(job_id) for job_id in job_ids))
+    metrics.update(latency_metrics("job_wait", {f"per_job_{count}": durations}))
+    metrics[f"tableau/job_requests_per_job_{count}"] = job_requests() - before
+    await run_blocking(publisher.close)
+    return metrics
+
+
+async def run(args: argparse.Namespace, stub: stubs.StubTableau) -> Dict[str, float]:
+    configure_executor(args.io_threads)
+    configure_hyper_runtime(pool_size=args.hyper_pool_size)
+    metrics: Dict[str, float] = {}
+    try:
+        if "hyper" in args.scenarios:
+            metrics.update(await bench_hyper(args.files))
+        if "datasources" in args.scenarios:
+            metrics.update(await bench_datasources(stub.url, args.lookups))
+        if "waiters" in args.scenarios:
+            metrics.update(await bench_waiters(stub, args.waiters))
+    finally:
+        shutdown_executor(wait=False)
+        shutdown_hyper_runtime()
+    metrics["memory/peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="+", default=["hyper", "datasources", "waiters"],
+        choices=["hyper", "datasources", "waiters"]
+    )
+    parser.add_argument("--files", type=int, nargs="+", default=[1, 100, 1000], help="Concurrent Hyper builds")
+    parser.add_argument("--datasources", type=int, default=5000, help="Other datasources on the stub site")
+    parser.add_argument("--lookups", type=int, default=20, help="Cold and warm datasource lookups")
+    parser.add_argument("--waiters", type=int, default=100, help="Concurrently awaited Tableau jobs")
+    parser.add_argument("--tableau-latency", type=float, default=0.02, help="Seconds per Tableau request")
+    parser.add_argument("--job-seconds", type=float, default=2.0, help="Seconds a Tableau update job takes")
+    parser.add_argument("--io-threads", type=int, default=32, help="Blocking I/O executor threads")
+    parser.add_argument("--hyper-pool-size", type=int, default=4, help="Pooled Hyper connections")
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    stub = stubs.StubTableau(
+        DATASOURCE,
+        extra_datasources=args.datasources,
+        latency=args.tableau_latency,
+        job_seconds=args.job_seconds
+    )
+    with stub:
+        metrics = asyncio.run(run(args, stub))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "tolerance")}
+    return report("tableau", metrics, config, save=args.save_baseline, tolerance=args.tolerance)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+Near-duplicate topic lookups against a TopicIndex of 100k stored topics.
+
+Stored topics are synthetic "<adjective> <subject> <context>" phrases;
+queries are paraphrases of stored topics ("Top 10 best ...", plurals,
+case and punctuation), stored topics with a year added ("... 2024") and
+topics that were never stored. Reports lookup latency in microseconds,
+index build time, the share of paraphrases matched to their original topic
+and the shares of year variants and unseen topics wrongly matched, and fails
+when the p99 lookup latency is not below one millisecond.
+
+Usage:
+    python -m benchmarks.bench_topic_index [--topics 100000] [--queries 5000]
+        [--threshold 0.8] [--save-baseline]
+"""
+from typing import Dict, List, Tuple
+import argparse
+import itertools
+import random
+import sys
+import time
+
+from benchmarks.harness import latency_metrics, peak_rss_mb, report
+from src.agent.cache import normalize_topic
+from src.agent.similarity import TopicIndex
+
+ADJECTIVES = [
+    "electric", "hybrid", "budget", "luxury", "open source", "indie", "classic", "portable",
+    "wireless", "organic", "vegan", "family", "compact", "professional", "beginner", "vintage",
+    "modern", "cheap", "premium", "outdoor", "smart", "gaming", "mechanical", "used", "new",
+    "online", "local", "historic", "independent", "sustainable", "fastest", "safest", "quietest",
+    "lightweight", "waterproof", "rated", "affordable", "durable", "reliable", "award winning",
+]
+SUBJECTS = [
+    "cars", "bikes", "laptops", "phones", "headphones", "keyboards", "cameras", "tablets", "monitors",
+    "restaurants", "coffee shops", "bakeries", "hotels", "hostels", "beaches", "museums", "parks",
+    "universities", "colleges", "bootcamps", "programming languages", "databases", "web frameworks",
+    "text editors", "browsers", "video games", "board games", "novels", "podcasts", "movies",
+    "tv series", "albums", "guitars", "pianos", "running shoes", "backpacks", "tents", "watches",
+    "smartwatches", "drones", "printers", "routers", "vacuum cleaners", "coffee makers", "blenders",
+    "strollers", "car seats", "mattresses", "sofas", "desks", "office chairs", "espresso machines",
+    "electric scooters", "skateboards", "snowboards", "ski resorts", "golf courses", "gyms",
+    "yoga studios", "dog breeds", "cat breeds", "houseplants", "wines", "beers", "whiskies",
+    "cheeses", "pizzas", "burgers", "ramen shops", "sushi bars", "airlines", "credit cards",
+    "banks", "index funds", "cloud providers", "vpn services", "password managers", "note apps",
+    "fitness trackers", "e readers", "soundbars", "speakers", "projectors", "smart tvs",
+    "graphics cards", "processors", "ssds", "motherboards", "power banks", "chargers", "lenses",
+    "tripods", "microphones", "webcams", "synthesizers", "drum kits", "violins", "saxophones",
+]
+CONTEXTS = [
+    "in canada", "in the usa", "in europe", "in japan", "in germany", "in france", "in brazil",
+    "in india", "in australia", "in mexico", "in spain", "in italy", "in the uk", "in new york",
+    "in london", "in paris", "in tokyo", "in berlin", "in toronto", "in sydney", "for students",
+    "for families", "for beginners", "for professionals", "for seniors", "for kids", "for travel",
+    "for small spaces", "under 500", "under 1000",
+]
+YEARS = ["2023", "2024", "2025"]
+
+
+def make_topics(count: int, seed: int) -> Tuple[List[str], List[str]]:
+    """count distinct stored topics and the remaining combinations, which are never stored"""
+    combos = [
+        f"{adjective} {subject} {context}"
+        for adjective, subject, context in itertools.product(ADJECTIVES, SUBJECTS, CONTEXTS)
+    ]
+    random.Random(seed).shuffle(combos)
+    if count >= len(combos):
+        raise ValueError(f"At most {len(combos) - 1} distinct topics can be generated")
+    return combos[:count], combos[count:]
+
+
+def paraphrase(topic: str, rng: random.Random) -> str:
+    """The same topic as a user might phrase it"""
+    words = topic.split()
+    if rng.random() < 0.5:
+        words = [word[:-1] if word.endswith("s") and len(word) > 3 else word for word in words]
+    # only wording that does not change what is ranked: words such as "market"
+    # or "right now" are significant, so topics adding them are different topics
+    prefix = rng.choice(["", "best ", "top 10 ", "Top ten ", "the best ", "the "])
+    suffix = rng.choice(["", ".", "?", "!"])
+    return f"{prefix}{' '.join(words)}{suffix}".capitalize()
+
+
+def run(args: argparse.Namespace) -> Dict[str, float]:
+    rng = random.Random(args.seed)
+    stored, unseen = make_topics(args.topics, args.seed)
+    index = TopicIndex()
+
+    started = time.perf_counter()
+    for topic in stored:
+        index.add(normalize_topic(topic))
+    build = time.perf_counter() - started
+
+    originals = rng.sample(stored, args.queries)
+    paraphrases = [(paraphrase(topic, rng), normalize_topic(topic)) for topic in originals]
+    # a year changes what is ranked, so these must not match their original
+    year_queries = [f"{topic} {rng.choice(YEARS)}" for topic in rng.sample(stored, args.queries)]
+    unseen_queries = rng.sample(unseen, min(args.queries, len(unseen)))
+
+    # warm up allocator and caches outside the measurements
+    for query, _ in paraphrases[:100]:
+        index.lookup(normalize_topic(query), args.threshold)
+
+    durations: Dict[str, List[float]] = {"paraphrase": [], "year": [], "unseen": []}
+    matched = 0
+    for query, original in paraphrases:
+        started = time.perf_counter()
+        match = index.lookup(normalize_topic(query), args.threshold)
+        durations["paraphrase"].append(time.perf_counter() - started)
+        matched += match is not None and match[0] == original
+    year_matches = 0
+    for query in year_queries:
+        started = time.perf_counter()
+        match = index.lookup(normalize_topic(query), args.threshold)
+        durations["year"].append(time.perf_counter() - started)
+        year_matches += match is not None
+    false_matches = 0
+    for query in unseen_queries:
+        started = time.perf_counter()
+        match = index.lookup(normalize_topic(query), args.threshold)
+        durations["unseen"].append(time.perf_counter() - started)
+        false_matches += match is not None
+
+    # latency_metrics converts seconds to ms; scale once more to report microseconds
+    metrics = latency_metrics(
+        "lookup_us",
+        {name: [value * 1000 for value in values] for name, values in durations.items()}
+    )
+    metrics.update({
+        "build/us_per_topic": round(build / len(stored) * 1e6, 2),
+        "quality/paraphrase_match_pct": round(100 * matched / len(paraphrases), 2),
+        "quality/year_false_match_pct": round(100 * year_matches / len(year_queries), 2),
+        "quality/unseen_false_match_pct": round(100 * false_matches / len(unseen_queries), 2),
+        "memory/peak_rss_mb": peak_rss_mb(),
+    })
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--topics", type=int, default=100_000, help="Topics stored in the index")
+    parser.add_argument("--queries", type=int, default=5000, help="Lookups per query kind")
+    parser.add_argument("--threshold", type=float, default=0.8, help="Similarity threshold")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--save-baseline", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Relative slowdown reported as a regression")
+    args = parser.parse_args()
+
+    metrics = run(args)
+    config = {key: value for key, value in vars(args).items() if key not in ("save_baseline", "tolerance")}
+    status = report("topic_index", metrics, config, save=args.save_baseline, tolerance=args.tolerance)
+
+    slowest = max(metrics[f"lookup_us/{kind}/p99"] for kind in ("paraphrase", "year", "unseen"))
+    print(f"\np99 lookup at {args.topics} topics: {slowest:g} us ({'OK' if slowest < 1000 else 'over'} 1 ms)")
+    return status or int(slowest >= 1000)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
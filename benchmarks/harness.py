@@ -0,0 +1,119 @@
+"""
+Shared reporting for the offline benchmarks: latency percentiles, peak RSS
+and comparison against a stored baseline.
+
+A report is a flat {metric: value} dict; latency metrics are stored in
+milliseconds under "<group>/<name>/<p50|p95|p99>". A metric regresses when
+it is more than tolerance (relative) and min_delta (absolute) worse than
+the baseline.
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import json
+import math
+import resource
+import sys
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+# Metrics where a higher value is better; everything else is lower-is-better
+HIGHER_IS_BETTER = ("throughput",)
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def latency_metrics(group: str, samples: Dict[str, Iterable[float]]) -> Dict[str, float]:
+    """p50/p95/p99 in milliseconds of each named list of durations in seconds"""
+    metrics = {}
+    for name, values in samples.items():
+        values = list(values)
+        if not values:
+            continue
+        for q in (50, 95, 99):
+            metrics[f"{group}/{name}/p{q}"] = round(percentile(values, q) * 1000, 2)
+        metrics[f"{group}/{name}/count"] = len(values)
+    return metrics
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (child processes are not included)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def load_baseline(name: str) -> Optional[Dict]:
+    """The stored {"config", "metrics"} of a benchmark, or None"""
+    path = BASELINE_DIR / f"{name}.json"
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(name: str, metrics: Dict[str, float], config: Dict) -> Path:
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"config": config, "metrics": metrics}, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def compare(
+    metrics: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = 0.2,
+    min_delta: float = 5.0
+) -> List[str]:
+    """Describe every metric that regressed against the baseline"""
+    regressions = []
+    for key, value in metrics.items():
+        before = baseline.get(key)
+        if before is None or key.endswith("/count"):
+            continue
+        worse = before - value if key.startswith(HIGHER_IS_BETTER) else value - before
+        if worse > min_delta and worse > tolerance * abs(before):
+            regressions.append(f"{key}: {before:g} -> {value:g}")
+    return regressions
+
+
+def report(
+    name: str,
+    metrics: Dict[str, float],
+    config: Dict,
+    save: bool = False,
+    tolerance: float = 0.2
+) -> int:
+    """Print metrics next to the baseline; returns 1 when a metric regressed"""
+    stored = load_baseline(name) or {}
+    baseline = stored.get("metrics", {})
+    width = max(len(key) for key in metrics)
+    print(f"{'metric':<{width}}  {'value':>10}  {'baseline':>10}")
+    for key, value in metrics.items():
+        before = baseline.get(key)
+        print(f"{key:<{width}}  {value:>10g}  {'' if before is None else format(before, 'g'):>10}")
+
+    if save:
+        print(f"\nBaseline saved to {save_baseline(name, metrics, config)}")
+        return 0
+    if not baseline:
+        print(f"\nNo baseline for '{name}'; run with --save-baseline to store one")
+        return 0
+    if stored.get("config") != config:
+        print(f"\nWarning: baseline was recorded with different settings: {stored.get('config')}")
+    regressions = compare(metrics, baseline, tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {tolerance:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions beyond {tolerance:.0%} against the baseline")
+    return 0
@@ -0,0 +1,319 @@
+"""
+Local stand-ins for the external services, used by the offline benchmarks.
+
+- StubTableauHandler: a REST stub of the Tableau endpoints the publisher,
+  datasource resolver and job monitor use, run in a child process
+- FakeDDGS: drop-in for duckduckgo_search.DDGS returning canned results
+- ranking_model: a pydantic-ai FunctionModel that searches once and then
+  returns a valid ranking, with injected model latency
+"""
+from datetime import datetime, timedelta, UTC
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import random
+import re
+import threading
+import time
+import urllib.request
+import uuid
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+NAMESPACE = "http://tableau.com/api"
+API_VERSION = "3.20"
+SITE_ID = "stub-site"
+
+
+def _jittered(seconds: float, jitter: float = 0.2) -> float:
+    return max(0.0, seconds * random.uniform(1 - jitter, 1 + jitter)) if seconds else 0.0
+
+
+def _timestamp(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class StubTableauHandler(BaseHTTPRequestHandler):
+    """
+    Tableau REST stub: sign-in, datasource listing with name filters and
+    pagination, file uploads, data updates, and jobs that finish
+    job_seconds after they were created.
+    """
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    job_seconds = 0.5
+    datasources: List[Tuple[str, str]] = []
+    jobs: Dict[str, datetime] = {}
+    counts: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, route: str) -> None:
+        with self.lock:
+            self.counts[route] = self.counts.get(route, 0) + 1
+
+    def _reply(self, status: int, body: str, content_type: str = "application/xml") -> None:
+        if content_type == "application/xml":
+            body = f'<tsResponse xmlns="{NAMESPACE}">{body}</tsResponse>'
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _drain(self) -> None:
+        remaining = int(self.headers.get("Content-Length", 0))
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+
+    def _route(self, method: str) -> None:
+        self._drain()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = re.sub(rf"^/api/[\d.]+(/sites/{SITE_ID})?", "", url.path)
+        if path == "/_stats":
+            with self.lock:
+                self._reply(200, json.dumps(self.counts), "application/json")
+            return
+        time.sleep(_jittered(self.latency))
+
+        routes = [
+            ("GET", r"/serverInfo$", self._server_info),
+            ("POST", r"/auth/signin$", self._sign_in),
+            ("POST", r"/auth/signout$", lambda *_: self._reply(204, "")),
+            ("GET", r"/datasources$", self._list_datasources),
+            ("POST", r"/fileUploads$", self._initiate_upload),
+            ("PUT", r"/fileUploads/(?P<id>[^/]+)$", self._append_upload),
+            ("PATCH", r"/datasources/(?P<id>[^/]+)/data$", self._update_data),
+            ("GET", r"/jobs/(?P<id>[^/]+)$", self._get_job),
+            ("GET", r"/jobs$", self._list_jobs),
+        ]
+        for route_method, pattern, handler in routes:
+            match = re.match(pattern, path)
+            if route_method == method and match:
+                self._count(f"{method} {pattern.strip('$')}")
+                handler(query, **match.groupdict())
+                return
+        self._reply(404, f'<error code="404000"><summary>No stub for {method} {path}</summary></error>')
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_PATCH(self):
+        self._route("PATCH")
+
+    def _server_info(self, query) -> None:
+        self._reply(200, (
+            '<serverInfo><productVersion build="stub">2024.2</productVersion>'
+            f'<restApiVersion>{API_VERSION}</restApiVersion></serverInfo>'
+        ))
+
+    def _sign_in(self, query) -> None:
+        self._reply(200, (
+            f'<credentials token="{uuid.uuid4().hex}">'
+            f'<site id="{SITE_ID}" contentUrl="stub"/><user id="stub-user"/></credentials>'
+        ))
+
+    def _page(self, query, items: list) -> Tuple[list, str]:
+        size = int(query.get("pageSize", ["100"])[0])
+        number = int(query.get("pageNumber", ["1"])[0])
+        page = items[(number - 1) * size:number * size]
+        return page, f'<pagination pageNumber="{number}" pageSize="{size}" totalAvailable="{len(items)}"/>'
+
+    def _list_datasources(self, query) -> None:
+        items = self.datasources
+        for condition in query.get("filter", []):
+            field, _, value = condition.split(":", 2)
+            if field == "name":
+                items = [item for item in items if item[1] == value]
+        page, pagination = self._page(query, items)
+        body = "".join(
+            f'<datasource id="{ds_id}" name="{name}" type="hyper" hasExtracts="true"/>'
+            for ds_id, name in page
+        )
+        self._reply(200, f"{pagination}<datasources>{body}</datasources>")
+
+    def _initiate_upload(self, query) -> None:
+        self._reply(201, f'<fileUpload uploadSessionId="{uuid.uuid4().hex}" fileSize="0"/>')
+
+    def _append_upload(self, query, id: str) -> None:
+        self._reply(200, f'<fileUpload uploadSessionId="{id}" fileSize="1"/>')
+
+    def _update_data(self, query, id: str) -> None:
+        job_id = uuid.uuid4().hex
+        with self.lock:
+            self.jobs[job_id] = datetime.now(UTC)
+        self._reply(202, f'<job id="{job_id}" mode="Asynchronous" type="UpdateUploadedFile"/>')
+
+    def _job_state(self, created: datetime) -> Tuple[bool, datetime]:
+        finished_at = created + timedelta(seconds=self.job_seconds)
+        return datetime.now(UTC) >= finished_at, finished_at
+
+    def _get_job(self, query, id: str) -> None:
+        created = self.jobs.get(id)
+        if created is None:
+            self._reply(404, '<error code="404000"><summary>Job not found</summary></error>')
+            return
+        done, finished_at = self._job_state(created)
+        attrs = f'id="{id}" mode="Asynchronous" type="UpdateUploadedFile" createdAt="{_timestamp(created)}"'
+        if done:
+            attrs += f' startedAt="{_timestamp(created)}" completedAt="{_timestamp(finished_at)}" finishCode="0" progress="100"'
+        self._reply(200, f"<job {attrs}/>")
+
+    def _list_jobs(self, query) -> None:
+        with self.lock:
+            jobs = sorted(self.jobs.items(), key=lambda job: job[1])
+        page, pagination = self._page(query, jobs)
+        body = ""
+        for job_id, created in page:
+            done, finished_at = self._job_state(created)
+            status = "Success" if done else "InProgress"
+            body += (
+                f'<backgroundJob id="{job_id}" status="{status}" jobType="update_uploaded_file" '
+                f'createdAt="{_timestamp(created)}"'
+                + (f' endedAt="{_timestamp(finished_at)}"' if done else "")
+                + "/>"
+            )
+        self._reply(200, f"{pagination}<backgroundJobs>{body}</backgroundJobs>")
+
+
+def _serve_tableau(port, latency: float, job_seconds: float, datasource_names: List[str]) -> None:
+    StubTableauHandler.latency = latency
+    StubTableauHandler.job_seconds = job_seconds
+    StubTableauHandler.datasources = [
+        (hashlib.md5(name.encode()).hexdigest(), name) for name in datasource_names
+    ]
+    ThreadingHTTPServer.request_queue_size = 1024
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubTableauHandler)
+    httpd.daemon_threads = True
+    port.value = httpd.server_port
+    httpd.serve_forever()
+
+
+class StubTableau:
+    """Runs the Tableau stub in a child process so its memory and CPU are not measured"""
+
+    def __init__(
+        self,
+        datasource_name: str = "Top10 Rankings",
+        extra_datasources: int = 0,
+        latency: float = 0.0,
+        job_seconds: float = 0.5
+    ):
+        names = [f"Datasource {index:05d}" for index in range(extra_datasources)] + [datasource_name]
+        self._port = multiprocessing.Value("i", 0)
+        self._process = multiprocessing.Process(
+            target=_serve_tableau,
+            args=(self._port, latency, job_seconds, names),
+            daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._port.value}"
+
+    def start(self) -> "StubTableau":
+        self._process.start()
+        while not self._port.value:
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._process.terminate()
+        self._process.join()
+
+    def counts(self) -> Dict[str, int]:
+        """Requests served per route"""
+        with urllib.request.urlopen(f"{self.url}/api/{API_VERSION}/_stats") as response:
+            return json.loads(response.read())
+
+    def __enter__(self) -> "StubTableau":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class FakeDDGS:
+    """Stand-in for duckduckgo_search.DDGS; text() blocks for latency seconds like the real client"""
+    latency = 0.0
+
+    def __init__(self, timeout: int = 20):
+        self.timeout = timeout
+
+    def text(self, query: str, region: str = "wt-wt", safesearch: str = "moderate", max_results: int = 10):
+        time.sleep(_jittered(self.latency))
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return [
+            {
+                "title": f"{query} result {index}",
+                "body": f"Snippet {index} about {query}",
+                "href": f"https://site{index % 7}.example.com/{slug}/{index}",
+            }
+            for index in range(max_results)
+        ]
+
+
+def ranking_payload(topic: str) -> Dict[str, Any]:
+    """A ranking that passes RankingResult validation"""
+    return {
+        "topic": topic[:100],
+        "items": [
+            {
+                "rank": rank,
+                "name": f"Item {rank}",
+                "description": f"Item {rank} is a benchmark entry with a description long enough to validate.",
+                "advantages": ["Fast", "Reliable", "Popular"],
+                "metrics": {"popularity": 10.0 - rank / 2, "growth": 5.0 + rank / 4},
+                "score": round(10.0 - rank * 0.5, 1),
+            }
+            for rank in range(1, 11)
+        ],
+        "sources": ["https://site0.example.com", "https://site1.example.com"],
+        "methodology": (
+            f"Analysis performed in {datetime.now(UTC).year} from merged search evidence, "
+            "weighting popularity, expert reviews and quality metrics for each candidate item."
+        ),
+        "year": datetime.now(UTC).year,
+    }
+
+
+def ranking_model(latency: float = 0.0) -> FunctionModel:
+    """
+    Model that calls gather_ranking_evidence once, then returns a ranking
+
+    Each model request sleeps for latency seconds (jittered), standing in for
+    the provider's response time.
+    """
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(_jittered(latency))
+        searched = any(
+            isinstance(part, ToolReturnPart) for message in messages for part in message.parts
+        )
+        if not searched:
+            prompt = messages[0].parts[-1].content
+            topic = prompt.split(":", 1)[-1].strip()
+            return ModelResponse(parts=[
+                ToolCallPart.from_raw_args("gather_ranking_evidence", {"query": topic})
+            ])
+        prompt = messages[0].parts[-1].content
+        topic = prompt.split(":", 1)[-1].strip()
+        return ModelResponse(parts=[
+            ToolCallPart.from_raw_args(info.result_tools[0].name, ranking_payload(topic))
+        ])
+
+    return FunctionModel(respond)
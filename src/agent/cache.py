@@ -0,0 +1,194 @@
+from pathlib import Path
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Union
+import logging
+import re
+import unicodedata
+
+from src.core.cache import CacheBackend, MemoryCache, SingleFlight, SqliteCache
+from src.models.ranking import RankingResult, ranking_from_record, ranking_to_record
+
+if TYPE_CHECKING:
+    from src.agent.similarity import TopicIndex
+
+logger = logging.getLogger(__name__)
+
+# Leading phrases that do not change what is being ranked ("Top 10 best ..." == "...")
+_TOPIC_PREFIX = re.compile(r"^(?:(?:the|top\s*(?:10|ten)|best)\b\s*)+")
+
+
+def normalize_topic(topic: str) -> str:
+    """
+    Normalize a topic for cache lookups: case, whitespace and 'top 10'/'best' prefixes
+
+    A topic that is nothing but such a prefix ("best", "the best") keeps it,
+    so different prefix-only topics never share a key.
+    """
+    text = unicodedata.normalize("NFKC", topic).casefold()
+    text = re.sub(r"\s+", " ", text).strip().rstrip(" .!?")
+    return _TOPIC_PREFIX.sub("", text).rstrip(" .!?") or text
+
+
+class RankingCache:
+    """
+    TTL cache of RankingResults keyed on the normalized topic.
+
+    Concurrent misses for the same topic share a single generation run. With
+    a similarity_threshold, a topic that is not cached itself is served the
+    fresh ranking of the most similar cached topic ("the electric car for
+    families" reuses "best electric cars for families") when their estimated
+    Jaccard similarity reaches the threshold. Only the cached topics are
+    searched (at most the backend's max_entries), not the ranking history.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = 3600.0,
+        similarity_threshold: float = 0.0
+    ):
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._flight = SingleFlight()
+        self.index: Optional["TopicIndex"] = None
+        if similarity_threshold > 0:
+            # numpy only loads when near-duplicate lookups are enabled
+            from src.agent.similarity import TopicIndex
+            self.index = TopicIndex()
+            for key in self.backend.keys():
+                self._index_key(key)
+            # keys the backend's LRU drops must leave the index too
+            self.backend.on_evict = self.index.remove
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _get_fresh(self, key: str) -> Optional[RankingResult]:
+        entry = self.backend.get(key)
+        if entry is None or entry.age > self.ttl:
+            # expired, or evicted by the backend
+            self._drop(key)
+            return None
+        return ranking_from_record(entry.value)
+
+    def _index_key(self, key: str) -> None:
+        try:
+            self.index.add(key)
+        except ValueError:
+            # topics without significant words ("the", "of the") only match exactly
+            pass
+
+    def _drop(self, key: str) -> None:
+        self.backend.delete(key)
+        if self.index is not None:
+            self.index.remove(key)
+
+    def get(self, topic: str) -> Optional[RankingResult]:
+        """Return a fresh cached ranking for topic, or None"""
+        return self._get_fresh(normalize_topic(topic))
+
+    def get_similar(self, topic: str) -> Optional[RankingResult]:
+        """Return a fresh cached ranking of a near-duplicate topic, or None"""
+        if self.index is None:
+            return None
+        match = self.index.lookup(normalize_topic(topic), self.similarity_threshold)
+        if match is None:
+            return None
+        key, similarity = match
+        result = self._get_fresh(key)
+        if result is not None:
+            logger.info(f"Reusing the ranking of '{key}' for '{topic}' (similarity {similarity:.2f})")
+        return result
+
+    def set(self, topic: str, result: RankingResult) -> None:
+        key = normalize_topic(topic)
+        if not key:
+            return
+        self.backend.set(key, ranking_to_record(result))
+        if self.index is not None:
+            self._index_key(key)
+
+    def invalidate(self, topic: str) -> None:
+        self._drop(normalize_topic(topic))
+
+    async def get_or_generate(
+        self,
+        topic: str,
+        generate: Callable[[str], Awaitable[RankingResult]]
+    ) -> RankingResult:
+        """Return a cached ranking or run generate(topic), collapsing concurrent misses"""
+        if not self.enabled or not normalize_topic(topic):
+            # empty topics are never cached or shared
+            return await generate(topic)
+
+        cached = self.get(topic)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"Ranking cache hit for '{topic}'")
+            return cached
+
+        similar = self.get_similar(topic)
+        if similar is not None:
+            self.similar_hits += 1
+            return similar
+
+        async def run() -> RankingResult:
+            result = await generate(topic)
+            self.set(topic, result)
+            return result
+
+        result, shared = await self._flight.do(normalize_topic(topic), run)
+        if shared:
+            self.coalesced += 1
+            logger.info(f"Joined in-flight ranking generation for '{topic}'")
+            return result.model_copy(deep=True)
+        self.misses += 1
+        return result
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        hits = self.hits + self.similar_hits
+        lookups = hits + self.misses + self.coalesced
+        return {
+            "entries": len(self.backend),
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "similarity_threshold": self.similarity_threshold,
+        }
+
+
+_ranking_cache: Optional[RankingCache] = None
+
+
+def configure_ranking_cache(
+    ttl: float = 3600.0,
+    max_entries: int = 256,
+    path: Optional[Union[str, Path]] = None,
+    similarity_threshold: float = 0.0
+) -> RankingCache:
+    """
+    Replace the process-wide ranking cache; path enables the SQLite backend
+    and a similarity_threshold (0-1) near-duplicate topic reuse
+    """
+    global _ranking_cache
+    if path:
+        backend = SqliteCache(path, max_entries=max_entries, table="rankings")
+    else:
+        backend = MemoryCache(max_entries=max_entries)
+    _ranking_cache = RankingCache(backend, ttl=ttl, similarity_threshold=similarity_threshold)
+    return _ranking_cache
+
+
+def get_ranking_cache() -> RankingCache:
+    """Return the process-wide ranking cache, creating an in-memory one if needed"""
+    if _ranking_cache is None:
+        return configure_ranking_cache()
+    return _ranking_cache
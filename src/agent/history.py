@@ -0,0 +1,200 @@
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import base64
+import binascii
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from src.agent.cache import normalize_topic
+from src.models.ranking import RankingResult, ranking_from_record, ranking_to_record
+
+logger = logging.getLogger(__name__)
+
+MAX_PAGE_SIZE = 200
+# fixed-width UTC text sorts chronologically
+_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+
+class InvalidCursorError(ValueError):
+    """A pagination cursor that was not issued by this store"""
+    pass
+
+
+def _encode_cursor(generated_at: str, batch_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([generated_at, batch_id]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        value = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not (isinstance(value, list) and len(value) == 2 and all(isinstance(part, str) for part in value)):
+            raise ValueError("Not a [generated_at, batch_id] pair")
+        generated_at, batch_id = value
+        # the same fixed-width format as stored timestamps, or the keyset comparison is meaningless
+        datetime.strptime(generated_at, _TIMESTAMP_FORMAT)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    return generated_at, batch_id
+
+
+class RankingHistory:
+    """
+    Every generated RankingResult, kept in a local SQLite file.
+
+    Rankings are keyed on the batch_id they are published to Tableau with and
+    indexed by normalized topic and generated_at, so recent rankings are read
+    without a model run or a Tableau round trip. Listings are newest first and
+    paginated with opaque keyset cursors, which stay stable while new
+    rankings are added.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS rankings ("
+                "batch_id TEXT PRIMARY KEY, topic TEXT NOT NULL, topic_key TEXT NOT NULL, "
+                "generated_at TEXT NOT NULL, stored_at REAL NOT NULL, record TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS rankings_generated_at ON rankings (generated_at, batch_id)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS rankings_topic ON rankings (topic_key, generated_at, batch_id)"
+            )
+            # newest ranking per topic, maintained on save
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS latest_rankings ("
+                "topic_key TEXT PRIMARY KEY, batch_id TEXT NOT NULL, generated_at TEXT NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS latest_rankings_generated_at "
+                "ON latest_rankings (generated_at, batch_id)"
+            )
+
+    @staticmethod
+    def _timestamp(result: RankingResult) -> str:
+        value = result.generated_at
+        if value.tzinfo is not None:
+            value = value.astimezone(UTC).replace(tzinfo=None)
+        return value.strftime(_TIMESTAMP_FORMAT)
+
+    def save(self, result: RankingResult) -> str:
+        """Store a ranking; returns its batch_id"""
+        # imported here so the read endpoints do not load pyarrow
+        from src.pipeline.tableau import TableauDataConverter
+
+        batch_id = TableauDataConverter.generate_batch_id(result.topic, result.generated_at)
+        topic_key = normalize_topic(result.topic)
+        generated_at = self._timestamp(result)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rankings "
+                "(batch_id, topic, topic_key, generated_at, stored_at, record) VALUES (?, ?, ?, ?, ?, ?)",
+                (batch_id, result.topic, topic_key, generated_at, time.time(),
+                 json.dumps(ranking_to_record(result)))
+            )
+            self._conn.execute(
+                "INSERT INTO latest_rankings (topic_key, batch_id, generated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (topic_key) DO UPDATE SET "
+                "batch_id = excluded.batch_id, generated_at = excluded.generated_at "
+                "WHERE excluded.generated_at >= latest_rankings.generated_at",
+                (topic_key, batch_id, generated_at)
+            )
+        return batch_id
+
+    def get(self, batch_id: str) -> Optional[RankingResult]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT record FROM rankings WHERE batch_id = ?", (batch_id,)
+            ).fetchone()
+        return ranking_from_record(json.loads(row[0])) if row else None
+
+    def latest_for_topic(self, topic: str) -> Optional[Tuple[str, RankingResult]]:
+        """The batch_id and ranking most recently generated for topic"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.batch_id, r.record FROM latest_rankings l "
+                "JOIN rankings r ON r.batch_id = l.batch_id WHERE l.topic_key = ?",
+                (normalize_topic(topic),)
+            ).fetchone()
+        return (row[0], ranking_from_record(json.loads(row[1]))) if row else None
+
+    def list(
+        self,
+        topic: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        latest: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of stored rankings, newest first, and the cursor of the next page
+
+        Args:
+            topic: Only rankings of this topic (normalized like the ranking cache)
+            limit: Page size (at most MAX_PAGE_SIZE)
+            cursor: next_cursor of the previous page
+            latest: Only the newest ranking of each topic
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        source = "latest_rankings" if latest else "rankings"
+        conditions, params = [], []
+        if topic:
+            conditions.append("s.topic_key = ?")
+            params.append(normalize_topic(topic))
+        if cursor:
+            conditions.append("(s.generated_at, s.batch_id) < (?, ?)")
+            params.extend(_decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        join = "JOIN rankings r ON r.batch_id = s.batch_id" if latest else ""
+        record = "r.record" if latest else "s.record"
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT s.batch_id, s.generated_at, {record} FROM {source} s {join} {where} "
+                "ORDER BY s.generated_at DESC, s.batch_id DESC LIMIT ?",
+                (*params, limit + 1)
+            ).fetchall()
+
+        next_cursor = _encode_cursor(rows[limit - 1][1], rows[limit - 1][0]) if len(rows) > limit else None
+        # records are returned as stored; they are already JSON-safe
+        return [dict(json.loads(row[2]), batch_id=row[0]) for row in rows[:limit]], next_cursor
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rankings = self._conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+            topics = self._conn.execute("SELECT COUNT(*) FROM latest_rankings").fetchone()[0]
+        return {"path": str(self.path), "rankings": rankings, "topics": topics}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+
+
+_ranking_history: Optional[RankingHistory] = None
+
+
+def configure_ranking_history(path: Optional[Union[str, Path]]) -> Optional[RankingHistory]:
+    """Replace the process-wide history store; no path disables it"""
+    global _ranking_history
+    if _ranking_history is not None:
+        _ranking_history.close()
+    _ranking_history = RankingHistory(path) if path else None
+    return _ranking_history
+
+
+def get_ranking_history() -> Optional[RankingHistory]:
+    """Return the process-wide history store, or None when it is disabled"""
+    return _ranking_history
@@ -1,28 +1,63 @@
 # Standard library imports
 from dataclasses import dataclass
 from datetime import datetime, UTC
-from typing import Any, List, Dict
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Dict, Optional, Union
+import asyncio
+import json
+import logging
+import time
 
 # Third-party imports
+import pydantic_core
+from pydantic import ValidationError
 from pydantic_ai import Agent, RunContext, ModelRetry
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+from pydantic_ai.messages import ModelMessagesTypeAdapter, ModelResponse, RetryPromptPart, ToolCallPart
 
 # Local imports
-from src.models.ranking import RankingResult, RankingItem
-from src.agent.search import web_search, SearchError
+from src.models.ranking import RankingDraft, RankingResult, RankingItem
+from src.agent.repair import (
+    ITEMS_REGENERATED, RETRIES_AVOIDED, TOKENS_SAVED,
+    is_valid_ranking, repair_draft, repair_item
+)
+from src.agent.search import web_search, fanout_search, SearchError
+from src.agent.cache import get_ranking_cache
+from src.agent.history import get_ranking_history
+from src.agent.routing import ModelTier, get_model_router
+from src.core.aio import run_blocking
+from src.core.telemetry import LLM_REQUESTS, LLM_TOKENS, RETRIES, span
+
+logger = logging.getLogger(__name__)
 
 @dataclass
 class RankingDependencies:
     search_client: Any
+    # RankingHistory that stores every accepted ranking (None disables)
     db_connector: Any
 
+def _dependencies() -> RankingDependencies:
+    return RankingDependencies(
+        search_client=web_search,
+        db_connector=get_ranking_history()
+    )
+
 class RankingError(Exception):
     """Ranking generation related errors"""
     pass
 
+# Default quality tier; the tiers actually used come from the model router
+RANKING_MODEL = 'openai:gpt-4o'
+# Tool the ranking agent's model calls with the final RankingDraft
+RESULT_TOOL_NAME = 'final_result'
+
+# defer_model_check: the OpenAI client is built on the first run (or by the
+# warm-up hook), not when this module is imported
 ranking_agent = Agent(
-    'openai:gpt-4o',
+    RANKING_MODEL,
     deps_type=RankingDependencies,
-    result_type=RankingResult,
+    defer_model_check=True,
+    result_type=RankingDraft,
+    result_tool_name=RESULT_TOOL_NAME,
     system_prompt=(
         "You are a ranking expert that analyzes web search results to generate authoritative top 10 rankings. "
         "For each topic, carefully evaluate key factors like: "
@@ -33,10 +68,27 @@ ranking_agent = Agent(
         "Ensure all rankings are unique, properly ordered, and supported by clear reasoning. "
         "Adapt your analysis criteria based on the specific topic being ranked. "
         "Always include domain-specific terminology and concepts in your analysis. "
+        "Prefer gather_ranking_evidence, which searches several query angles at once, "
+        "over repeated single searches. "
         "Make sure to validate and retry if the initial result is not satisfactory."
     ),
 )
 
+# Rewrites only the ranking items that are still invalid after deterministic repair
+item_repair_agent = Agent(
+    RANKING_MODEL,
+    result_type=List[RankingItem],
+    retries=2,
+    defer_model_check=True,
+    system_prompt=(
+        "You fix individual entries of a top 10 ranking. "
+        "Write exactly the requested number of replacement items, in the requested rank order, "
+        "each distinct from the items the ranking already contains. "
+        "Names use only letters, numbers, #, +, ., -, _ and spaces; descriptions are 50-500 characters; "
+        "give 3-5 unique advantages, numeric metrics and a score from 0 to 10."
+    ),
+)
+
 @ranking_agent.tool
 async def analyze_search_results(
     ctx: RunContext[RankingDependencies], 
@@ -44,7 +96,8 @@ async def analyze_search_results(
 ) -> List[Dict]:
     """Fetch and preprocess search results for ranking analysis."""
     try:
-        raw_results = await ctx.deps.search_client(query)
+        with span("search", tool="analyze_search_results"):
+            raw_results = await ctx.deps.search_client(query)
         if not raw_results:
             raise ModelRetry(
                 "No search results found", 
@@ -68,6 +121,43 @@ async def analyze_search_results(
     except Exception as e:
         raise RankingError(f"Unexpected search error: {str(e)}") from e
 
+@ranking_agent.tool
+async def gather_ranking_evidence(
+    ctx: RunContext[RankingDependencies],
+    query: str,
+    variants: Optional[List[str]] = None
+) -> List[Dict]:
+    """
+    Search several query variants in parallel and return one merged, deduplicated evidence set.
+
+    Args:
+        query: The topic to research
+        variants: Optional search queries (e.g. reviews, statistics, year-qualified);
+                  sensible defaults are used when omitted
+    """
+    try:
+        with span("search", tool="gather_ranking_evidence"):
+            evidence = await fanout_search(query, variants, search=ctx.deps.search_client)
+        if not evidence:
+            raise ModelRetry("No search results found")
+
+        return [
+            {
+                "title": r.get("title"),
+                "snippet": r.get("snippet"),
+                "source": r.get("link"),
+                "domain": r.get("source"),
+                "mentions": r.get("mentions")
+            }
+            for r in evidence
+        ]
+    except SearchError as e:
+        raise ModelRetry(f"Search API error: {str(e)}") from e
+    except ModelRetry:
+        raise
+    except Exception as e:
+        raise RankingError(f"Unexpected search error: {str(e)}") from e
+
 @ranking_agent.system_prompt
 async def add_ranking_guidelines(ctx: RunContext[RankingDependencies]) -> str:
     current_time = datetime.now(UTC)
@@ -101,27 +191,313 @@ async def add_ranking_guidelines(ctx: RunContext[RankingDependencies]) -> str:
     - Add current year in methodology section
     """
 
-async def generate_ranking(query: str) -> RankingResult:
-    """Generate rankings for the given query."""
+@ranking_agent.result_validator
+async def repair_ranking(ctx: RunContext[RankingDependencies], draft: RankingDraft) -> RankingDraft:
+    """
+    Repair the model's ranking instead of asking for a new one.
+
+    Formatting problems are fixed deterministically and items that are still
+    invalid are regenerated on their own; only problems outside the items
+    (sources, methodology) fall back to a full retry.
+    """
+    if is_valid_ranking(draft.model_dump()):
+        return draft
+
+    data, report = repair_draft(draft)
+    if report.result_errors:
+        raise ModelRetry("Fix these problems in the ranking: " + "; ".join(report.result_errors))
+
+    regeneration_tokens = 0
+    if report.invalid_items:
+        data["items"], regeneration_tokens = await _regenerate_items(ctx, data, report.invalid_items)
+    if not is_valid_ranking(data):
+        raise ModelRetry("The ranking must contain exactly 10 valid items with unique ranks and names")
+
+    # a retry would resend the whole conversation and rewrite the whole result
+    retry_tokens = (len(ModelMessagesTypeAdapter.dump_json(ctx.messages)) + len(draft.model_dump_json())) // 4
+    RETRIES_AVOIDED.inc()
+    TOKENS_SAVED.inc(max(0, retry_tokens - regeneration_tokens), model=ctx.model.name())
+    logger.info(
+        f"Repaired ranking for '{data['topic']}' without a retry: "
+        f"fixes {report.fixes}, regenerated ranks {sorted(report.invalid_items)}"
+    )
+    return RankingDraft.model_validate(data)
+
+async def _regenerate_items(
+    ctx: RunContext[RankingDependencies],
+    data: Dict[str, Any],
+    invalid: Dict[int, str]
+) -> tuple[List[Dict[str, Any]], int]:
+    """Ask the model for replacements of the invalid ranks; returns the items and tokens used"""
+    kept = [item for item in data["items"] if item["rank"] not in invalid]
+    previous = {item["rank"]: item for item in data["items"]}
+    ranks = sorted(invalid)
+    problems = "\n".join(
+        f"- rank {rank}: {error}" + (f" in {json.dumps(previous[rank])}" if rank in previous else "")
+        for rank, error in invalid.items()
+    )
+    prompt = (
+        f"Topic: {data['topic']}\n"
+        f"The ranking already contains: {', '.join(item['name'] for item in kept) or 'nothing yet'}\n"
+        f"Write {len(ranks)} replacement item(s) for rank(s) {', '.join(map(str, ranks))}.\n"
+        f"The previous attempt failed validation:\n{problems}"
+    )
+
+    ITEMS_REGENERATED.inc(len(ranks))
+    with span("item_repair", items=len(ranks)):
+        result = await item_repair_agent.run(prompt, model=ctx.model)
+    _record_run(result, ctx.model.name())
+    if len(result.data) != len(ranks):
+        raise ModelRetry(f"Expected {len(ranks)} replacement items, got {len(result.data)}")
+
+    replacements = [
+        dict(repair_item(item.model_dump()), rank=rank)
+        for rank, item in zip(ranks, result.data)
+    ]
+    items = sorted(kept + replacements, key=lambda item: item["rank"])
+    return items, result.usage().total_tokens or 0
+
+async def generate_ranking(query: str, use_cache: bool = True, quality: bool = False) -> RankingResult:
+    """
+    Generate rankings for the given query.
+
+    Results are served from the topic cache when a fresh ranking exists, and
+    concurrent requests for the same topic share one agent run. quality
+    skips the draft model and the cached ranking (the new one replaces it).
+    """
+    async def generate(topic: str) -> RankingResult:
+        return await _run_ranking_agent(topic, quality=quality)
+
+    if quality:
+        return await _generate_uncached(query, generate, use_cache)
+    if use_cache:
+        return await get_ranking_cache().get_or_generate(query, generate)
+    return await generate(query)
+
+async def generate_ranking_stream(
+    query: str,
+    use_cache: bool = True,
+    quality: bool = False
+) -> AsyncIterator[Union[RankingItem, RankingResult]]:
+    """
+    Generate rankings for the given query, yielding each RankingItem as soon as
+    it validates and the complete RankingResult last.
+
+    Cache hits, and requests that join an in-flight run for the same topic,
+    yield all items at once when the ranking is available.
+    """
+    queue: "asyncio.Queue[RankingItem]" = asyncio.Queue()
+
+    async def generate(topic: str) -> RankingResult:
+        return await _run_ranking_agent_stream(topic, on_item=queue.put_nowait, quality=quality)
+
+    if quality:
+        task = asyncio.create_task(_generate_uncached(query, generate, use_cache))
+    elif use_cache:
+        task = asyncio.create_task(get_ranking_cache().get_or_generate(query, generate))
+    else:
+        task = asyncio.create_task(generate(query))
+
+    sent = set()
     try:
-        deps = RankingDependencies(
-            search_client=web_search,
-            db_connector=None
+        while not task.done():
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                continue
+            item = getter.result()
+            sent.add(item.rank)
+            yield item
+
+        result = task.result()
+        for item in result.items:
+            if item.rank not in sent:
+                yield item
+        yield result
+    finally:
+        if not task.done():
+            task.cancel()
+
+async def _generate_uncached(
+    query: str,
+    generate: Callable[[str], Awaitable[RankingResult]],
+    use_cache: bool
+) -> RankingResult:
+    """Generate without reading the cache, keeping the result for later requests"""
+    result = await generate(query)
+    cache = get_ranking_cache()
+    if use_cache and cache.enabled:
+        cache.set(query, result)
+    return result
+
+def _finalize_ranking(result: RankingResult) -> RankingResult:
+    current_year = datetime.now(UTC).year
+    if str(current_year) not in result.methodology:
+        result.methodology = (
+            f"Analysis performed in {current_year}. " +
+            result.methodology
         )
-        
+    return result
+
+async def _store_ranking(deps: RankingDependencies, ranking: RankingResult) -> RankingResult:
+    """Save an accepted ranking to the history store; a failed write does not fail the ranking"""
+    if deps.db_connector is not None:
+        try:
+            await run_blocking(deps.db_connector.save, ranking)
+        except Exception as e:
+            logger.error(f"Failed to store ranking for '{ranking.topic}' in the history: {str(e)}")
+    return ranking
+
+def _record_run(result: Any, model: str) -> None:
+    """Count the model requests, tokens and retries of a finished agent run"""
+    usage = result.usage()
+    retries = sum(
+        1
+        for message in result.all_messages()
+        for part in message.parts
+        if isinstance(part, RetryPromptPart)
+    )
+    LLM_REQUESTS.inc(usage.requests, model=model)
+    if usage.request_tokens:
+        LLM_TOKENS.inc(usage.request_tokens, model=model, kind="request")
+    if usage.response_tokens:
+        LLM_TOKENS.inc(usage.response_tokens, model=model, kind="response")
+    if retries:
+        RETRIES.inc(retries, operation="agent")
+    logger.info(
+        f"Agent run on {model}: {usage.requests} model requests, {usage.total_tokens or 0} tokens, {retries} retries"
+    )
+
+def _complete_items(message: ModelResponse, final: bool) -> List[Dict[str, Any]]:
+    """Return the raw items of the result tool call that the model has finished writing"""
+    for part in message.parts:
+        if not isinstance(part, ToolCallPart) or part.tool_name != RESULT_TOOL_NAME:
+            continue
+        args = part.args_as_json_str()
+        try:
+            data = pydantic_core.from_json(args, allow_partial=True) if args else {}
+        except ValueError:
+            return []
+        items = data.get("items") if isinstance(data, dict) else None
+        if not isinstance(items, list):
+            return []
+        # The last item may still be streaming until the model moves past it
+        if not final and list(data)[-1] == "items":
+            items = items[:-1]
+        return items
+    return []
+
+async def _run_ranking_agent_stream(
+    query: str,
+    on_item: Callable[[RankingItem], None],
+    quality: bool = False
+) -> RankingResult:
+    """
+    Run the ranking agent with a streamed result, calling on_item for each item
+    once its JSON is complete and valid.
+
+    The stream runs on the first model tier. Streamed results cannot be
+    retried by the agent, so a result that fails validation and cannot be
+    repaired, or that cites too few sources, is regenerated with a regular
+    run on the next tier.
+    """
+    router = get_model_router()
+    tiers = router.tiers_for(quality)
+    tier = tiers[0]
+    try:
+        deps = _dependencies()
+        emitted = set()
+        started = time.perf_counter()
+        message = None
+        async with ranking_agent.run_stream(
+            f"Generate top 10 ranking for: {query}",
+            deps=deps,
+            model=tier.model
+        ) as result:
+            async for message, last in result.stream_structured(debounce_by=0.05):
+                for index, raw in enumerate(_complete_items(message, last)):
+                    if index in emitted:
+                        continue
+                    emitted.add(index)
+                    try:
+                        on_item(RankingItem.model_validate(repair_item(raw)))
+                    except ValidationError as e:
+                        logger.debug(f"Streamed item {index} failed validation: {str(e)}")
+            if message is None:
+                raise RankingError(f"The model streamed no ranking for '{query}'")
+            try:
+                draft = await result.validate_structured_result(message)
+            except Exception as e:
+                # ValidationError, or the repair validator asking for a retry
+                logger.warning(f"Streamed ranking for '{query}' failed validation; regenerating: {str(e)}")
+                draft = None
+            router.record_run(tier, time.perf_counter() - started, result.usage())
+            _record_run(result, tier.model_name)
+
+        if draft is None:
+            router.record_decision(tier, "escalated_validation" if len(tiers) > 1 else "retried")
+            return await _run_tiers(query, tiers[1:] or tiers, deps)
+        ranking = RankingResult.model_validate(draft.model_dump())
+        if len(tiers) > 1 and not router.has_coverage(ranking.sources):
+            router.record_decision(tier, "escalated_coverage")
+            logger.info(f"Streamed ranking for '{query}' cites too few sources; escalating")
+            return await _run_tiers(query, tiers[1:], deps)
+        router.record_decision(tier, "accepted")
+        return await _store_ranking(deps, _finalize_ranking(ranking))
+
+    except RankingError:
+        raise
+    except Exception as e:
+        raise RankingError(f"Ranking generation failed: {str(e)}") from e
+
+async def _run_ranking_agent(query: str, quality: bool = False) -> RankingResult:
+    """Run the ranking agent for the given query (uncached), escalating through the model tiers."""
+    try:
+        return await _run_tiers(query, get_model_router().tiers_for(quality), _dependencies())
+    except RankingError:
+        raise
+    except Exception as e:
+        raise RankingError(f"Ranking generation failed: {str(e)}") from e
+
+async def _run_tiers(query: str, tiers: List[ModelTier], deps: RankingDependencies) -> RankingResult:
+    """
+    Run the ranking agent on each tier in turn until one produces an acceptable ranking.
+
+    A tier is skipped for the next one when its ranking fails validation after
+    the agent's retries, or cites too few distinct sources; the last tier's
+    ranking is always accepted.
+    """
+    router = get_model_router()
+    for index, tier in enumerate(tiers):
+        escalate = index < len(tiers) - 1
+        try:
+            ranking = await _run_on_tier(query, tier, deps)
+        except (UnexpectedModelBehavior, ValidationError) as e:
+            if not escalate:
+                router.record_decision(tier, "failed")
+                raise RankingError(f"Ranking generation failed: {str(e)}") from e
+            router.record_decision(tier, "escalated_validation")
+            logger.warning(f"No valid ranking from the {tier.name} model for '{query}'; escalating: {str(e)}")
+            continue
+        if escalate and not router.has_coverage(ranking.sources):
+            router.record_decision(tier, "escalated_coverage")
+            logger.info(f"Ranking from the {tier.name} model for '{query}' cites too few sources; escalating")
+            continue
+        router.record_decision(tier, "accepted")
+        return await _store_ranking(deps, _finalize_ranking(ranking))
+
+async def _run_on_tier(query: str, tier: ModelTier, deps: RankingDependencies) -> RankingResult:
+    started = time.perf_counter()
+    try:
         result = await ranking_agent.run(
             f"Generate top 10 ranking for: {query}",
-            deps=deps
+            deps=deps,
+            model=tier.model
         )
-        
-        current_year = datetime.now(UTC).year
-        if str(current_year) not in result.data.methodology:
-            result.data.methodology = (
-                f"Analysis performed in {current_year}. " + 
-                result.data.methodology
-            )
-        
-        return result.data
-                
-    except Exception as e:
-        raise RankingError(f"Ranking generation failed: {str(e)}") from e 
\ No newline at end of file
+    except Exception:
+        get_model_router().record_run(tier, time.perf_counter() - started)
+        raise
+    get_model_router().record_run(tier, time.perf_counter() - started, result.usage())
+    _record_run(result, tier.model_name)
+    return RankingResult.model_validate(result.data.model_dump())
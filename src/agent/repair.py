@@ -0,0 +1,211 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import re
+import unicodedata
+
+from pydantic import ValidationError
+
+from src.core.telemetry import REGISTRY
+from src.models.ranking import RankingDraft, RankingItem, RankingResult
+
+logger = logging.getLogger(__name__)
+
+RANKING_SIZE = 10
+MAX_ADVANTAGES = 5
+
+REPAIR_FIXES = REGISTRY.counter(
+    "top10_repair_fixes_total", "Deterministic fixes applied to model output", ["kind"]
+)
+ITEMS_REGENERATED = REGISTRY.counter(
+    "top10_repair_items_regenerated_total", "Ranking items sent back to the model individually"
+)
+RETRIES_AVOIDED = REGISTRY.counter(
+    "top10_repair_retries_avoided_total", "Invalid rankings repaired without regenerating the whole result"
+)
+TOKENS_SAVED = REGISTRY.counter(
+    "top10_repair_tokens_saved_total", "Estimated model tokens saved by repairing instead of retrying", ["model"]
+)
+
+# Characters the name pattern rejects that have a readable replacement
+_NAME_REPLACEMENTS = {"&": " and ", "/": "-", "\\": "-", ":": " -", "|": "-", "@": " at "}
+_NAME_DISALLOWED = re.compile(r"[^a-zA-Z0-9#+.\-_ ]")
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+@dataclass
+class RepairReport:
+    """What the deterministic repair changed and what it could not fix"""
+    fixes: Dict[str, int] = field(default_factory=dict)
+    invalid_items: Dict[int, str] = field(default_factory=dict)
+    result_errors: List[str] = field(default_factory=list)
+
+    def fixed(self, kind: str) -> None:
+        self.fixes[kind] = self.fixes.get(kind, 0) + 1
+
+
+def normalize_name(name: str) -> str:
+    """Map a name onto the allowed characters: 'Café & Co. (2024)' -> 'Cafe and Co. 2024'"""
+    for char, replacement in _NAME_REPLACEMENTS.items():
+        name = name.replace(char, replacement)
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    name = _NAME_DISALLOWED.sub("", name)
+    return trim_text(name, 100).strip(" -")
+
+
+def trim_text(text: str, max_length: int) -> str:
+    """Collapse whitespace and cut to max_length, at a sentence or word end when possible"""
+    text = " ".join(text.split())
+    if len(text) <= max_length:
+        return text
+    cut = text[:max_length]
+    sentence_end = cut.rfind(". ")
+    if sentence_end >= max_length // 2:
+        return cut[:sentence_end + 1]
+    word_end = cut.rfind(" ")
+    return cut[:word_end] if word_end >= max_length // 2 else cut
+
+
+def _coerce_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _NUMBER.search(str(value).replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def repair_item(raw: Dict[str, Any], report: Optional[RepairReport] = None) -> Dict[str, Any]:
+    """
+    Apply the deterministic fixes to one raw item dict (rank is left alone)
+
+    Normalizes the name, trims the description, dedups and caps the
+    advantages, coerces metrics to numbers and rescales or clamps the score.
+    """
+    if not isinstance(raw, dict):
+        return raw
+    report = report if report is not None else RepairReport()
+    item = dict(raw)
+
+    name = item.get("name")
+    if isinstance(name, str):
+        normalized = normalize_name(name)
+        if normalized != name:
+            item["name"] = normalized
+            report.fixed("name")
+
+    description = item.get("description")
+    if isinstance(description, str):
+        trimmed = trim_text(description, 500)
+        if trimmed != description:
+            item["description"] = trimmed
+            report.fixed("description")
+
+    advantages = item.get("advantages")
+    if isinstance(advantages, list):
+        unique, seen = [], set()
+        for advantage in advantages:
+            text = trim_text(str(advantage), 200)
+            if text and text.casefold() not in seen:
+                seen.add(text.casefold())
+                unique.append(text)
+        unique = unique[:MAX_ADVANTAGES]
+        if unique != advantages:
+            item["advantages"] = unique
+            report.fixed("advantages")
+
+    metrics = item.get("metrics")
+    if isinstance(metrics, dict):
+        numeric = {}
+        for key, value in metrics.items():
+            number = _coerce_number(value)
+            if number is not None:
+                numeric[str(key)] = number
+        if numeric != metrics:
+            item["metrics"] = numeric
+            report.fixed("metrics")
+
+    score = item.get("score")
+    if score is not None:
+        number = _coerce_number(score)
+        if number is not None and 10 < number <= 100:
+            number /= 10  # percentage-style score
+        fixed = None if number is None else min(10.0, max(0.0, number))
+        if fixed != score:
+            item["score"] = fixed
+            report.fixed("score")
+    return item
+
+
+def repair_draft(draft: RankingDraft) -> Tuple[Dict[str, Any], RepairReport]:
+    """
+    Repair a draft without calling the model
+
+    Returns the repaired data (RankingResult fields) and a report. Items that
+    are still invalid are listed by rank in report.invalid_items; ranks that
+    have no item at all are listed too. Problems outside the items (topic,
+    sources, methodology) go to report.result_errors.
+    """
+    report = RepairReport()
+    data = draft.model_dump()
+
+    topic = trim_text(data["topic"], 50)
+    if topic != data["topic"]:
+        data["topic"] = topic
+        report.fixed("topic")
+
+    items = [repair_item(raw, report) for raw in data["items"]]
+
+    # drop repeated items, then renumber in the model's order of preference
+    unique, names = [], set()
+    for index, item in enumerate(items):
+        key = str(item.get("name", "")).casefold()
+        if key in names:
+            report.fixed("duplicate_item")
+            continue
+        names.add(key)
+        unique.append((item.get("rank") if 1 <= item.get("rank", 0) <= RANKING_SIZE else RANKING_SIZE + 1, index, item))
+    unique.sort(key=lambda entry: entry[:2])
+    if len(unique) > RANKING_SIZE:
+        report.fixed("extra_items")
+        unique = unique[:RANKING_SIZE]
+    renumbered = []
+    for rank, (_, _, item) in enumerate(unique, start=1):
+        if item.get("rank") != rank:
+            report.fixed("rank")
+        renumbered.append(dict(item, rank=rank))
+    data["items"] = renumbered
+
+    for item in renumbered:
+        try:
+            RankingItem.model_validate(item)
+        except ValidationError as e:
+            report.invalid_items[item["rank"]] = _summarize_errors(e)
+    for rank in range(len(renumbered) + 1, RANKING_SIZE + 1):
+        report.invalid_items[rank] = "missing"
+
+    try:
+        RankingResult.model_validate(dict(data, items=[]))
+    except ValidationError as e:
+        report.result_errors = [
+            f"{'.'.join(map(str, error['loc']))}: {error['msg']}"
+            for error in e.errors()
+            if error["loc"][0] != "items"
+        ]
+    for kind, count in report.fixes.items():
+        REPAIR_FIXES.inc(count, kind=kind)
+    return data, report
+
+
+def _summarize_errors(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors()
+    )
+
+
+def is_valid_ranking(data: Dict[str, Any]) -> bool:
+    try:
+        RankingResult.model_validate(data)
+    except ValidationError:
+        return False
+    return True
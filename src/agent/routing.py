@@ -0,0 +1,160 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+
+from src.core.telemetry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DRAFT_TIER = "draft"
+QUALITY_TIER = "quality"
+
+# USD per million request/response tokens, overridable with MODEL_COSTS
+DEFAULT_MODEL_COSTS: Dict[str, Tuple[float, float]] = {
+    "openai:gpt-4o": (2.50, 10.00),
+    "openai:gpt-4o-mini": (0.15, 0.60),
+}
+
+ROUTING_DECISIONS = REGISTRY.counter(
+    "top10_model_routing_total", "Ranking runs per model tier and routing decision", ["tier", "decision"]
+)
+TIER_SECONDS = REGISTRY.histogram(
+    "top10_model_tier_duration_seconds", "Duration of ranking runs per model tier", ["tier"]
+)
+TIER_COST = REGISTRY.counter(
+    "top10_model_cost_usd_total", "Estimated model cost of ranking runs per tier", ["tier"]
+)
+
+
+def parse_model_costs(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse 'model=input/output,...' (USD per million tokens), e.g. 'openai:gpt-4o=2.5/10'"""
+    costs = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        model, _, prices = entry.partition("=")
+        request_price, _, response_price = prices.partition("/")
+        costs[model.strip()] = (float(request_price), float(response_price or request_price))
+    return costs
+
+
+@dataclass
+class ModelTier:
+    """One model the router can run the ranking agent on"""
+    name: str
+    model_name: str
+    request_cost: float = 0.0
+    response_cost: float = 0.0
+    _model: Any = field(default=None, repr=False)
+
+    @property
+    def upstream(self) -> str:
+        """The provider whose rate limits the model's requests count against"""
+        return self.model_name.split(":", 1)[0] if ":" in self.model_name else "openai"
+
+    @property
+    def model(self) -> Any:
+        """
+        The pydantic-ai model, created once so its HTTP client is reused across
+        runs; its requests go through the upstream's adaptive rate limiter
+        """
+        if self._model is None:
+            from pydantic_ai.models import infer_model
+            from src.agent.throttling import RateLimitedModel
+            self._model = RateLimitedModel(infer_model(self.model_name), self.upstream)
+        return self._model
+
+    def cost(self, usage: Any) -> float:
+        """Estimated USD cost of a run's usage"""
+        return (
+            (usage.request_tokens or 0) * self.request_cost
+            + (usage.response_tokens or 0) * self.response_cost
+        ) / 1_000_000
+
+
+class ModelRouter:
+    """
+    Chooses the model tiers a ranking runs on.
+
+    Rankings are drafted on the first (cheapest) tier and escalate to the
+    next one when the draft fails validation or cites fewer than
+    min_sources distinct domains. Requests flagged for quality start on the
+    last tier.
+    """
+
+    def __init__(self, tiers: List[ModelTier], min_sources: int = 2):
+        if not tiers:
+            raise ValueError("At least one model tier is required")
+        self.tiers = tiers
+        self.min_sources = min_sources
+        self._stats: Dict[str, Dict[str, float]] = {
+            tier.name: {"runs": 0, "seconds": 0.0, "cost_usd": 0.0} for tier in tiers
+        }
+
+    def tiers_for(self, quality: bool = False) -> List[ModelTier]:
+        """The escalation chain for a request"""
+        return self.tiers[-1:] if quality else self.tiers
+
+    def has_coverage(self, sources: Iterable[str]) -> bool:
+        """Whether a ranking cites enough distinct source domains"""
+        domains = {urlparse(source).netloc.lower().removeprefix("www.") or source for source in sources}
+        return len(domains) >= self.min_sources
+
+    def record_run(self, tier: ModelTier, seconds: float, usage: Optional[Any] = None) -> None:
+        stats = self._stats[tier.name]
+        stats["runs"] += 1
+        stats["seconds"] += seconds
+        TIER_SECONDS.observe(seconds, tier=tier.name)
+        if usage is not None:
+            cost = tier.cost(usage)
+            stats["cost_usd"] += cost
+            TIER_COST.inc(cost, tier=tier.name)
+
+    def record_decision(self, tier: ModelTier, decision: str) -> None:
+        stats = self._stats[tier.name]
+        stats[decision] = stats.get(decision, 0) + 1
+        ROUTING_DECISIONS.inc(tier=tier.name, decision=decision)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for tier in self.tiers:
+            stats = dict(self._stats[tier.name])
+            stats["model"] = tier.model_name
+            stats["avg_seconds"] = round(stats["seconds"] / stats["runs"], 3) if stats["runs"] else 0.0
+            stats["seconds"] = round(stats["seconds"], 3)
+            stats["cost_usd"] = round(stats["cost_usd"], 6)
+            result[tier.name] = stats
+        return result
+
+
+_model_router: Optional[ModelRouter] = None
+
+
+def configure_model_router(
+    quality_model: str = "openai:gpt-4o",
+    draft_model: Optional[str] = "openai:gpt-4o-mini",
+    min_sources: int = 2,
+    costs: Optional[Dict[str, Tuple[float, float]]] = None
+) -> ModelRouter:
+    """Replace the process-wide router; an empty draft_model runs every ranking on the quality model"""
+    global _model_router
+    prices = {**DEFAULT_MODEL_COSTS, **(costs or {})}
+
+    def tier(name: str, model_name: str) -> ModelTier:
+        request_cost, response_cost = prices.get(model_name, (0.0, 0.0))
+        return ModelTier(name, model_name, request_cost, response_cost)
+
+    tiers = [tier(QUALITY_TIER, quality_model)]
+    if draft_model and draft_model != quality_model:
+        tiers.insert(0, tier(DRAFT_TIER, draft_model))
+    _model_router = ModelRouter(tiers, min_sources=min_sources)
+    logger.info(f"Model tiers: {', '.join(f'{t.name}={t.model_name}' for t in tiers)}")
+    return _model_router
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide router, creating the default one if needed"""
+    if _model_router is None:
+        return configure_model_router()
+    return _model_router
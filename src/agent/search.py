@@ -1,35 +1,103 @@
+import asyncio
 import logging
-from typing import List, Dict
+import queue
+import re
+import threading
+import unicodedata
+from contextlib import contextmanager
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, List, Dict, Optional, Set, Tuple, Union
 from duckduckgo_search import DDGS
 from duckduckgo_search.exceptions import (
     RatelimitException,
     TimeoutException,
     DuckDuckGoSearchException
 )
+from src.core.aio import run_blocking, BlockingCallTimeout
+from src.core.ratelimit import get_upstream_limiter
+from src.core.cache import CacheBackend, MemoryCache, SingleFlight, SqliteCache
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_SEARCH_TIMEOUT = 20.0
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a search query for cache lookups: only case and whitespace are folded"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query).casefold()).strip()
+
+class DDGSPool:
+    """Fixed-size pool of long-lived DDGS sessions shared by all searches"""
+
+    def __init__(self, size: int = 4, timeout: float = DEFAULT_SEARCH_TIMEOUT):
+        self.size = max(1, size)
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[DDGS]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def client(self) -> Iterator[DDGS]:
+        """Borrow a session, creating one lazily until the pool is full (blocking)"""
+        ddgs = self._acquire()
+        try:
+            yield ddgs
+        finally:
+            self._idle.put(ddgs)
+
+    def _acquire(self) -> DDGS:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return DDGS(timeout=max(1, int(self.timeout)))
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutException(f"No search session available after {self.timeout}s")
+
 class DuckDuckGoAPI:
-    def __init__(self):
-        self.ddgs = DDGS()
+    def __init__(self, timeout: float = DEFAULT_SEARCH_TIMEOUT, pool: Optional[DDGSPool] = None):
+        self.pool = pool if pool is not None else DDGSPool(size=1, timeout=timeout)
+        self.timeout = timeout
     
     async def search(self, query: str) -> List[Dict]:
         logger.debug(f"Searching for: {query}")
         try:
-            results = self.ddgs.text(
+            # DDGS is synchronous; run it on the shared executor so the event loop stays free.
+            # The upstream limiter paces searches and retries them when DuckDuckGo rate limits.
+            results = await get_upstream_limiter("duckduckgo").call(
+                run_blocking,
+                self._text,
                 f"top 10 {query}",
-                region='wt-wt',
-                safesearch='moderate',
-                max_results=10
+                max_results=10,
+                timeout=self.timeout
             )
             return self._format_results(results)
+        except BlockingCallTimeout as e:
+            logger.error(f"Search timed out: {str(e)}")
+            raise SearchError(f"Search API error: {str(e)}", e)
         except (RatelimitException, TimeoutException) as e:
             logger.error(f"Search error: {str(e)}")
-            raise SearchError(f"Search API error: {str(e)}")
+            raise SearchError(f"Search API error: {str(e)}", e)
         except DuckDuckGoSearchException as e:
             logger.error(f"Search failed: {str(e)}")
             raise
 
+    def _text(self, query: str, max_results: int) -> list:
+        """Run a text search on a pooled DDGS session (blocking)"""
+        with self.pool.client() as ddgs:
+            return ddgs.text(
+                query,
+                region='wt-wt',
+                safesearch='moderate',
+                max_results=max_results
+            )
+
     def _format_results(self, data: list) -> List[Dict]:
         return [{
             "title": result.get("title", ""),
@@ -39,7 +107,8 @@ class DuckDuckGoAPI:
             "category": ""  # Not available in basic text search
         } for result in data]
 
-    def _extract_domain(self, url: str) -> str:
+    @staticmethod
+    def _extract_domain(url: str) -> str:
         from urllib.parse import urlparse
         parsed = urlparse(url)
         return parsed.netloc.replace("www.", "")
@@ -51,7 +120,214 @@ class SearchError(Exception):
         self.original_error = original_error
         super().__init__(self.message)
 
+class SearchCache:
+    """
+    Query-result cache with stale-while-revalidate.
+
+    Results younger than ttl are served directly. Results older than ttl but
+    within ttl + stale_ttl are served immediately while a background refresh
+    runs. When a refresh or fetch fails (e.g. DuckDuckGo rate limiting) any
+    cached result is served instead of the error.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttl: float = 900.0,
+        stale_ttl: float = 3600.0
+    ):
+        self.backend = backend if backend is not None else MemoryCache(max_entries=2048)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.errors_served_stale = 0
+        self.refresh_errors = 0
+        self._flight = SingleFlight()
+        self._refreshes: Set[asyncio.Task] = set()
+
+    async def get_or_fetch(
+        self,
+        query: str,
+        fetch: Callable[[str], Awaitable[List[Dict]]]
+    ) -> List[Dict]:
+        # every word changes the results, so unlike ranking topics nothing is stripped
+        key = normalize_query(query)
+        entry = self.backend.get(key)
+        if entry is not None:
+            if entry.age <= self.ttl:
+                self.hits += 1
+                return entry.value
+            if entry.age <= self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                self._revalidate(key, query, fetch)
+                return entry.value
+
+        self.misses += 1
+        try:
+            results, _ = await self._flight.do(key, lambda: self._fetch_and_store(key, query, fetch))
+        except SearchError:
+            if entry is None:
+                raise
+            self.errors_served_stale += 1
+            logger.warning(f"Search failed, serving expired results for: {query}")
+            return entry.value
+        return results
+
+    async def _fetch_and_store(
+        self,
+        key: str,
+        query: str,
+        fetch: Callable[[str], Awaitable[List[Dict]]]
+    ) -> List[Dict]:
+        results = await fetch(query)
+        # Empty results are not cached so that agent retries hit the API again
+        if results:
+            self.backend.set(key, results)
+        return results
+
+    def _revalidate(self, key: str, query: str, fetch: Callable[[str], Awaitable[List[Dict]]]) -> None:
+        if key in self._flight:
+            return
+        task = asyncio.create_task(self._refresh(key, query, fetch))
+        self._refreshes.add(task)
+        task.add_done_callback(self._refreshes.discard)
+
+    async def _refresh(self, key: str, query: str, fetch: Callable[[str], Awaitable[List[Dict]]]) -> None:
+        try:
+            await self._flight.do(key, lambda: self._fetch_and_store(key, query, fetch))
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Background search refresh failed for '{query}': {str(e)}")
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            "entries": len(self.backend),
+            "ttl_seconds": self.ttl,
+            "stale_ttl_seconds": self.stale_ttl,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "errors_served_stale": self.errors_served_stale,
+            "refresh_errors": self.refresh_errors,
+        }
+
+_search_client: Optional[DuckDuckGoAPI] = None
+_search_cache: Optional[SearchCache] = None
+_fanout_concurrency = 4
+
+def configure_search(
+    timeout: float = DEFAULT_SEARCH_TIMEOUT,
+    pool_size: int = 4,
+    cache_ttl: float = 900.0,
+    cache_stale_ttl: float = 3600.0,
+    cache_size: int = 2048,
+    cache_path: Optional[Union[str, Path]] = None,
+    fanout_concurrency: int = 4
+) -> None:
+    """Configure the shared search client and result cache used by web_search"""
+    global _search_client, _search_cache, _fanout_concurrency
+    _fanout_concurrency = max(1, fanout_concurrency)
+    _search_client = DuckDuckGoAPI(timeout=timeout, pool=DDGSPool(size=pool_size, timeout=timeout))
+    if cache_path:
+        backend = SqliteCache(cache_path, max_entries=cache_size, table="search_results")
+    else:
+        backend = MemoryCache(max_entries=cache_size)
+    _search_cache = SearchCache(backend, ttl=cache_ttl, stale_ttl=cache_stale_ttl)
+
+def get_search_client() -> DuckDuckGoAPI:
+    if _search_client is None:
+        configure_search()
+    return _search_client
+
+def get_search_cache() -> SearchCache:
+    if _search_cache is None:
+        configure_search()
+    return _search_cache
+
 async def web_search(query: str) -> List[Dict[str, str]]:
     """Perform search using duckduckgo-search library"""
-    api = DuckDuckGoAPI()
-    return await api.search(query) 
\ No newline at end of file
+    return await get_search_cache().get_or_fetch(query, get_search_client().search)
+
+def build_query_variants(query: str, year: Optional[int] = None) -> List[str]:
+    """Default query variants used to collect evidence from different angles"""
+    year = year or datetime.now(UTC).year
+    return [
+        query,
+        f"{query} reviews",
+        f"{query} statistics",
+        f"{query} {year}",
+        f"{query} expert comparison",
+    ]
+
+def _canonical_url(url: str) -> str:
+    return url.split("#", 1)[0].rstrip("/").lower()
+
+async def fanout_search(
+    query: str,
+    variants: Optional[List[str]] = None,
+    search: Callable[[str], Awaitable[List[Dict]]] = web_search,
+    max_concurrency: Optional[int] = None,
+    max_results: int = 20,
+    max_per_domain: int = 2
+) -> List[Dict[str, Any]]:
+    """
+    Run several query variants concurrently and merge them into one evidence set.
+
+    Results are deduplicated by URL and ranked by how many variants returned
+    them, then by their best position. At most max_per_domain results are kept
+    per domain so the evidence covers several independent sources.
+
+    Raises:
+        SearchError: if every variant failed
+    """
+    queries = list(dict.fromkeys(variants or build_query_variants(query)))
+    semaphore = asyncio.Semaphore(max_concurrency or _fanout_concurrency)
+
+    async def run(variant: str) -> List[Dict]:
+        async with semaphore:
+            return await search(variant)
+
+    responses = await asyncio.gather(*(run(q) for q in queries), return_exceptions=True)
+    failures = [r for r in responses if isinstance(r, Exception)]
+    if failures and len(failures) == len(responses):
+        first = failures[0]
+        raise SearchError(f"All {len(queries)} searches failed: {str(first)}", first)
+    for variant, response in zip(queries, responses):
+        if isinstance(response, Exception):
+            logger.warning(f"Search variant '{variant}' failed: {str(response)}")
+
+    merged: Dict[str, Dict[str, Any]] = {}
+    ranking_keys: Dict[str, Tuple[int, int]] = {}
+    for response in responses:
+        if isinstance(response, Exception):
+            continue
+        for position, result in enumerate(response):
+            link = result.get("link", "")
+            if not link:
+                continue
+            key = _canonical_url(link)
+            if key not in merged:
+                merged[key] = dict(
+                    result,
+                    source=result.get("source") or DuckDuckGoAPI._extract_domain(link),
+                    mentions=0
+                )
+                ranking_keys[key] = (0, position)
+            merged[key]["mentions"] += 1
+            mentions, best = ranking_keys[key]
+            ranking_keys[key] = (mentions + 1, min(best, position))
+
+    ordered = sorted(merged, key=lambda k: (-ranking_keys[k][0], ranking_keys[k][1]))
+    per_domain: Dict[str, int] = {}
+    evidence = []
+    for key in ordered:
+        domain = merged[key]["source"]
+        if per_domain.get(domain, 0) >= max_per_domain:
+            continue
+        per_domain[domain] = per_domain.get(domain, 0) + 1
+        evidence.append(merged[key])
+        if len(evidence) >= max_results:
+            break
+    return evidence
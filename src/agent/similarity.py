@@ -0,0 +1,175 @@
+from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+import logging
+import re
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stopwords only: words like "market", "now" or "most" can change what is
+# ranked, so topics differing in them are different topics
+_STOPWORDS = frozenset({"a", "an", "and", "the", "in", "of", "for", "on", "to", "by", "with"})
+_NUMBER = re.compile(r"\d+")
+# Each significant word is also a feature this many times, so topics that
+# differ in one short word ("... in the uk" / "... in the usa") stay apart
+_WORD_WEIGHT = 2
+
+_PRIME = (1 << 31) - 1
+
+
+def significant_words(topic: str) -> List[str]:
+    """Words of a normalized topic without stopwords, plural 's' stripped"""
+    return [
+        word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+        for word in re.findall(r"[\w#+]+", topic)
+        if word not in _STOPWORDS
+    ]
+
+
+def topic_numbers(topic: str) -> FrozenSet[str]:
+    """
+    Numbers in the topic (years, counts, prices, model numbers)
+
+    Topics only match when these are equal: "movies of 1994" and "movies of
+    2023" or "ps4 games" and "ps5 games" rank different things.
+    """
+    return frozenset(str(int(number)) for number in _NUMBER.findall(topic))
+
+
+def topic_shingles(topic: str, n: int = 3) -> Set[str]:
+    """
+    Character n-grams and words of the topic's significant words
+
+    Expects a topic already passed through normalize_topic; stopwords are
+    dropped and plural 's' is stripped, so "Best electric cars in the UK"
+    and "electric car in uk" have the same shingles. Raises ValueError for
+    topics without significant words ("", "the", "of the"), which would
+    otherwise all look alike.
+    """
+    words = significant_words(topic)
+    if not words:
+        raise ValueError(f"Topic '{topic}' has no significant words")
+    padded = f" {' '.join(words)} "
+    shingles = {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+    for weight in range(_WORD_WEIGHT):
+        shingles.update(f"{weight}:{word}" for word in words)
+    return shingles
+
+
+class TopicIndex:
+    """
+    In-memory MinHash/LSH index of topics for near-duplicate lookups.
+
+    Each topic is reduced to a MinHash signature of num_hashes values over
+    its shingles; the signature is split into bands and topics sharing any
+    band become candidates, whose Jaccard similarity is then estimated from
+    the signatures. Candidates whose numbers differ from the query's are
+    never returned. Lookups only touch the candidates, so their cost stays
+    flat as the index grows. The default 16 bands of 8 rows make topics
+    above ~0.7 similarity candidates and keep dissimilar ones out, which
+    suits thresholds of 0.7 and up.
+
+    Removed topics leave their buckets and their slot is reused by the next
+    add, so the index only grows with the number of live topics.
+    """
+
+    def __init__(self, num_hashes: int = 128, bands: int = 16, seed: int = 1):
+        if num_hashes % bands:
+            raise ValueError("num_hashes must be a multiple of bands")
+        self.num_hashes = num_hashes
+        self.bands = bands
+        self.rows = num_hashes // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_hashes, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_hashes, dtype=np.uint64)
+        # odd multipliers that fold each band's rows into one bucket key
+        self._band_mix = rng.integers(0, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        # hash values are below 2**31, so signatures fit in uint32
+        self._signatures = np.empty((1024, num_hashes), dtype=np.uint32)
+        self._keys: List[Optional[str]] = []
+        self._numbers: List[FrozenSet[str]] = []
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._buckets: List[Dict[int, List[int]]] = [defaultdict(list) for _ in range(bands)]
+
+    def signature(self, topic: str) -> np.ndarray:
+        """MinHash signature of a normalized topic"""
+        grams = np.fromiter(
+            (zlib.crc32(gram.encode()) % _PRIME for gram in topic_shingles(topic)),
+            dtype=np.uint64
+        )
+        # (a * x + b) mod p stays below 2**62, so uint64 never overflows
+        return ((np.outer(grams, self._a) + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[int]:
+        rows = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        return (rows * self._band_mix).sum(axis=1).tolist()
+
+    def add(self, key: str) -> None:
+        """
+        Index a normalized topic; adding an indexed key again is a no-op
+
+        Raises ValueError for keys without significant words.
+        """
+        if key in self._ids:
+            return
+        signature = self.signature(key)
+        if self._free:
+            index = self._free.pop()
+            self._keys[index] = key
+            self._numbers[index] = topic_numbers(key)
+        else:
+            index = len(self._keys)
+            if index == len(self._signatures):
+                self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+            self._keys.append(key)
+            self._numbers.append(topic_numbers(key))
+        self._signatures[index] = signature
+        self._ids[key] = index
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band[band_key].append(index)
+
+    def remove(self, key: str) -> None:
+        """Drop key from the index and free its slot; unknown keys are ignored"""
+        index = self._ids.pop(key, None)
+        if index is None:
+            return
+        for band, band_key in zip(self._buckets, self._band_keys(self._signatures[index])):
+            bucket = band[band_key]
+            bucket.remove(index)
+            if not bucket:
+                del band[band_key]
+        self._keys[index] = None
+        self._numbers[index] = frozenset()
+        self._free.append(index)
+
+    def lookup(self, topic: str, threshold: float = 0.0) -> Optional[Tuple[str, float]]:
+        """
+        The indexed topic most similar to topic and its estimated Jaccard
+        similarity, if >= threshold; None for topics without significant words
+        """
+        try:
+            signature = self.signature(topic)
+        except ValueError:
+            return None
+        numbers = topic_numbers(topic)
+        candidates = set()
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(band_key, ()))
+        candidates = [index for index in candidates if self._numbers[index] == numbers]
+        if not candidates:
+            return None
+        ids = np.fromiter(candidates, dtype=np.intp, count=len(candidates))
+        similarity = (self._signatures[ids] == signature).mean(axis=1)
+        best = int(similarity.argmax())
+        if similarity[best] < threshold:
+            return None
+        return self._keys[ids[best]], float(similarity[best])
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ids
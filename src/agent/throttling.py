@@ -0,0 +1,67 @@
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic_ai.messages import ModelMessage, ModelResponse
+from pydantic_ai.models import AgentModel, Model, StreamedResponse
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import Usage
+
+from src.core.ratelimit import get_upstream_limiter
+
+
+class RateLimitedModel(Model):
+    """
+    Wraps a pydantic-ai model so every request passes through the adaptive
+    limiter of its upstream (see src.core.ratelimit.AdaptiveLimiter)
+    """
+
+    def __init__(self, wrapped: Model, upstream: str):
+        self.wrapped = wrapped
+        self.upstream = upstream
+
+    async def agent_model(self, **kwargs) -> AgentModel:
+        return RateLimitedAgentModel(await self.wrapped.agent_model(**kwargs), self.upstream)
+
+    def name(self) -> str:
+        return self.wrapped.name()
+
+
+class RateLimitedAgentModel(AgentModel):
+    def __init__(self, wrapped: AgentModel, upstream: str):
+        self.wrapped = wrapped
+        self.upstream = upstream
+
+    async def request(
+        self, messages: List[ModelMessage], model_settings: Optional[ModelSettings]
+    ) -> Tuple[ModelResponse, Usage]:
+        # looked up per request: the limiters are replaced when the app starts
+        limiter = get_upstream_limiter(self.upstream)
+        return await limiter.call(self.wrapped.request, messages, model_settings)
+
+    @asynccontextmanager
+    async def request_stream(
+        self, messages: List[ModelMessage], model_settings: Optional[ModelSettings]
+    ) -> AsyncIterator[StreamedResponse]:
+        limiter = get_upstream_limiter(self.upstream)
+        attempt = 0
+        while True:
+            await limiter.acquire()
+            stack = AsyncExitStack()
+            try:
+                # only opening the stream is retried; the slot is held while it is read
+                response = await stack.enter_async_context(
+                    self.wrapped.request_stream(messages, model_settings)
+                )
+            except BaseException as e:
+                if limiter.release(e) and attempt < limiter.retries:
+                    attempt += 1
+                    continue
+                raise
+            break
+        try:
+            async with stack:
+                yield response
+        except BaseException as e:
+            limiter.release(e)
+            raise
+        limiter.release()
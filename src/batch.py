@@ -0,0 +1,95 @@
+"""
+Rank many topics in one run and publish them in a single Tableau update.
+
+Usage:
+    python -m src.batch "Programming languages" "Databases"
+    python -m src.batch --file topics.jsonl [--batch-id ID] [--concurrency N]
+
+A topics file holds one topic per line, either as plain text or as JSON
+(a string or an object with a "topic" field). Re-running with the batch_id
+of a crashed batch resumes it from its checkpoint.
+"""
+from pathlib import Path
+from typing import List
+import argparse
+import asyncio
+import json
+import logging
+import sys
+
+from dotenv import load_dotenv
+from fastapi.encoders import jsonable_encoder
+
+from src.core.config import Settings
+from src.core.telemetry import configure_logging, set_trace_id
+from src.web.services.batch_service import BatchRankingService
+from src.web.services.container import ServiceContainer
+
+logger = logging.getLogger(__name__)
+
+
+def read_topics(path: Path) -> List[str]:
+    topics = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                value = json.loads(line)
+            except json.JSONDecodeError:
+                value = line
+            topics.append(value["topic"] if isinstance(value, dict) else str(value))
+    return topics
+
+
+async def run_batch(topics: List[str], batch_id: str, concurrency: int) -> dict:
+    if batch_id:
+        set_trace_id(batch_id)
+    settings = Settings.from_env()
+    services = ServiceContainer.from_settings(settings)
+    await services.start()
+    try:
+        service = BatchRankingService(
+            services.publisher,
+            job_monitor=services.job_monitor,
+            concurrency=concurrency or settings.batch_concurrency,
+            checkpoint_dir=Path(settings.batch_checkpoint_dir)
+        )
+
+        async def on_stage(stage: str, data: dict) -> None:
+            if stage == "topic":
+                logger.info(f"[{data['status']}] {data['topic']}")
+
+        return await service.run(topics, batch_id=batch_id, on_stage=on_stage)
+    finally:
+        await services.aclose()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate rankings for many topics")
+    parser.add_argument("topics", nargs="*", help="Topics to rank")
+    parser.add_argument("--file", type=Path, help="Text or JSONL file with one topic per line")
+    parser.add_argument("--batch-id", help="Resume the batch with this id")
+    parser.add_argument("--concurrency", type=int, default=0, help="Concurrent generations")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_logging(Settings.from_env().log_level)
+
+    topics = list(args.topics)
+    if args.file:
+        topics.extend(read_topics(args.file))
+    if not topics:
+        parser.error("no topics given")
+    if args.batch_id:
+        BatchRankingService.validate_batch_id(args.batch_id)
+
+    result = asyncio.run(run_batch(topics, args.batch_id, args.concurrency))
+    json.dump(jsonable_encoder(result), sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0 if result["status"] == "success" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Shared runtime helpers (configuration, concurrency, caching) used across packages"""
@@ -0,0 +1,79 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
+import contextvars
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_max_workers: int = 32
+
+
+class BlockingCallTimeout(TimeoutError):
+    """Raised when an offloaded blocking call exceeds its timeout"""
+    pass
+
+
+def configure_executor(max_workers: int) -> None:
+    """Set the size of the shared blocking-I/O executor (applies on next creation)"""
+    global _max_workers
+    _max_workers = max(1, max_workers)
+    if _executor is not None and _executor._max_workers != _max_workers:
+        shutdown_executor(wait=False)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared executor used for blocking network and file I/O"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="blocking-io")
+        logger.info(f"Created blocking I/O executor with {_max_workers} threads")
+    return _executor
+
+
+def shutdown_executor(wait: bool = True) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait, cancel_futures=True)
+        _executor = None
+
+
+async def run_blocking(
+    func: Callable[..., T],
+    *args: Any,
+    timeout: Optional[float] = None,
+    **kwargs: Any
+) -> T:
+    """
+    Run a blocking callable on the shared executor without blocking the event loop.
+
+    Args:
+        func: Synchronous callable to run
+        timeout: Seconds to wait before raising BlockingCallTimeout (None = no limit)
+
+    Cancelling the awaiting task (or hitting the timeout) stops waiting immediately;
+    a call that has not started yet is dropped from the executor queue, while one
+    that is already running finishes in its thread and its result is discarded.
+
+    The call runs in a copy of the caller's context, so its log lines carry
+    the caller's trace id.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    future = loop.run_in_executor(get_executor(), partial(context.run, func, *args, **kwargs))
+    # Not asyncio.wait_for: before Python 3.12 it swallows a cancellation that
+    # arrives just as the call finishes, so a cancelled loop would keep running
+    try:
+        done, _ = await asyncio.wait({future}, timeout=timeout)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    if not done:
+        future.cancel()
+        name = getattr(func, "__qualname__", repr(func))
+        raise BlockingCallTimeout(f"{name} timed out after {timeout}s")
+    return future.result()
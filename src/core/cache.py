@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Protocol, Tuple, TypeVar, Union
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+T = TypeVar("T")
+
+# DELETE ... RETURNING needs SQLite 3.35+; older libraries select the evicted keys first
+_DELETE_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+@dataclass
+class CacheEntry:
+    """A cached value together with the time it was stored"""
+    value: Any
+    stored_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class CacheBackend(Protocol):
+    """
+    Storage interface shared by the in-memory and on-disk caches
+
+    on_evict, when set, is called with each key the backend drops to stay
+    within max_entries (not for delete() or clear()).
+    """
+
+    on_evict: Optional[Callable[[str], None]]
+
+    def get(self, key: str) -> Optional[CacheEntry]: ...
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def keys(self) -> List[str]: ...
+
+    def clear(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+def _notify_evicted(on_evict: Optional[Callable[[str], None]], keys: List[str]) -> None:
+    """Report evicted keys outside the backend lock, so the callback may use the cache"""
+    if on_evict is not None:
+        for key in keys:
+            on_evict(key)
+
+
+class MemoryCache:
+    """Thread-safe in-process LRU cache"""
+
+    def __init__(self, max_entries: int = 1024, on_evict: Optional[Callable[[str], None]] = None):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        evicted = []
+        with self._lock:
+            self._data[key] = CacheEntry(value, stored_at if stored_at is not None else time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                evicted.append(self._data.popitem(last=False)[0])
+        _notify_evicted(self.on_evict, evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCache:
+    """
+    LRU cache persisted in a SQLite file so entries survive restarts.
+
+    Values must be JSON-serializable.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_entries: int = 10000,
+        table: str = "cache",
+        on_evict: Optional[Callable[[str], None]] = None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.table}_accessed_at ON {self.table} (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                f"SELECT value, stored_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+        return CacheEntry(json.loads(row[0]), row[1])
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), stored_at if stored_at is not None else now, now)
+            )
+            evicted = self._evict()
+        _notify_evicted(self.on_evict, evicted)
+
+    def _evict(self) -> List[str]:
+        """Delete the least recently used entries beyond max_entries; holds the lock"""
+        stale = f"SELECT key FROM {self.table} ORDER BY accessed_at DESC LIMIT -1 OFFSET ?"
+        if _DELETE_RETURNING:
+            return [row[0] for row in self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ({stale}) RETURNING key", (self.max_entries,)
+            )]
+        evicted = [row[0] for row in self._conn.execute(stale, (self.max_entries,))]
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", [(key,) for key in evicted])
+        return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute(f"SELECT key FROM {self.table}")]
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one in-flight call"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run fn for key unless a call for the same key is already running.
+
+        Returns:
+            Tuple of (result, shared) where shared is True when the result came
+            from another caller's in-flight call
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future), True
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the exception as retrieved when nobody else is waiting on it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            self._inflight.pop(key, None)
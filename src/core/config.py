@@ -0,0 +1,193 @@
+import os
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from src.agent.routing import parse_model_costs
+from src.core.ratelimit import parse_rate_limits
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class Settings:
+    """Environment-driven application settings"""
+    tableau_server_url: Optional[str] = None
+    tableau_site_name: Optional[str] = None
+    tableau_token_name: Optional[str] = None
+    tableau_token_value: Optional[str] = None
+    tableau_datasource_name: Optional[str] = None
+
+    # Background analysis jobs: job_workers caps the pipelines in flight and
+    # job_queue_limit the jobs waiting for a worker (0 = unbounded); beyond
+    # it new jobs are rejected with 429/503 and Retry-After
+    job_workers: int = 4
+    job_history_limit: int = 1000
+    job_queue_limit: int = 100
+
+    # Blocking I/O offloading and per-call timeouts (seconds)
+    io_threads: int = 32
+    search_timeout: float = 20.0
+    tableau_timeout: float = 120.0
+
+    # Topic-level ranking cache (TTL 0 disables; a path enables the SQLite backend)
+    ranking_cache_ttl: float = 3600.0
+    ranking_cache_size: int = 256
+    ranking_cache_path: Optional[str] = None
+    # Estimated Jaccard similarity (0-1) at which a cached ranking is reused for
+    # a paraphrased topic (0, the default, disables; 0.8 is a good start). Only
+    # topics still in the ranking cache (ranking_cache_size) are compared, not
+    # past topics in the ranking history
+    ranking_similarity_threshold: float = 0.0
+    # Local store of every generated ranking served by /api/rankings (empty disables)
+    ranking_history_path: Optional[str] = "data/history/rankings.sqlite"
+
+    # Web search session pool and stale-while-revalidate result cache
+    search_pool_size: int = 4
+    search_cache_ttl: float = 900.0
+    search_cache_stale_ttl: float = 3600.0
+    search_cache_size: int = 2048
+    search_cache_path: Optional[str] = None
+    search_fanout_concurrency: int = 4
+
+    # Shared Tableau session and datasource lookup cache (seconds)
+    tableau_session_ttl: float = 3600.0
+    tableau_datasource_cache_ttl: float = 300.0
+    tableau_datasource_refresh_seconds: float = 240.0
+
+    # Shared Tableau job poller interval bounds (seconds)
+    tableau_job_poll_min_seconds: float = 1.0
+    tableau_job_poll_max_seconds: float = 15.0
+
+    # Chunked Hyper file uploads: chunk size (MB) and retries per chunk
+    tableau_upload_chunk_mb: int = 4
+    tableau_upload_retries: int = 3
+
+    # Micro-batching of Tableau updates (flush interval 0 disables batching)
+    tableau_batch_max_rows: int = 500
+    tableau_batch_flush_seconds: float = 2.0
+
+    # Shared Hyper process: number of pooled connections and where hyperd writes its logs
+    hyper_pool_size: int = 4
+    hyper_log_dir: str = "data/logs"
+    # Extract layout: "flat" (one Rankings table) or "normalized" (star schema)
+    hyper_layout: str = "flat"
+    # Column whose rows each update replaces ("batch_id", "topic"; unset appends only),
+    # optional local archive of everything published, and temp file retention
+    tableau_upsert_key: Optional[str] = None
+    hyper_archive_path: Optional[str] = None
+    tableau_keep_temp_files: bool = False
+
+    # Bulk ranking: concurrent generations, checkpoint directory and
+    # per-provider request limits (per minute, e.g. {"openai": 60})
+    batch_concurrency: int = 4
+    batch_checkpoint_dir: str = "data/batches"
+    provider_rate_limits: Dict[str, float] = field(default_factory=dict)
+
+    # Outbound calls to openai, duckduckgo and tableau: requests per minute
+    # (token bucket; unset = none) and the concurrency each upstream's
+    # adaptive window grows back to after rate-limit responses halve it
+    upstream_rate_limits: Dict[str, float] = field(default_factory=dict)
+    upstream_concurrency: Dict[str, float] = field(default_factory=dict)
+    upstream_cooldown: float = 5.0
+    upstream_retries: int = 2
+
+    # Model tiers: rankings are drafted on the draft model (empty disables) and
+    # escalate to the quality model on validation failure or fewer than
+    # ranking_min_sources distinct source domains; model_costs are USD per
+    # million request/response tokens
+    ranking_model_quality: str = "openai:gpt-4o"
+    ranking_model_draft: Optional[str] = "openai:gpt-4o-mini"
+    ranking_min_sources: int = 2
+    model_costs: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+
+    # Load the ranking agent and start the Hyper process before the worker
+    # reports ready, instead of on the first requests that need them
+    warmup_on_start: bool = False
+
+    # Root log level; every line carries the request or job trace id
+    log_level: str = "INFO"
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from environment variables (call after load_dotenv)"""
+        return cls(
+            tableau_server_url=os.getenv("TABLEAU_SERVER_URL"),
+            tableau_site_name=os.getenv("TABLEAU_SITE_NAME"),
+            tableau_token_name=os.getenv("TABLEAU_TOKEN_NAME"),
+            tableau_token_value=os.getenv("TABLEAU_TOKEN_VALUE"),
+            tableau_datasource_name=os.getenv("TABLEAU_DATASOURCE_NAME"),
+            job_workers=_env_int("JOB_WORKERS", cls.job_workers),
+            job_history_limit=_env_int("JOB_HISTORY_LIMIT", cls.job_history_limit),
+            job_queue_limit=_env_int("JOB_QUEUE_LIMIT", cls.job_queue_limit),
+            io_threads=_env_int("IO_THREADS", cls.io_threads),
+            search_timeout=_env_float("SEARCH_TIMEOUT", cls.search_timeout),
+            tableau_timeout=_env_float("TABLEAU_TIMEOUT", cls.tableau_timeout),
+            ranking_cache_ttl=_env_float("RANKING_CACHE_TTL", cls.ranking_cache_ttl),
+            ranking_cache_size=_env_int("RANKING_CACHE_SIZE", cls.ranking_cache_size),
+            ranking_cache_path=os.getenv("RANKING_CACHE_PATH") or None,
+            ranking_similarity_threshold=_env_float(
+                "RANKING_SIMILARITY_THRESHOLD", cls.ranking_similarity_threshold
+            ),
+            ranking_history_path=os.getenv("RANKING_HISTORY_PATH", cls.ranking_history_path).strip() or None,
+            search_pool_size=_env_int("SEARCH_POOL_SIZE", cls.search_pool_size),
+            search_cache_ttl=_env_float("SEARCH_CACHE_TTL", cls.search_cache_ttl),
+            search_cache_stale_ttl=_env_float("SEARCH_CACHE_STALE_TTL", cls.search_cache_stale_ttl),
+            search_cache_size=_env_int("SEARCH_CACHE_SIZE", cls.search_cache_size),
+            search_cache_path=os.getenv("SEARCH_CACHE_PATH") or None,
+            search_fanout_concurrency=_env_int("SEARCH_FANOUT_CONCURRENCY", cls.search_fanout_concurrency),
+            tableau_session_ttl=_env_float("TABLEAU_SESSION_TTL", cls.tableau_session_ttl),
+            tableau_datasource_cache_ttl=_env_float(
+                "TABLEAU_DATASOURCE_CACHE_TTL", cls.tableau_datasource_cache_ttl
+            ),
+            tableau_datasource_refresh_seconds=_env_float(
+                "TABLEAU_DATASOURCE_REFRESH_SECONDS", cls.tableau_datasource_refresh_seconds
+            ),
+            tableau_job_poll_min_seconds=_env_float(
+                "TABLEAU_JOB_POLL_MIN_SECONDS", cls.tableau_job_poll_min_seconds
+            ),
+            tableau_job_poll_max_seconds=_env_float(
+                "TABLEAU_JOB_POLL_MAX_SECONDS", cls.tableau_job_poll_max_seconds
+            ),
+            tableau_upload_chunk_mb=_env_int("TABLEAU_UPLOAD_CHUNK_MB", cls.tableau_upload_chunk_mb),
+            tableau_upload_retries=_env_int("TABLEAU_UPLOAD_RETRIES", cls.tableau_upload_retries),
+            tableau_batch_max_rows=_env_int("TABLEAU_BATCH_MAX_ROWS", cls.tableau_batch_max_rows),
+            tableau_batch_flush_seconds=_env_float(
+                "TABLEAU_BATCH_FLUSH_SECONDS", cls.tableau_batch_flush_seconds
+            ),
+            hyper_pool_size=_env_int("HYPER_POOL_SIZE", cls.hyper_pool_size),
+            hyper_log_dir=os.getenv("HYPER_LOG_DIR") or cls.hyper_log_dir,
+            hyper_layout=os.getenv("HYPER_LAYOUT") or cls.hyper_layout,
+            tableau_upsert_key=(
+                (os.getenv("TABLEAU_UPSERT_KEY") or "").strip().lower() or None
+            ),
+            hyper_archive_path=os.getenv("HYPER_ARCHIVE_PATH") or None,
+            tableau_keep_temp_files=_env_bool("TABLEAU_KEEP_TEMP_FILES", cls.tableau_keep_temp_files),
+            batch_concurrency=_env_int("BATCH_CONCURRENCY", cls.batch_concurrency),
+            batch_checkpoint_dir=os.getenv("BATCH_CHECKPOINT_DIR") or cls.batch_checkpoint_dir,
+            provider_rate_limits=parse_rate_limits(os.getenv("PROVIDER_RATE_LIMITS", "")),
+            upstream_rate_limits=parse_rate_limits(os.getenv("UPSTREAM_RATE_LIMITS", "")),
+            upstream_concurrency=parse_rate_limits(os.getenv("UPSTREAM_CONCURRENCY", "")),
+            upstream_cooldown=_env_float("UPSTREAM_COOLDOWN_SECONDS", cls.upstream_cooldown),
+            upstream_retries=_env_int("UPSTREAM_RETRIES", cls.upstream_retries),
+            ranking_model_quality=os.getenv("RANKING_MODEL_QUALITY") or cls.ranking_model_quality,
+            ranking_model_draft=os.getenv("RANKING_MODEL_DRAFT", cls.ranking_model_draft).strip() or None,
+            ranking_min_sources=_env_int("RANKING_MIN_SOURCES", cls.ranking_min_sources),
+            model_costs=parse_model_costs(os.getenv("MODEL_COSTS", "")),
+            warmup_on_start=_env_bool("WARMUP_ON_START", cls.warmup_on_start),
+            log_level=os.getenv("LOG_LEVEL") or cls.log_level,
+        )
@@ -0,0 +1,366 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import threading
+import time
+
+from src.core.telemetry import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# AIMD ceiling per upstream, overridable with UPSTREAM_CONCURRENCY
+DEFAULT_UPSTREAM_CONCURRENCY: Dict[str, int] = {"openai": 16, "duckduckgo": 4, "tableau": 8}
+# Longest a waiter sleeps before re-checking; releases wake waiters earlier
+_MAX_WAIT = 1.0
+
+UPSTREAM_LIMIT = REGISTRY.gauge(
+    "top10_upstream_concurrency_limit", "Current adaptive concurrency limit per upstream", ["upstream"]
+)
+UPSTREAM_THROTTLED = REGISTRY.counter(
+    "top10_upstream_throttled_total", "Rate-limit responses received per upstream", ["upstream"]
+)
+UPSTREAM_WAIT_SECONDS = REGISTRY.histogram(
+    "top10_upstream_wait_seconds", "Time calls waited for the upstream limiter", ["upstream"]
+)
+
+
+class RateLimiter:
+    """
+    Async token bucket allowing rate acquisitions per period seconds.
+
+    Up to burst acquisitions (default: rate) may happen back to back; after
+    that callers wait their turn in arrival order.
+    """
+
+    def __init__(self, rate: float, period: float = 60.0, burst: Optional[float] = None):
+        self.rate = rate
+        self.period = period
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waited = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.period)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                delay = (1 - self._tokens) * self.period / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self._tokens -= 1
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "rate": self.rate,
+            "period_seconds": self.period,
+            "waited_seconds": round(self.waited, 3),
+        }
+
+
+def throttle_signal(outcome: Any) -> Optional[float]:
+    """
+    Seconds to back off if outcome says the upstream is rate limiting us, else None
+
+    outcome is an exception or a response: HTTP 429 responses and errors
+    carrying one (openai.RateLimitError, requests.HTTPError) or named like
+    one (duckduckgo_search's RatelimitException). 0.0 means the upstream sent
+    no Retry-After.
+    """
+    if outcome is None:
+        return None
+    response = getattr(outcome, "response", None)
+    status = getattr(outcome, "status_code", None) or getattr(response, "status_code", None)
+    named = isinstance(outcome, BaseException) and "ratelimit" in type(outcome).__name__.lower()
+    if status != 429 and not named:
+        return None
+    headers = getattr(outcome, "headers", None) or getattr(response, "headers", None) or {}
+    try:
+        return max(0.0, float(headers.get("retry-after", 0)))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _wake_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus AIMD concurrency window for one upstream API.
+
+    Calls wait for a token (when a rate is set) and for a free slot in the
+    window. Each successful call widens the window by 1/limit, so it grows by
+    about one slot per window of calls up to max_concurrency. A rate-limit
+    signal (see throttle_signal) multiplies it by backoff and pauses new calls
+    for the upstream's Retry-After, or cooldown seconds; call() and
+    call_sync() then retry the call up to retries times. Shared between the
+    event loop (acquire) and executor threads (acquire_sync). clock (default
+    time.monotonic) measures pauses and token refills.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int = 8,
+        rate: float = 0.0,
+        period: float = 60.0,
+        burst: Optional[float] = None,
+        cooldown: float = 5.0,
+        retries: int = 2,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.rate = rate
+        self.period = period
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.cooldown = cooldown
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self._clock = clock
+        self.limit = float(self.max_concurrency)
+        self._tokens = self.capacity
+        self._updated = self._clock()
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.calls = 0
+        self.throttled = 0
+        self.waited = 0.0
+        UPSTREAM_LIMIT.set(self.limit, upstream=name)
+
+    def _try_acquire(self) -> float:
+        """Take a slot (and a token) and return 0, or return how long to wait; holds the lock"""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._in_flight >= int(self.limit):
+            return _MAX_WAIT
+        if self.rate > 0:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.period)
+            self._updated = now
+            if self._tokens < 1:
+                return (1 - self._tokens) * self.period / self.rate
+            self._tokens -= 1
+        self._in_flight += 1
+        self.calls += 1
+        return 0.0
+
+    def _wake(self) -> None:
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake_future, future)
+            except RuntimeError:
+                # the waiter's loop has closed
+                pass
+
+    def _record_wait(self, seconds: float) -> None:
+        self.waited += seconds
+        UPSTREAM_WAIT_SECONDS.observe(seconds, upstream=self.name)
+
+    async def acquire(self) -> None:
+        """Wait for a slot without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        started = self._clock()
+        while True:
+            with self._cond:
+                delay = self._try_acquire()
+                if delay <= 0:
+                    break
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, delay)
+            except asyncio.TimeoutError:
+                pass
+        self._record_wait(self._clock() - started)
+
+    def acquire_sync(self) -> None:
+        """Wait for a slot (blocking; for executor threads)"""
+        started = self._clock()
+        with self._cond:
+            while (delay := self._try_acquire()) > 0:
+                self._cond.wait(delay)
+        self._record_wait(self._clock() - started)
+
+    def release(self, outcome: Any = None) -> bool:
+        """Free a slot, given the call's result or exception; returns whether it was rate limited"""
+        retry_after = throttle_signal(outcome)
+        with self._cond:
+            self._in_flight -= 1
+            now = self._clock()
+            if retry_after is not None:
+                self.throttled += 1
+                # calls that were already in flight hit the same limit; back off once per pause
+                if now >= self._paused_until:
+                    self.limit = max(1.0, self.limit * self.backoff)
+                    logger.warning(
+                        f"{self.name} is rate limiting; concurrency limit {self.limit:.1f}, "
+                        f"pausing {retry_after or self.cooldown:g}s"
+                    )
+                self._paused_until = max(self._paused_until, now + (retry_after or self.cooldown))
+            elif not isinstance(outcome, BaseException):
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            limit = self.limit
+            self._wake()
+        UPSTREAM_LIMIT.set(limit, upstream=self.name)
+        if retry_after is not None:
+            UPSTREAM_THROTTLED.inc(upstream=self.name)
+        return retry_after is not None
+
+    async def call(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Await fn(*args, **kwargs) in a slot, retrying it when it is rate limited"""
+        attempt = 0
+        while True:
+            await self.acquire()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                if self.release(e) and attempt < self.retries:
+                    attempt += 1
+                    continue
+                raise
+            except BaseException as e:
+                # cancellation frees the slot without widening the window
+                self.release(e)
+                raise
+            if self.release(result) and attempt < self.retries:
+                attempt += 1
+                continue
+            return result
+
+    def call_sync(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run fn(*args, **kwargs) in a slot, retrying it when it is rate limited (blocking)"""
+        attempt = 0
+        while True:
+            self.acquire_sync()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                if self.release(e) and attempt < self.retries:
+                    attempt += 1
+                    continue
+                raise
+            except BaseException as e:
+                # cancellation frees the slot without widening the window
+                self.release(e)
+                raise
+            if self.release(result) and attempt < self.retries:
+                attempt += 1
+                continue
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrency_limit": round(self.limit, 2),
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._in_flight,
+            "rate": self.rate,
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited, 3),
+            "paused_seconds": round(max(0.0, self._paused_until - self._clock()), 3),
+        }
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_upstreams: Dict[str, AdaptiveLimiter] = {}
+_upstream_options: Dict[str, float] = {"cooldown": 5.0, "retries": 2}
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """Parse 'provider=rate,...' (requests per minute), e.g. 'openai=60,duckduckgo=30'"""
+    limits = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        provider, _, rate = entry.partition("=")
+        limits[provider.strip().lower()] = float(rate)
+    return limits
+
+
+def configure_rate_limits(limits: Dict[str, float]) -> None:
+    """Replace the per-provider limiters; rates are requests per minute, 0 disables"""
+    _limiters.clear()
+    for provider, rate in limits.items():
+        if rate > 0:
+            _limiters[provider.lower()] = RateLimiter(rate)
+    if _limiters:
+        logger.info(f"Rate limits per minute: {dict(limits)}")
+
+
+def get_rate_limiter(provider: str) -> Optional[RateLimiter]:
+    """Return the limiter for provider, or None when it is not rate limited"""
+    return _limiters.get(provider.lower())
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {provider: limiter.stats() for provider, limiter in _limiters.items()}
+
+
+def configure_upstream_limits(
+    rates: Optional[Dict[str, float]] = None,
+    concurrency: Optional[Dict[str, float]] = None,
+    cooldown: float = 5.0,
+    retries: int = 2
+) -> None:
+    """
+    Replace the per-upstream adaptive limiters
+
+    Args:
+        rates: Requests per minute per upstream (missing or 0: no token bucket)
+        concurrency: Concurrent calls per upstream the AIMD window grows back to
+        cooldown: Seconds calls pause after a rate limit without Retry-After
+        retries: Retries of a rate-limited call
+    """
+    rates = {name.lower(): rate for name, rate in (rates or {}).items()}
+    ceilings = {**DEFAULT_UPSTREAM_CONCURRENCY, **{name.lower(): n for name, n in (concurrency or {}).items()}}
+    _upstream_options.update(cooldown=cooldown, retries=retries)
+    _upstreams.clear()
+    for name in sorted(set(rates) | set(ceilings)):
+        _upstreams[name] = AdaptiveLimiter(
+            name,
+            max_concurrency=int(ceilings.get(name, 8)),
+            rate=rates.get(name, 0.0),
+            cooldown=cooldown,
+            retries=retries
+        )
+    logger.info(
+        "Upstream limits: " + ", ".join(
+            f"{name}={limiter.max_concurrency} concurrent"
+            + (f"/{limiter.rate:g} per minute" if limiter.rate else "")
+            for name, limiter in _upstreams.items()
+        )
+    )
+
+
+def get_upstream_limiter(name: str) -> AdaptiveLimiter:
+    """Return the limiter of an upstream, creating a default one for unknown upstreams"""
+    name = name.lower()
+    limiter = _upstreams.get(name)
+    if limiter is None:
+        limiter = _upstreams.setdefault(name, AdaptiveLimiter(
+            name,
+            max_concurrency=DEFAULT_UPSTREAM_CONCURRENCY.get(name, 8),
+            cooldown=_upstream_options["cooldown"],
+            retries=int(_upstream_options["retries"])
+        ))
+    return limiter
+
+
+def upstream_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {name: limiter.stats() for name, limiter in _upstreams.items()}
@@ -0,0 +1,263 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(trace_id)s] %(name)s: %(message)s"
+
+# Seconds; Tableau jobs can sit in the queue for minutes
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+NO_TRACE = "-"
+
+_trace_id: ContextVar[str] = ContextVar("trace_id", default=NO_TRACE)
+_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("spans", default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_trace_id() -> str:
+    """Trace id of the current request or job ("-" outside of one)"""
+    return _trace_id.get()
+
+
+def current_or_new_trace_id() -> str:
+    trace_id = _trace_id.get()
+    return new_trace_id() if trace_id == NO_TRACE else trace_id
+
+
+def set_trace_id(trace_id: str) -> None:
+    """Set the trace id for the rest of the current task or thread context"""
+    _trace_id.set(trace_id)
+
+
+@contextmanager
+def trace_context(trace_id: Optional[str] = None) -> Iterator[str]:
+    """Run a block under trace_id (a new one by default)"""
+    token = _trace_id.set(trace_id or new_trace_id())
+    try:
+        yield _trace_id.get()
+    finally:
+        _trace_id.reset(token)
+
+
+def configure_logging(level: str = "INFO") -> None:
+    """Log with the trace id of the current request or job on every line"""
+    factory = logging.getLogRecordFactory()
+    if not getattr(factory, "adds_trace_id", False):
+        def record_factory(*args, **kwargs) -> logging.LogRecord:
+            record = factory(*args, **kwargs)
+            record.trace_id = _trace_id.get()
+            return record
+
+        record_factory.adds_trace_id = True
+        logging.setLogRecordFactory(record_factory)
+    logging.basicConfig(level=level.upper(), format=LOG_FORMAT, force=True)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    """Monotonic counter with optional labels (Prometheus counter)"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Gauge:
+    """Value that can go up and down, with optional labels (Prometheus gauge)"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels (Prometheus histogram)"""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total[0]:g}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, labelnames))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "top10_stage_duration_seconds", "Duration of ranking pipeline stages", ["stage"]
+)
+STAGE_ERRORS = REGISTRY.counter(
+    "top10_stage_errors_total", "Pipeline stages that raised", ["stage"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "top10_llm_tokens_total", "Model tokens used by agent runs", ["model", "kind"]
+)
+LLM_REQUESTS = REGISTRY.counter(
+    "top10_llm_requests_total", "Model requests made by agent runs", ["model"]
+)
+RETRIES = REGISTRY.counter(
+    "top10_retries_total", "Retried operations (agent tool and result retries, upload chunks, Tableau sessions)",
+    ["operation"]
+)
+
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[None]:
+    """
+    Time a pipeline stage.
+
+    The duration is observed in the stage histogram, logged at debug level and
+    added to the spans being collected for the current trace (collect_spans).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+        details = "".join(f" {key}={value}" for key, value in attributes.items())
+        logger.debug(f"span {stage} {elapsed * 1000:.1f}ms{details}")
+
+
+@contextmanager
+def collect_spans() -> Iterator[List[Tuple[str, float]]]:
+    """Collect the (stage, seconds) spans finished inside the block, including in executor threads"""
+    spans: List[Tuple[str, float]] = []
+    token = _spans.set(spans)
+    try:
+        yield spans
+    finally:
+        _spans.reset(token)
+
+
+def summarize_spans(spans: List[Tuple[str, float]]) -> Dict[str, float]:
+    """Total seconds per stage, in the order the stages first finished"""
+    totals: Dict[str, float] = {}
+    for stage, elapsed in spans:
+        totals[stage] = totals.get(stage, 0.0) + elapsed
+    return {stage: round(elapsed, 4) for stage, elapsed in totals.items()}
@@ -1,7 +1,6 @@
 from pydantic import BaseModel, Field, HttpUrl, field_validator, ConfigDict
 from datetime import datetime, UTC
-from typing import List, Dict, Optional
-from pydantic_ai import RunContext
+from typing import Any, List, Dict, Optional
 
 class RankingItem(BaseModel):
     """Represents a single item in the ranking"""
@@ -83,4 +82,43 @@ class RankingResult(BaseModel):
         json_encoders={
             datetime: lambda v: v.strftime("%Y-%m-%d %H:%M:%S UTC")
         }
-    ) 
\ No newline at end of file
+    ) 
+
+
+class RankingItemDraft(BaseModel):
+    """
+    A ranking item as the model writes it, before repair.
+
+    Same fields as RankingItem with the constraints only described, so one
+    malformed item does not fail the parse of the whole ranking.
+    """
+    rank: int = Field(..., description="Position in the ranking (1-10, unique)")
+    name: str = Field(
+        ...,
+        description="Name of the ranked item, 2-100 characters: letters, numbers, #, +, ., -, _ and spaces only"
+    )
+    description: str = Field(..., description="Detailed description, 50-500 characters")
+    advantages: List[str] = Field(..., description="3-5 unique key advantages or features")
+    metrics: Dict[str, Any] = Field(..., description="Quantitative metrics for evaluation (numbers)")
+    score: Optional[float] = Field(None, description="Overall score (0-10)")
+
+
+class RankingDraft(BaseModel):
+    """A ranking as the model writes it; repaired and validated into a RankingResult"""
+    topic: str = Field(..., description="Topic of the ranking, 3-50 characters")
+    items: List[RankingItemDraft] = Field(..., description="Exactly 10 items with unique ranks 1-10")
+    sources: List[str] = Field(..., description="Source URLs (at least one)")
+    methodology: str = Field(..., description="Analysis process description, at least 100 characters")
+    year: int
+
+
+def ranking_to_record(result: RankingResult) -> dict:
+    """Serialize a RankingResult to a JSON-safe dict that round-trips through model_validate"""
+    data = result.model_dump()
+    data["generated_at"] = result.generated_at.isoformat()
+    return data
+
+
+def ranking_from_record(data: dict) -> RankingResult:
+    """Rebuild a RankingResult from a dict produced by ranking_to_record"""
+    return RankingResult.model_validate(data)
@@ -1,6 +1,14 @@
 """Pipeline package for data processing and Tableau integration"""
 
-from .tableau import TableauDataRow, TableauDataConverter
-from .tableau_cloud import TableauCloudPublisher
+__all__ = ['TableauDataRow', 'TableauDataConverter', 'TableauCloudPublisher']
 
-__all__ = ['TableauDataRow', 'TableauDataConverter', 'TableauCloudPublisher']
\ No newline at end of file
+
+def __getattr__(name):
+    # pyarrow, tableauhyperapi and tableauserverclient load on first use
+    if name in ('TableauDataRow', 'TableauDataConverter'):
+        from . import tableau
+        return getattr(tableau, name)
+    if name == 'TableauCloudPublisher':
+        from .tableau_cloud import TableauCloudPublisher
+        return TableauCloudPublisher
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
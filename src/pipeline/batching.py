@@ -0,0 +1,201 @@
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Set
+import asyncio
+import contextvars
+import logging
+import time
+
+import tableauserverclient as TSC
+from tableauserverclient.server.endpoint.exceptions import JobFailedException
+
+from src.core.telemetry import get_trace_id, new_trace_id, set_trace_id
+from src.pipeline.tableau import TableauDataRow
+from src.pipeline.tableau_cloud import TableauCloudPublisher
+from src.pipeline.job_monitor import TableauJobMonitor
+
+logger = logging.getLogger(__name__)
+
+
+class BatchPublishError(Exception):
+    """Raised to a caller whose rows could not be published"""
+    pass
+
+
+def _is_data_error(error: Exception) -> bool:
+    """
+    True when Tableau or validation rejected the rows themselves
+
+    Only these are worth splitting a batch for; timeouts, 5xx responses,
+    rate limits and connection errors would fail the smaller jobs as well.
+    """
+    return isinstance(error, (JobFailedException, BatchPublishError, ValueError))
+
+
+@dataclass
+class _PendingPublish:
+    rows: List[TableauDataRow]
+    future: asyncio.Future
+    trace_id: str
+
+
+class BatchingPublisher:
+    """
+    Coalesces rows from many rankings into one Hyper file and one Tableau insert job.
+
+    A batch is flushed when it reaches max_batch_rows or flush_interval seconds
+    after its first request arrived. Every caller awaits its own future. When
+    a combined job is rejected because of its data, the batch is bisected and
+    each half published in turn, so a bad ranking costs about 2 * log2(n)
+    extra jobs, one at a time, and the others still get published. Any other
+    failure (timeouts, 5xx, rate limits) fails the whole batch at once instead
+    of sending more jobs to a struggling Tableau.
+    """
+
+    def __init__(
+        self,
+        publisher: TableauCloudPublisher,
+        max_batch_rows: int = 500,
+        flush_interval: float = 2.0,
+        job_timeout: int = 300,
+        temp_dir: Optional[Path] = None,
+        job_monitor: Optional[TableauJobMonitor] = None
+    ):
+        self.publisher = publisher
+        self.job_monitor = job_monitor
+        self.max_batch_rows = max(1, max_batch_rows)
+        self.flush_interval = flush_interval
+        self.job_timeout = job_timeout
+        self.temp_dir = temp_dir
+        self._pending: List[_PendingPublish] = []
+        self._pending_rows = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self._flush_times: Deque[float] = deque()
+        self.jobs_started = 0
+        self.rows_sent = 0
+        self.rows_published = 0
+        self.requests_published = 0
+        self.batch_failures = 0
+        self.batch_splits = 0
+        self.last_rows_per_job = 0
+
+    async def publish(self, rows: List[TableauDataRow]) -> TSC.JobItem:
+        """Queue rows for the next batch and wait until their Tableau job finishes"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingPublish(rows, future, get_trace_id()))
+        self._pending_rows += len(rows)
+        if self._pending_rows >= self.max_batch_rows:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+        return await future
+
+    async def aclose(self) -> None:
+        """Flush anything still buffered and wait for in-flight batches"""
+        self._flush()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        # a fresh context keeps the batch's spans out of whichever request triggered the flush
+        task = asyncio.create_task(self._publish_batch(batch), context=contextvars.Context())
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_job(self, rows: List[TableauDataRow]) -> TSC.JobItem:
+        """Publish rows as one update job and wait for it to succeed"""
+        self.jobs_started += 1
+        self.rows_sent += len(rows)
+        self.last_rows_per_job = len(rows)
+        self._flush_times.append(time.monotonic())
+        self._prune_flush_times()
+        job_id = await self.publisher.update_data(rows, self.temp_dir)
+        if self.job_monitor is not None:
+            final_job = await self.job_monitor.wait(job_id, timeout=self.job_timeout)
+        else:
+            final_job = await self.publisher.wait_for_job(job_id, timeout=self.job_timeout)
+        if final_job.finish_code != 0:
+            raise BatchPublishError(f"Tableau update failed with code {final_job.finish_code}")
+        return final_job
+
+    async def _publish_batch(self, batch: List[_PendingPublish]) -> None:
+        rows = [row for pending in batch for row in pending.rows]
+        set_trace_id(new_trace_id())
+        logger.info(
+            f"Publishing batch of {len(rows)} rows from {len(batch)} rankings "
+            f"(traces {', '.join(pending.trace_id for pending in batch)})"
+        )
+        await self._publish_group(batch)
+
+    async def _publish_group(self, batch: List[_PendingPublish]) -> None:
+        """Publish requests as one job; bisect on data errors, fail fast on anything else"""
+        rows = [row for pending in batch for row in pending.rows]
+        try:
+            final_job = await self._run_job(rows)
+        except Exception as e:
+            self.batch_failures += 1
+            if len(batch) == 1 or not _is_data_error(e):
+                if len(batch) > 1:
+                    logger.warning(f"Batch of {len(batch)} rankings failed ({str(e)}); not retrying")
+                for pending in batch:
+                    self._resolve(pending, error=e)
+                return
+            half = len(batch) // 2
+            logger.warning(
+                f"Batch of {len(batch)} rankings was rejected ({str(e)}); "
+                f"publishing halves of {half} and {len(batch) - half}"
+            )
+            self.batch_splits += 1
+            await self._publish_group(batch[:half])
+            await self._publish_group(batch[half:])
+            return
+
+        self.rows_published += len(rows)
+        self.requests_published += len(batch)
+        for pending in batch:
+            self._resolve(pending, job=final_job)
+
+    @staticmethod
+    def _resolve(
+        pending: _PendingPublish,
+        job: Optional[TSC.JobItem] = None,
+        error: Optional[Exception] = None
+    ) -> None:
+        if pending.future.done():
+            return
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(job)
+
+    def _prune_flush_times(self) -> None:
+        """Keep only job start times from the last minute"""
+        now = time.monotonic()
+        while self._flush_times and now - self._flush_times[0] > 60:
+            self._flush_times.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune_flush_times()
+        return {
+            "max_batch_rows": self.max_batch_rows,
+            "flush_interval_seconds": self.flush_interval,
+            "pending_requests": len(self._pending),
+            "pending_rows": self._pending_rows,
+            "inflight_batches": len(self._inflight),
+            "batches_per_minute": len(self._flush_times),
+            "jobs_started": self.jobs_started,
+            "batch_failures": self.batch_failures,
+            "batch_splits": self.batch_splits,
+            "rows_published": self.rows_published,
+            "rows_per_job": round(self.rows_sent / self.jobs_started, 2) if self.jobs_started else 0.0,
+            "last_rows_per_job": self.last_rows_per_job,
+            "requests_published": self.requests_published,
+        }
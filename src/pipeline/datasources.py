@@ -0,0 +1,105 @@
+from typing import Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+import tableauserverclient as TSC
+
+logger = logging.getLogger(__name__)
+
+
+class DatasourceResolver:
+    """
+    Resolves datasource names to items without listing the whole site.
+
+    Lookups use a server-side name filter and fall back to a paginated scan
+    when the filter is rejected. Every item seen is kept in a name -> item
+    index that is reused for ttl seconds; only sites without the filter need
+    the index rebuilt in the background (see filter_supported). All methods
+    are blocking and expect a signed-in server.
+    """
+
+    def __init__(self, server: TSC.Server, ttl: float = 300.0, page_size: int = 1000):
+        self.server = server
+        self.ttl = ttl
+        self.page_size = page_size
+        self._index: Dict[str, Tuple[TSC.DatasourceItem, float]] = {}
+        self._lock = threading.Lock()
+        self._filter_supported = True
+        self.indexed_at: Optional[float] = None
+
+    def resolve(self, name: str) -> TSC.DatasourceItem:
+        """Return the datasource named name, raising ValueError if it does not exist"""
+        item = self._cached(name)
+        if item is not None:
+            return item
+
+        if self._filter_supported:
+            try:
+                item = self._lookup_filtered(name)
+            except TSC.ServerResponseError as e:
+                if not str(e.code).startswith("400"):
+                    raise
+                logger.warning(f"Datasource name filter rejected ({e.code}); using paginated scan")
+                self._filter_supported = False
+
+        if item is None and not self._filter_supported:
+            self.rebuild_index()
+            item = self._cached(name)
+
+        if item is None:
+            raise ValueError(f"Datasource '{name}' not found")
+        return item
+
+    @property
+    def filter_supported(self) -> bool:
+        """False once the site has rejected the name filter and lookups scan every page"""
+        return self._filter_supported
+
+    def _cached(self, name: str) -> Optional[TSC.DatasourceItem]:
+        with self._lock:
+            entry = self._index.get(name)
+        if entry is None or time.monotonic() - entry[1] >= self.ttl:
+            return None
+        return entry[0]
+
+    def _lookup_filtered(self, name: str) -> Optional[TSC.DatasourceItem]:
+        options = TSC.RequestOptions(pagesize=self.page_size)
+        options.filter.add(TSC.Filter(
+            TSC.RequestOptions.Field.Name,
+            TSC.RequestOptions.Operator.Equals,
+            name
+        ))
+        items, _ = self.server.datasources.get(options)
+        now = time.monotonic()
+        match = None
+        with self._lock:
+            for item in items:
+                self._index.setdefault(item.name, (item, now))
+                if item.name == name and match is None:
+                    match = item
+                    self._index[name] = (item, now)
+        return match
+
+    def rebuild_index(self) -> int:
+        """Scan every page of datasources and replace the index; returns the item count"""
+        index: Dict[str, Tuple[TSC.DatasourceItem, float]] = {}
+        now = time.monotonic()
+        options = TSC.RequestOptions(pagesize=self.page_size)
+        for item in TSC.Pager(self.server.datasources, options):
+            index.setdefault(item.name, (item, now))
+        with self._lock:
+            self._index = index
+            self.indexed_at = now
+        logger.info(f"Indexed {len(index)} datasources")
+        return len(index)
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._index.clear()
+            else:
+                self._index.pop(name, None)
+
+    def __len__(self) -> int:
+        return len(self._index)
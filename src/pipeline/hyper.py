@@ -1,5 +1,13 @@
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List
+from typing import Callable, Dict, Iterator, List, Optional, Union
+import atexit
+import logging
+import queue
+import shutil
+import tempfile
+import threading
+import time
 from tableauhyperapi import (
     HyperProcess,
     Telemetry,
@@ -11,14 +19,180 @@ from tableauhyperapi import (
     Inserter,
     HyperException,
     Name,
+    escape_string_literal,
 )
-from .tableau import TableauDataRow
+import pyarrow as pa
+from .tableau import TableauDataRow, TableauDataConverter, NORMALIZED_ARROW_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_DIR = Path("data/logs")
+
+class HyperRuntime:
+    """
+    Long-lived Hyper process with a pool of reusable connections.
+
+    The process is started lazily on first use. Connections are opened without
+    a database; callers attach the file they work on and detach it afterwards.
+    Empty template databases are built once per schema and copied for each new
+    file instead of re-creating schema and tables every time.
+    """
+
+    def __init__(self, pool_size: int = 4, log_dir: Union[str, Path] = DEFAULT_LOG_DIR):
+        self.pool_size = max(1, pool_size)
+        self.log_dir = Path(log_dir)
+        self._process: Optional[HyperProcess] = None
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._templates: Dict[str, Path] = {}
+        self._template_dir: Optional[Path] = None
+
+    @property
+    def started(self) -> bool:
+        return self._process is not None
+
+    def _ensure_process(self) -> HyperProcess:
+        with self._lock:
+            if self._process is None:
+                # hyperd.log would otherwise land in the working directory
+                self.log_dir.mkdir(parents=True, exist_ok=True)
+                self._process = HyperProcess(
+                    telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU,
+                    parameters={"log_dir": str(self.log_dir)}
+                )
+                self._template_dir = Path(tempfile.mkdtemp(prefix="hyper-templates-"))
+                logger.info(f"Started Hyper process at {self._process.endpoint}")
+            return self._process
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Borrow a pooled connection (blocks while all connections are in use)"""
+        process = self._ensure_process()
+        conn = self._acquire(process)
+        try:
+            yield conn
+        finally:
+            if conn.is_open:
+                self._idle.put(conn)
+            else:
+                with self._lock:
+                    self._created -= 1
+
+    def _acquire(self, process: HyperProcess) -> Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if not create:
+            return self._idle.get()
+        try:
+            return Connection(process.endpoint)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def template(self, key: str, build: Callable[[Connection], None]) -> Path:
+        """Return the path of an empty template database, building it on first use"""
+        process = self._ensure_process()
+        with self._lock:
+            path = self._templates.get(key)
+            if path is None:
+                path = self._template_dir / f"{key}.hyper"
+                with Connection(process.endpoint, str(path), CreateMode.CREATE_AND_REPLACE) as conn:
+                    build(conn)
+                self._templates[key] = path
+            return path
+
+    def shutdown(self) -> None:
+        """Close pooled connections and stop the Hyper process"""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._created = 0
+            if self._process is not None:
+                self._process.close()
+                self._process = None
+                logger.info("Stopped Hyper process")
+            if self._template_dir is not None:
+                shutil.rmtree(self._template_dir, ignore_errors=True)
+                self._template_dir = None
+            self._templates.clear()
+
+_runtime: Optional[HyperRuntime] = None
+
+def configure_hyper_runtime(pool_size: int = 4, log_dir: Union[str, Path] = DEFAULT_LOG_DIR) -> HyperRuntime:
+    """Replace the process-wide Hyper runtime (stopping the previous one)"""
+    global _runtime
+    if _runtime is not None:
+        _runtime.shutdown()
+    _runtime = HyperRuntime(pool_size=pool_size, log_dir=log_dir)
+    return _runtime
+
+def get_hyper_runtime() -> HyperRuntime:
+    """Return the process-wide Hyper runtime, creating it if needed"""
+    if _runtime is None:
+        return configure_hyper_runtime()
+    return _runtime
+
+def shutdown_hyper_runtime() -> None:
+    if _runtime is not None:
+        _runtime.shutdown()
+
+atexit.register(shutdown_hyper_runtime)
+
+FLAT_LAYOUT = "flat"
+NORMALIZED_LAYOUT = "normalized"
+
+_SQL_TYPES = {
+    pa.string(): SqlType.text(),
+    pa.timestamp("us"): SqlType.timestamp(),
+    pa.int32(): SqlType.int(),
+    pa.float64(): SqlType.double(),
+}
+
+def _table_definition(schema_name: str, table: str, arrow_schema: pa.Schema) -> TableDefinition:
+    return TableDefinition(
+        TableName(schema_name, table),
+        [TableDefinition.Column(field.name, _SQL_TYPES[field.type]) for field in arrow_schema]
+    )
 
 class HyperFileManager:
-    """Manages Hyper file creation and data insertion"""
+    """
+    Manages Hyper file creation and data insertion.
+
+    Arrow tables, and row lists of at least copy_threshold rows, are bulk
+    loaded with Hyper's COPY from an Arrow stream; smaller row lists use the
+    row-wise Inserter.
+
+    The flat layout writes one Extract.Rankings table. The normalized layout
+    writes Extract.Batches, Items, ItemMetrics and ItemAdvantages joined on
+    batch_id, so batch-level text is stored once and metrics are numeric.
+    """
     
-    def __init__(self, output_dir: Path):
+    def __init__(
+        self,
+        output_dir: Path,
+        runtime: Optional[HyperRuntime] = None,
+        copy_threshold: int = 1000,
+        layout: str = FLAT_LAYOUT
+    ):
+        if layout not in (FLAT_LAYOUT, NORMALIZED_LAYOUT):
+            raise ValueError(f"Unknown Hyper layout '{layout}'")
         self.output_dir = output_dir
+        self.runtime = runtime
+        self.copy_threshold = copy_threshold
+        self.layout = layout
         self.schema_name = "Extract"
         self.table_name = TableName(self.schema_name, "Rankings")
         
@@ -38,44 +212,201 @@ class HyperFileManager:
                 TableDefinition.Column("batch_id", SqlType.text())
             ]
         )
-    
-    def create_hyper_file(self, file_name: str, data: List[TableauDataRow]) -> Path:
-        """Create a new Hyper file with the given data"""
+        if layout == NORMALIZED_LAYOUT:
+            self.tables = {
+                name: _table_definition(self.schema_name, name, schema)
+                for name, schema in NORMALIZED_ARROW_SCHEMAS.items()
+            }
+        else:
+            self.tables = {self.table_name.name.unescaped: self.table_def}
+
+    def key_table(self, table: str) -> str:
+        """Table whose key values select the rows of table to replace on upsert"""
+        return "Batches" if self.layout == NORMALIZED_LAYOUT else table
+
+    @property
+    def template_key(self) -> str:
+        return "rankings" if self.layout == FLAT_LAYOUT else f"rankings_{self.layout}"
+
+    def _build_template(self, connection: Connection) -> None:
+        # Create schema first
+        connection.catalog.create_schema(Name(self.schema_name))
+
+        # Then create tables
+        for table_def in self.tables.values():
+            connection.catalog.create_table(table_def)
+
+    def _target(self, table_def: TableDefinition) -> TableDefinition:
+        """Definition of table_def inside the database attached as 'target'"""
+        return TableDefinition(
+            TableName("target", self.schema_name, table_def.table_name.name),
+            table_def.columns
+        )
+
+    def create_hyper_file(
+        self,
+        file_name: str,
+        data: Union[List[TableauDataRow], pa.Table]
+    ) -> Path:
+        """Create a new Hyper file with the given rows or Arrow table"""
         if not self.output_dir.exists():
             raise HyperException(f"Output directory does not exist: {self.output_dir}")
             
         hyper_path = self.output_dir / f"{file_name}.hyper"
+        runtime = self.runtime or get_hyper_runtime()
         
         try:
-            with HyperProcess(telemetry=Telemetry.DO_NOT_SEND_USAGE_DATA_TO_TABLEAU) as hyper:
-                with Connection(hyper.endpoint, str(hyper_path), CreateMode.CREATE_AND_REPLACE) as connection:
-                    # Create schema first
-                    connection.catalog.create_schema(Name(self.schema_name))
-                    
-                    # Then create table
-                    connection.catalog.create_table(self.table_def)
-                    
-                    # Insert data if any
-                    if data:
-                        with Inserter(connection, self.table_def) as inserter:
-                            for row in data:
-                                inserter.add_row([
-                                    row.topic,
-                                    row.generated_at,
-                                    row.rank,
-                                    row.item_name,
-                                    row.score,
-                                    row.advantages,
-                                    row.metrics,
-                                    row.sources,
-                                    row.methodology,
-                                    row.batch_id
-                                ])
-                            inserter.execute()
+            # Copy the pre-built empty database instead of creating schema and table
+            template = runtime.template(self.template_key, self._build_template)
+            shutil.copyfile(template, hyper_path)
+
+            # Insert data if any
+            if len(data) > 0:
+                with runtime.connection() as connection:
+                    connection.catalog.attach_database(str(hyper_path), alias="target")
+                    try:
+                        target_def = self._target(self.table_def)
+                        if self.layout == NORMALIZED_LAYOUT:
+                            if not isinstance(data, pa.Table):
+                                data = TableauDataConverter.rows_to_table(data)
+                            for name, table in TableauDataConverter.normalize(data).items():
+                                if table.num_rows:
+                                    target = self._target(self.tables[name])
+                                    self._copy_table(connection, target, table, hyper_path)
+                        elif isinstance(data, pa.Table):
+                            self._copy_table(connection, target_def, data, hyper_path)
+                        elif len(data) >= self.copy_threshold:
+                            table = TableauDataConverter.rows_to_table(data)
+                            self._copy_table(connection, target_def, table, hyper_path)
+                        else:
+                            self._insert_rows(connection, target_def, data)
+                    finally:
+                        connection.catalog.detach_database("target")
         except Exception as e:
             # Clean up partial file if creation fails
             if hyper_path.exists():
                 hyper_path.unlink()
             raise HyperException(f"Failed to create Hyper file: {str(e)}") from e
         
-        return hyper_path 
\ No newline at end of file
+        return hyper_path
+
+    @staticmethod
+    def _insert_rows(
+        connection: Connection,
+        target_def: TableDefinition,
+        data: List[TableauDataRow]
+    ) -> None:
+        with Inserter(connection, target_def) as inserter:
+            for row in data:
+                inserter.add_row([
+                    row.topic,
+                    row.generated_at,
+                    row.rank,
+                    row.item_name,
+                    row.score,
+                    row.advantages,
+                    row.metrics,
+                    row.sources,
+                    row.methodology,
+                    row.batch_id
+                ])
+            inserter.execute()
+
+    @staticmethod
+    def _copy_table(
+        connection: Connection,
+        target_def: TableDefinition,
+        table: pa.Table,
+        hyper_path: Path
+    ) -> int:
+        """Bulk load an Arrow table through an Arrow stream file next to the Hyper file"""
+        stream_path = hyper_path.with_suffix(".arrows")
+        try:
+            with pa.OSFile(str(stream_path), "wb") as sink:
+                with pa.ipc.new_stream(sink, table.schema) as writer:
+                    writer.write_table(table)
+            return connection.execute_command(
+                f"COPY {target_def.table_name} FROM {escape_string_literal(str(stream_path))} "
+                "WITH (FORMAT arrowstream)"
+            )
+        finally:
+            stream_path.unlink(missing_ok=True)
+
+
+UPSERT_KEYS = ("batch_id", "topic")
+
+def validate_upsert_key(key: Optional[str], layout: str) -> Optional[str]:
+    """Return key (None disables upserts) or raise ValueError if the layout cannot replace by it"""
+    if not key:
+        return None
+    if key not in UPSERT_KEYS:
+        raise ValueError(f"Unknown upsert key '{key}', expected one of {UPSERT_KEYS}")
+    if key == "topic" and layout != FLAT_LAYOUT:
+        raise ValueError("Replacing by topic requires the flat Hyper layout")
+    return key
+
+def sweep_temp_files(directory: Path, max_age: float = 3600.0) -> int:
+    """Delete temp_*.hyper files older than max_age seconds; returns the number removed"""
+    if not directory.exists():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in directory.glob("temp_*.hyper"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    if removed:
+        logger.info(f"Removed {removed} stale temporary Hyper files from {directory}")
+    return removed
+
+class HyperArchive:
+    """
+    Persistent local Hyper file holding everything that was published.
+
+    apply() merges a freshly built extract into the archive: rows sharing its
+    upsert key values (batch_id or topic) are replaced, so re-publishing a
+    batch never duplicates rows.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        layout: str = FLAT_LAYOUT,
+        key: str = "batch_id",
+        runtime: Optional[HyperRuntime] = None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.key = validate_upsert_key(key, layout) or "batch_id"
+        self.runtime = runtime
+        self.manager = HyperFileManager(self.path.parent, runtime, layout=layout)
+        self._lock = threading.Lock()
+
+    def apply(self, source: Path) -> None:
+        """Upsert all tables of the extract at source into the archive (blocking)"""
+        runtime = self.runtime or get_hyper_runtime()
+        schema = self.manager.schema_name
+        with self._lock:
+            if not self.path.exists():
+                template = runtime.template(self.manager.template_key, self.manager._build_template)
+                shutil.copyfile(template, self.path)
+            with runtime.connection() as connection:
+                connection.catalog.attach_database(str(source), alias="src")
+                connection.catalog.attach_database(str(self.path), alias="archive")
+                try:
+                    for table in self.manager.tables:
+                        target = TableName("archive", schema, table)
+                        key_source = TableName("src", schema, self.manager.key_table(table))
+                        connection.execute_command(
+                            f"DELETE FROM {target} WHERE {Name(self.key)} IN "
+                            f"(SELECT {Name(self.key)} FROM {key_source})"
+                        )
+                        connection.execute_command(
+                            f"INSERT INTO {target} SELECT * FROM {TableName('src', schema, table)}"
+                        )
+                finally:
+                    connection.catalog.detach_database("src")
+                    connection.catalog.detach_database("archive")
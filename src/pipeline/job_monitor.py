@@ -0,0 +1,237 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import math
+import time
+
+import tableauserverclient as TSC
+from tableauserverclient import JobItem
+from tableauserverclient.server.endpoint.exceptions import (
+    JobFailedException,
+    JobCancelledException
+)
+
+from src.core.aio import run_blocking
+from src.core.telemetry import span
+from src.pipeline.tableau_cloud import TableauCloudPublisher
+
+logger = logging.getLogger(__name__)
+
+_FINISHED_STATUSES = {
+    TSC.BackgroundJobItem.Status.Success,
+    TSC.BackgroundJobItem.Status.Failed,
+    TSC.BackgroundJobItem.Status.Cancelled,
+}
+
+
+@dataclass
+class _TrackedJob:
+    future: asyncio.Future
+    registered_at: datetime
+    deadline: float
+
+
+class TableauJobMonitor:
+    """
+    Tracks all outstanding Tableau jobs with one shared polling loop.
+
+    Each poll lists recent site jobs and only fetches the full JobItem of jobs
+    that have finished. The listing is read for at most max_pages pages, and
+    never for more pages than there are tracked jobs; past that, and on sites
+    where the listing is not permitted, the poll looks up each tracked job by
+    id instead, still from a single loop. Every request counts in stats(). The interval starts at min_interval, grows by backoff while nothing
+    changes, and resets whenever a job is added or finishes.
+    """
+
+    def __init__(
+        self,
+        publisher: TableauCloudPublisher,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        backoff: float = 1.5,
+        page_size: int = 1000,
+        max_pages: int = 3
+    ):
+        self.publisher = publisher
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.page_size = page_size
+        self.max_pages = max(1, max_pages)
+        self.interval = min_interval
+        self._jobs: Dict[str, _TrackedJob] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._listing_supported = True
+        self.polls = 0
+        self.requests = 0
+        self.jobs_completed = 0
+        self.jobs_timed_out = 0
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="tableau-job-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for tracked in self._jobs.values():
+            if not tracked.future.done():
+                tracked.future.cancel()
+        self._jobs.clear()
+
+    async def wait(self, job_id: str, timeout: float = 300) -> JobItem:
+        """
+        Wait for a job to finish.
+
+        Returns the final JobItem on success, raises JobFailedException or
+        JobCancelledException like TSC's wait_for_job, and TimeoutError after
+        timeout seconds. The publisher's archive is settled with the outcome.
+        """
+        await self.start()
+        tracked = self._jobs.get(job_id)
+        deadline = time.monotonic() + timeout
+        if tracked is None:
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            tracked = _TrackedJob(future, datetime.now(UTC), deadline)
+            self._jobs[job_id] = tracked
+            self.interval = self.min_interval
+            self._wakeup.set()
+        else:
+            tracked.deadline = max(tracked.deadline, deadline)
+        succeeded = False
+        try:
+            with span("job_wait"):
+                final_job = await asyncio.wait_for(asyncio.shield(tracked.future), timeout)
+            succeeded = True
+            return final_job
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Timeout after {timeout} seconds waiting for job {job_id}")
+        finally:
+            await self.publisher.settle_archive(job_id, succeeded)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._jobs:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            self._expire()
+            if not self._jobs:
+                continue
+
+            try:
+                finished = await run_blocking(
+                    self.publisher.call_with_session,
+                    self._poll,
+                    list(self._jobs),
+                    min(tracked.registered_at for tracked in self._jobs.values()),
+                    timeout=self.publisher.timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Tableau job poll failed: {str(e)}")
+                finished = []
+
+            for job in finished:
+                self._resolve(job)
+            if finished:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def _poll(self, job_ids: List[str], since: datetime) -> List[JobItem]:
+        """Return the final JobItems of tracked jobs that have finished (blocking)"""
+        self.polls += 1
+        candidates = None
+        if self._listing_supported:
+            try:
+                candidates = self._finished_ids(set(job_ids), since)
+            except TSC.ServerResponseError as e:
+                logger.warning(f"Jobs listing unavailable ({e.code}); polling jobs individually")
+                self._listing_supported = False
+        if candidates is None:
+            candidates = job_ids
+
+        finished = []
+        for job_id in candidates:
+            self.requests += 1
+            job = self.publisher.server.jobs.get_by_id(job_id)
+            if job.completed_at is not None:
+                finished.append(job)
+        return finished
+
+    def _finished_ids(self, job_ids: set, since: datetime) -> Optional[List[str]]:
+        """
+        Ids of tracked jobs the site listing reports as finished (blocking)
+
+        Returns None, after reading the first page, when the listing spans
+        more pages than the per-id lookups it would save.
+        """
+        max_pages = min(self.max_pages, len(job_ids))
+        options = TSC.RequestOptions(pagesize=self.page_size)
+        # a minute of slack covers clock skew between us and Tableau
+        created_after = (since - timedelta(minutes=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        options.filter.add(TSC.Filter(
+            TSC.RequestOptions.Field.CreatedAt,
+            TSC.RequestOptions.Operator.GreaterThanOrEqual,
+            created_after
+        ))
+        finished = []
+        while True:
+            self.requests += 1
+            jobs, pagination = self.publisher.server.jobs.get(req_options=options)
+            for job in jobs:
+                if job.id in job_ids and job.status in _FINISHED_STATUSES:
+                    finished.append(job.id)
+            pages = math.ceil(pagination.total_available / max(1, pagination.page_size))
+            if options.pagenumber >= pages:
+                return finished
+            if pages > max_pages:
+                logger.debug(f"Jobs listing spans {pages} pages; looking up {len(job_ids)} jobs by id")
+                return None
+            options.pagenumber += 1
+
+    def _resolve(self, job: JobItem) -> None:
+        tracked = self._jobs.pop(job.id, None)
+        if tracked is None or tracked.future.done():
+            return
+        self.jobs_completed += 1
+        logger.info(f"Tableau job {job.id} finished with code {job.finish_code}")
+        if job.finish_code == JobItem.FinishCode.Failed:
+            tracked.future.set_exception(JobFailedException(job))
+        elif job.finish_code == JobItem.FinishCode.Cancelled:
+            tracked.future.set_exception(JobCancelledException(job))
+        else:
+            tracked.future.set_result(job)
+
+    def _expire(self) -> None:
+        """Stop tracking jobs whose waiters have all timed out"""
+        now = time.monotonic()
+        for job_id in [jid for jid, tracked in self._jobs.items() if tracked.deadline <= now]:
+            tracked = self._jobs.pop(job_id)
+            self.jobs_timed_out += 1
+            if not tracked.future.done():
+                tracked.future.set_exception(TimeoutError(f"Stopped tracking job {job_id}"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tracked_jobs": len(self._jobs),
+            "poll_interval_seconds": round(self.interval, 2),
+            "polls": self.polls,
+            "requests": self.requests,
+            "jobs_completed": self.jobs_completed,
+            "jobs_timed_out": self.jobs_timed_out,
+            "listing_supported": self._listing_supported,
+        }
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import datetime, UTC
 import json
-from typing import List
+from typing import Dict, Iterable, List
+import pyarrow as pa
 from src.models.ranking import RankingResult
 
 class TableauDataRow(BaseModel):
@@ -17,13 +18,68 @@ class TableauDataRow(BaseModel):
     methodology: str = Field(..., description="Analysis methodology")
     batch_id: str = Field(..., description="Unique batch identifier")
 
+# Column layout of the Rankings extract table (timestamps are naive UTC)
+RANKINGS_ARROW_SCHEMA = pa.schema([
+    ("topic", pa.string()),
+    ("generated_at", pa.timestamp("us")),
+    ("rank", pa.int32()),
+    ("item_name", pa.string()),
+    ("score", pa.float64()),
+    ("advantages", pa.string()),
+    ("metrics", pa.string()),
+    ("sources", pa.string()),
+    ("methodology", pa.string()),
+    ("batch_id", pa.string()),
+])
+
+# Normalized layout: batch-level values stored once, items and their metrics
+# and advantages in long format, all joined on batch_id (and rank)
+NORMALIZED_ARROW_SCHEMAS = {
+    "Batches": pa.schema([
+        ("batch_id", pa.string()),
+        ("topic", pa.string()),
+        ("generated_at", pa.timestamp("us")),
+        ("sources", pa.string()),
+        ("methodology", pa.string()),
+    ]),
+    "Items": pa.schema([
+        ("batch_id", pa.string()),
+        ("rank", pa.int32()),
+        ("item_name", pa.string()),
+        ("score", pa.float64()),
+    ]),
+    "ItemMetrics": pa.schema([
+        ("batch_id", pa.string()),
+        ("rank", pa.int32()),
+        ("metric", pa.string()),
+        ("value", pa.float64()),
+    ]),
+    "ItemAdvantages": pa.schema([
+        ("batch_id", pa.string()),
+        ("rank", pa.int32()),
+        ("position", pa.int32()),
+        ("advantage", pa.string()),
+    ]),
+}
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(UTC).replace(tzinfo=None)
+
 class TableauDataConverter:
     """Converts RankingResult to Tableau-friendly format"""
     
     @staticmethod
     def generate_batch_id(topic: str, timestamp: datetime) -> str:
-        """Generate a unique batch ID for tracking"""
-        return f"{topic}_{timestamp.strftime('%Y%m%d%H%M%S')}"
+        """
+        Generate a unique batch ID for tracking
+
+        Derived from the ranking itself so the Tableau rows, the upsert key and
+        the history entry agree; microsecond resolution keeps two rankings of
+        one topic generated within the same second apart.
+        """
+        return f"{topic}_{timestamp.strftime('%Y%m%d%H%M%S%f')}"
     
     @classmethod
     def convert(cls, ranking: RankingResult) -> List[TableauDataRow]:
@@ -44,4 +100,82 @@ class TableauDataConverter:
                 batch_id=batch_id
             )
             for item in ranking.items
-        ] 
\ No newline at end of file
+        ]
+
+    @classmethod
+    def to_table(cls, rankings: Iterable[RankingResult]) -> pa.Table:
+        """
+        Convert many RankingResults into one Arrow table.
+
+        Builds columns directly instead of a validated TableauDataRow per item,
+        and serializes per-ranking values (sources, batch id) once per ranking.
+        """
+        columns = {name: [] for name in RANKINGS_ARROW_SCHEMA.names}
+        for ranking in rankings:
+            count = len(ranking.items)
+            columns["topic"].extend([ranking.topic] * count)
+            columns["generated_at"].extend([_naive_utc(ranking.generated_at)] * count)
+            columns["sources"].extend([json.dumps(ranking.sources)] * count)
+            columns["methodology"].extend([ranking.methodology] * count)
+            columns["batch_id"].extend(
+                [cls.generate_batch_id(ranking.topic, ranking.generated_at)] * count
+            )
+            for item in ranking.items:
+                columns["rank"].append(item.rank)
+                columns["item_name"].append(item.name)
+                columns["score"].append(item.score or 0.0)
+                columns["advantages"].append(json.dumps(item.advantages))
+                columns["metrics"].append(json.dumps(item.metrics))
+        return pa.Table.from_pydict(columns, schema=RANKINGS_ARROW_SCHEMA)
+
+    @staticmethod
+    def rows_to_table(rows: List[TableauDataRow]) -> pa.Table:
+        """Convert already built TableauDataRows into an Arrow table"""
+        columns = {name: [] for name in RANKINGS_ARROW_SCHEMA.names}
+        for row in rows:
+            for name, values in columns.items():
+                values.append(getattr(row, name))
+        columns["generated_at"] = [_naive_utc(value) for value in columns["generated_at"]]
+        return pa.Table.from_pydict(columns, schema=RANKINGS_ARROW_SCHEMA)
+
+    @staticmethod
+    def normalize(table: pa.Table) -> Dict[str, pa.Table]:
+        """Split a Rankings table into the normalized Batches/Items/ItemMetrics/ItemAdvantages tables"""
+        batches = table.group_by("batch_id", use_threads=False).aggregate([
+            ("topic", "first"),
+            ("generated_at", "first"),
+            ("sources", "first"),
+            ("methodology", "first"),
+        ])
+        batches = batches.rename_columns(
+            [name.removesuffix("_first") for name in batches.column_names]
+        )
+
+        metrics = {name: [] for name in NORMALIZED_ARROW_SCHEMAS["ItemMetrics"].names}
+        advantages = {name: [] for name in NORMALIZED_ARROW_SCHEMAS["ItemAdvantages"].names}
+        for batch_id, rank, item_metrics, item_advantages in zip(
+            table["batch_id"].to_pylist(),
+            table["rank"].to_pylist(),
+            table["metrics"].to_pylist(),
+            table["advantages"].to_pylist(),
+        ):
+            for metric, value in json.loads(item_metrics).items():
+                metrics["batch_id"].append(batch_id)
+                metrics["rank"].append(rank)
+                metrics["metric"].append(metric)
+                metrics["value"].append(value)
+            for position, advantage in enumerate(json.loads(item_advantages), start=1):
+                advantages["batch_id"].append(batch_id)
+                advantages["rank"].append(rank)
+                advantages["position"].append(position)
+                advantages["advantage"].append(advantage)
+
+        return {
+            "Batches": batches.select(NORMALIZED_ARROW_SCHEMAS["Batches"].names)
+                              .cast(NORMALIZED_ARROW_SCHEMAS["Batches"]),
+            "Items": table.select(NORMALIZED_ARROW_SCHEMAS["Items"].names),
+            "ItemMetrics": pa.Table.from_pydict(metrics, schema=NORMALIZED_ARROW_SCHEMAS["ItemMetrics"]),
+            "ItemAdvantages": pa.Table.from_pydict(
+                advantages, schema=NORMALIZED_ARROW_SCHEMAS["ItemAdvantages"]
+            ),
+        }
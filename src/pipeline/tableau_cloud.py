@@ -1,21 +1,44 @@
 from pathlib import Path
+import asyncio
+import json
+import logging
+import threading
+import time
+import requests
+import pyarrow as pa
 import tableauserverclient as TSC
-from typing import List, BinaryIO
+from typing import Any, Callable, Dict, List, BinaryIO, Optional, TypeVar, Union
 from datetime import datetime
+import uuid
 from src.pipeline.tableau import TableauDataRow
-from src.pipeline.hyper import HyperFileManager
-from tableauhyperapi import (
-    HyperProcess, 
-    Telemetry, 
-    Connection, 
-    CreateMode,
-    TableDefinition,
-    SqlType,
-    TableName,
-    Name,
-    Inserter
+from src.pipeline.hyper import HyperArchive, HyperFileManager, FLAT_LAYOUT, validate_upsert_key
+from src.pipeline.datasources import DatasourceResolver
+from src.pipeline.uploads import BYTES_PER_MB, ChunkedUploader, log_progress
+from tableauserverclient.server.endpoint.exceptions import (
+    JobFailedException,
+    JobCancelledException,
+    NotSignedInError
 )
-from tableauserverclient import JobItem  
+from src.core.aio import run_blocking
+from src.core.ratelimit import get_upstream_limiter
+from src.core.telemetry import RETRIES, span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RateLimitedSession(requests.Session):
+    """
+    HTTP session whose requests pass through the Tableau upstream limiter
+
+    Every TSC call (sign-in, lookups, chunk uploads, job polls) is paced by
+    the adaptive limiter; 429 responses back it off and are retried before
+    TSC sees them.
+    """
+
+    def request(self, method, url, *args, **kwargs):
+        return get_upstream_limiter("tableau").call_sync(super().request, method, url, *args, **kwargs)
 
 
 class TableauCloudPublisher:
@@ -27,13 +50,55 @@ class TableauCloudPublisher:
         site_name: str,
         token_name: str,
         token_value: str,
-        datasource_name: str
+        datasource_name: str,
+        timeout: float = 120.0,
+        session_ttl: float = 3600.0,
+        datasource_cache_ttl: float = 300.0,
+        http_pool_size: int = 32,
+        server: Optional[TSC.Server] = None,
+        hyper_layout: str = FLAT_LAYOUT,
+        upsert_key: Optional[str] = None,
+        archive: Optional[HyperArchive] = None,
+        keep_temp_files: bool = False,
+        upload_chunk_mb: int = 4,
+        upload_retries: int = 3
     ):
+        """
+        Args:
+            timeout: Per-call timeout in seconds for Tableau REST calls, which
+                     run on the shared blocking I/O executor; uploads have no
+                     overall deadline and apply it to each chunk instead
+            session_ttl: Seconds a signed-in session is reused before signing in again
+            datasource_cache_ttl: Seconds a resolved datasource item is reused
+            http_pool_size: Max pooled HTTP connections to the Tableau host
+            server: Pre-built TSC server (defaults to one for server_url)
+            hyper_layout: "flat" (one Rankings table) or "normalized" (Batches, Items,
+                          ItemMetrics and ItemAdvantages); the datasource must have
+                          the tables of the chosen layout
+            upsert_key: Column ("batch_id" or "topic") whose existing rows each update
+                        deletes before inserting, making re-publishes idempotent;
+                        None appends only
+            archive: Optional local archive that every successfully published extract
+                     is merged into once its update job has finished
+            keep_temp_files: Keep the temporary Hyper files after upload (debugging)
+            upload_chunk_mb: Size of the chunks Hyper files are uploaded in
+            upload_retries: Retries per chunk on connection errors and 5xx responses
+        """
         self.server_url = server_url
         self.site_name = site_name
         self.token_name = token_name
         self.token_value = token_value
         self.datasource_name = datasource_name
+        self.timeout = timeout
+        self.session_ttl = session_ttl
+        self.datasource_cache_ttl = datasource_cache_ttl
+        self.http_pool_size = http_pool_size
+        self.hyper_layout = hyper_layout
+        self.upsert_key = validate_upsert_key(upsert_key, hyper_layout)
+        self.archive = archive
+        self.keep_temp_files = keep_temp_files
+        # extracts waiting for their update job to succeed before entering the archive
+        self._pending_archive: Dict[str, Path] = {}
         
         # Initialize Tableau Server client
         self.tableau_auth = TSC.PersonalAccessTokenAuth(
@@ -41,72 +106,185 @@ class TableauCloudPublisher:
             personal_access_token=token_value,
             site_id=site_name
         )
-        self.server = TSC.Server(server_url, use_server_version=True)
+        # The server version is looked up once, on the first sign-in
+        self.server = server or TSC.Server(server_url, session_factory=self._new_http_session)
+        self._version_resolved = False
+        self._session_lock = threading.Lock()
+        self._signed_in_at: Optional[float] = None
+        self.resolver = DatasourceResolver(self.server, ttl=datasource_cache_ttl)
+        self.uploader = ChunkedUploader(
+            self.server,
+            chunk_size=upload_chunk_mb * BYTES_PER_MB,
+            max_retries=upload_retries,
+            call=self.call_with_session,
+            request_timeout=timeout
+        )
+
+    def _new_http_session(self) -> requests.Session:
+        """Rate-limited HTTP session with a connection pool sized for concurrent executor threads"""
+        session = RateLimitedSession()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=self.http_pool_size
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _ensure_signed_in(self) -> None:
+        """Sign in unless a session younger than session_ttl exists (blocking)"""
+        with self._session_lock:
+            fresh = (
+                self.server.is_signed_in()
+                and self._signed_in_at is not None
+                and time.monotonic() - self._signed_in_at < self.session_ttl
+            )
+            if fresh:
+                return
+            if not self._version_resolved:
+                self.server.use_server_version()
+                self._version_resolved = True
+            self.server.auth.sign_in(self.tableau_auth)
+            self._signed_in_at = time.monotonic()
+            logger.info(f"Signed in to Tableau site '{self.site_name}'")
+
+    def _invalidate_session(self) -> None:
+        with self._session_lock:
+            self._signed_in_at = None
+
+    def call_with_session(self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Run a blocking TSC call on the shared signed-in session.
+
+        Re-authenticates and retries once when the session has expired (401),
+        and drops the cached datasource and retries once when it is gone (404).
+        Callers that use self.server directly (the job monitor, the uploader)
+        go through here too.
+        """
+        self._ensure_signed_in()
+        try:
+            return fn(*args)
+        except NotSignedInError:
+            self._invalidate_session()
+        except TSC.ServerResponseError as e:
+            code = str(e.code)
+            if code.startswith("401"):
+                self._invalidate_session()
+            elif code.startswith("404"):
+                self.invalidate_datasource_cache()
+            else:
+                raise
+        RETRIES.inc(operation="tableau_session")
+        self._ensure_signed_in()
+        return fn(*args)
+
+    def invalidate_datasource_cache(self) -> None:
+        self.resolver.invalidate(self.datasource_name)
+
+    async def refresh_datasource_index(self, interval: float) -> None:
+        """
+        Rebuild the datasource index every interval seconds (run as a background task)
+
+        Rebuilds list every datasource of the site, so they only run once the
+        name filter has been rejected; filtered lookups need no index.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            if self.resolver.filter_supported:
+                continue
+            try:
+                await run_blocking(
+                    self.call_with_session,
+                    self.resolver.rebuild_index,
+                    timeout=self.timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Datasource index refresh failed: {str(e)}")
+
+    def close(self) -> None:
+        """Sign out of the shared session (blocking)"""
+        with self._session_lock:
+            if self.server.is_signed_in():
+                try:
+                    self.server.auth.sign_out()
+                except Exception as e:
+                    logger.warning(f"Tableau sign-out failed: {str(e)}")
+            self._signed_in_at = None
+
+    def _find_datasource(self) -> TSC.DatasourceItem:
+        """Find the target datasource item (blocking; requires a signed-in session)"""
+        return self.resolver.resolve(self.datasource_name)
 
     async def _get_datasource_id(self) -> str:
         """Get the ID of the target datasource"""
-        all_datasources, _ = self.server.datasources.get()
-        for datasource in all_datasources:
-            if datasource.name == self.datasource_name:
-                return datasource.id
-        raise ValueError(f"Datasource '{self.datasource_name}' not found")
+        datasource = await run_blocking(
+            self.call_with_session,
+            self._find_datasource,
+            timeout=self.timeout
+        )
+        return datasource.id
 
-    async def _create_temp_hyper_file(self, data: List[TableauDataRow], temp_dir: Path) -> Path:
+    async def _create_temp_hyper_file(
+        self,
+        data: Union[List[TableauDataRow], pa.Table],
+        temp_dir: Path
+    ) -> Path:
         """Create a temporary Hyper file with the provided data"""
-        manager = HyperFileManager(temp_dir)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        temp_hyper_path = manager.create_hyper_file(f"temp_{timestamp}", data)
+        manager = HyperFileManager(temp_dir, layout=self.hyper_layout)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        with span("hyper_build"):
+            temp_hyper_path = await run_blocking(
+                manager.create_hyper_file,
+                f"temp_{timestamp}",
+                data,
+                timeout=self.timeout
+            )
         return temp_hyper_path
 
     async def _check_datasource_type(self) -> bool:
+        return await run_blocking(
+            self.call_with_session,
+            self._check_datasource_type_sync,
+            timeout=self.timeout
+        )
+
+    def _check_datasource_type_sync(self) -> bool:
  
-        with self.server.auth.sign_in(self.tableau_auth):
-            try:
-                # get all datasources
-                all_datasources, _ = self.server.datasources.get()
-                
-
-                # find target datasource
-                target_datasource = None
-                for datasource in all_datasources:
-                    if datasource.name == self.datasource_name:
-
-                        target_datasource = datasource
-                        break
-                
-                if not target_datasource:
-                    raise ValueError(f"Datasource '{self.datasource_name}' not found")
-                
-                # get datasource details
-                self.server.datasources.populate_connections(target_datasource)
-                
-
-                # print datasource details for debugging
-                print("\nDatasource details:")
-                print(f"  - Name: {target_datasource.name}")
-                print(f"  - ID: {target_datasource.id}")
-                print(f"  - Type: {target_datasource.datasource_type}")
-                print(f"  - Has extracts: {target_datasource.has_extracts}")
-                
-
-                if hasattr(target_datasource, 'connections'):
-                    for conn in target_datasource.connections:
-                        print(f"  - Connection type: {conn.connection_type}")
-                        print(f"  - Server address: {conn.server_address}")
-                        print(f"  - Connection attributes: {conn.__dict__}")
-                
-                is_live_to_hyper = (
-                    target_datasource.has_extracts and
-                    hasattr(target_datasource, 'connections') and
-                    any(conn.connection_type == 'hyper' for conn in target_datasource.connections)
-                )
-                
-                print(f"\nIs live-to-Hyper: {is_live_to_hyper}")
-                return is_live_to_hyper
-                
-            except Exception as e:
-                print(f"  ❌ Error checking datasource type: {str(e)}")
-                raise
+        try:
+            # find target datasource
+            target_datasource = self._find_datasource()
+            
+            # get datasource details
+            self.server.datasources.populate_connections(target_datasource)
+            
+
+            # log datasource details for debugging
+            logger.debug(
+                f"Datasource details: name={target_datasource.name} id={target_datasource.id} "
+                f"type={target_datasource.datasource_type} has_extracts={target_datasource.has_extracts}"
+            )
+
+            if hasattr(target_datasource, 'connections'):
+                for conn in target_datasource.connections:
+                    logger.debug(
+                        f"Connection type={conn.connection_type} server={conn.server_address} "
+                        f"attributes={conn.__dict__}"
+                    )
+            
+            is_live_to_hyper = (
+                target_datasource.has_extracts and
+                hasattr(target_datasource, 'connections') and
+                any(conn.connection_type == 'hyper' for conn in target_datasource.connections)
+            )
+            
+            logger.info(f"Datasource {target_datasource.name} is live-to-Hyper: {is_live_to_hyper}")
+            return is_live_to_hyper
+            
+        except Exception as e:
+            logger.error(f"Error checking datasource type: {str(e)}")
+            raise
 
     async def update_hyper_data(
         self,
@@ -125,46 +303,60 @@ class TableauCloudPublisher:
         Returns:
             JobItem for tracking the update progress
         """
-        with self.server.auth.sign_in(self.tableau_auth):
-            try:
-                # Get datasource ID
-                datasource_id = await self._get_datasource_id()
-                print(f"  - Found datasource ID: {datasource_id}")
-                
-                # Start upload session
-                upload_session_id = self.server.fileuploads.initiate()
-                print(f"  - Started upload session: {upload_session_id}")
-                
-                # Read file content and upload
-                file_content = payload.read()
-                self.server.fileuploads.append(
-                    upload_session_id, 
-                    file_content,
-                    content_type='application/x-hyper'
-                )
-                print("  - Uploaded Hyper file")
-                
-                # Send update request
-                job = self.server.datasources.update_hyper_data(
+        try:
+            datasource_id = await self._get_datasource_id()
+            logger.debug(f"Found datasource ID: {datasource_id}")
+
+            upload_session_id = await self._upload(payload, "Uploading Hyper file")
+            logger.debug(f"Uploaded Hyper file to session: {upload_session_id}")
+
+            # Send update request
+            with span("job_start"):
+                job = await run_blocking(
+                    self.call_with_session,
+                    self._request_update,
                     datasource_id,
                     upload_session_id,
                     actions,
-                    request_id=request_id
+                    request_id,
+                    timeout=self.timeout
                 )
-                print(f"  - Initiated update job: {job.id}")
-                
-                return job
-                
-            except Exception as e:
-                print(f"  ❌ Error in update_hyper_data: {str(e)}")
-                raise
-            finally:
-                # Reset file pointer position
-                payload.seek(0)
+            logger.info(f"Initiated update job: {job.id}")
+
+            return job
+
+        except Exception as e:
+            logger.error(f"Error in update_hyper_data: {str(e)}")
+            raise
+        finally:
+            # Reset file pointer position
+            payload.seek(0)
 
-    async def update_data(self, data: List[TableauDataRow], temp_dir: Path = None) -> str:
+    async def _upload(self, source: Union[Path, BinaryIO], label: str) -> str:
+        """
+        Upload a file in chunks and return the upload session id
+
+        Runs without an overall timeout, since multi-GB files take as long as
+        they take; each chunk request has its own timeout and session renewal.
+        Cancelling the caller stops the upload before its next chunk, so no
+        thread keeps uploading for a job that will never be started.
+        """
+        stop = threading.Event()
+        try:
+            with span("upload"):
+                return await run_blocking(self.uploader.upload, source, log_progress(label), stop)
+        finally:
+            stop.set()
+
+    async def update_data(
+        self,
+        data: Union[List[TableauDataRow], pa.Table],
+        temp_dir: Path = None
+    ) -> str:
         """
         High-level method to update data in Tableau Cloud using a Hyper file
+
+        data may be a list of rows or an Arrow table from TableauDataConverter.to_table
         """
         if temp_dir is None:
             temp_dir = Path("data/temp")
@@ -174,96 +366,210 @@ class TableauCloudPublisher:
         try:
             # create temporary Hyper file
             temp_hyper_path = await self._create_temp_hyper_file(data, temp_dir)
-            print("  - Created temporary Hyper file")
-            print(f"  - Hyper file path: {temp_hyper_path}")
-            
+            logger.debug(f"Created temporary Hyper file: {temp_hyper_path}")
 
-            with self.server.auth.sign_in(self.tableau_auth):
-                # get existing datasource
-                all_datasources, _ = self.server.datasources.get()
-                datasource_item = next(
-                    (ds for ds in all_datasources if ds.name == self.datasource_name),
-                    None
-                )
+            job_id = await self._start_update_job(temp_hyper_path)
 
-                
-                if not datasource_item:
-                    raise ValueError(f"Datasource '{self.datasource_name}' not found")
-                
-                # prepare update request
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                request_id = f"update_{timestamp}"
-                
-
-                # define update actions - use insert action to append data
-                actions = [{
-                    "action": "insert",
-                    "source-schema": "Extract",  
-                    "source-table": "Rankings",   
-                    "target-schema": "Extract",
-                    "target-table": "Rankings"
-
-                }]
-                
-                # use update_hyper_data method to update data
-                print("  - Updating datasource with insert action...")
-                print(f"  - Using datasource: {datasource_item.name} (ID: {datasource_item.id})")
-                print(f"  - Request ID: {request_id}")
-                print(f"  - Actions: {actions}")
-                
-
-                job = self.server.datasources.update_hyper_data(
-                    datasource_or_connection_item=datasource_item,
-                    request_id=request_id,
-                    actions=actions,
-                    payload=str(temp_hyper_path)
-                )
-                
-                if not job:
-                    raise Exception("Failed to start update job")
-                    
-                print(f"  - Update job started with ID: {job.id}")
-                return job.id
+            if self.archive is not None:
+                # merged by settle_archive() once the job is known to have succeeded
+                self._pending_archive[job_id] = temp_hyper_path
+                temp_hyper_path = None
+            return job_id
 
         except Exception as e:
-            print(f"\n  ❌ Error during data update: {str(e)}")
+            logger.error(f"Error during data update: {str(e)}")
             raise
         
         finally:
-            # temporarily comment out cleanup code, keep temporary file for debugging
-            if temp_hyper_path and Path(temp_hyper_path).exists():
-                print(f"  - Debug: Temporary file kept at {temp_hyper_path}")
+            # the payload is uploaded before the job starts, so the file is no longer needed
+            if temp_hyper_path:
+                self._discard_temp_file(temp_hyper_path)
+
+    async def settle_archive(self, job_id: str, succeeded: bool) -> None:
+        """
+        Merge the extract of a finished update job into the local archive
+
+        Called by every job wait once the outcome is known; extracts of jobs
+        that failed, were cancelled or timed out are dropped, so the archive
+        only mirrors data Tableau accepted. Unknown job ids are ignored.
+        """
+        path = self._pending_archive.pop(job_id, None)
+        if path is None:
+            return
+        try:
+            if succeeded:
+                await run_blocking(self.archive.apply, path, timeout=self.timeout)
+            else:
+                logger.warning(f"Update job {job_id} did not succeed; local Hyper archive left unchanged")
+        except Exception as e:
+            # the remote update has succeeded; the archive only mirrors it
+            logger.warning(f"Failed to update local Hyper archive: {str(e)}")
+        finally:
+            self._discard_temp_file(path)
 
+    def _discard_temp_file(self, path: Path) -> None:
+        if self.keep_temp_files:
+            logger.info(f"Temporary file kept at {path}")
+        else:
+            Path(path).unlink(missing_ok=True)
+
+    async def _start_update_job(self, temp_hyper_path: Path) -> str:
+        """Upload a Hyper file and start the update job applying it; returns the job id"""
+        datasource_id = await self._get_datasource_id()
+
+        # prepare update request; the id must be unique per job because Tableau
+        # ignores repeated request ids and concurrent jobs share this publisher
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        request_id = f"update_{timestamp}_{uuid.uuid4().hex[:8]}"
+
+        # define update actions - replace rows sharing the upsert key, then insert
+        actions = self._update_actions()
+
+        logger.info(f"Updating datasource {self.datasource_name} (ID: {datasource_id}), request {request_id}")
+        logger.debug(f"Update actions: {actions}")
+
+        upload_session_id = await self._upload(temp_hyper_path, f"Uploading {Path(temp_hyper_path).name}")
+        with span("job_start"):
+            job = await run_blocking(
+                self.call_with_session,
+                self._request_update,
+                datasource_id,
+                upload_session_id,
+                actions,
+                request_id,
+                timeout=self.timeout
+            )
+
+        if not job:
+            raise Exception("Failed to start update job")
+
+        logger.info(f"Update job started with ID: {job.id}")
+        return job.id
+
+    def _request_update(
+        self,
+        datasource_id: str,
+        upload_session_id: str,
+        actions: List[dict],
+        request_id: str
+    ) -> TSC.JobItem:
+        """
+        Apply actions with an already uploaded file (blocking)
+
+        Same request as TSC's update_hyper_data, which can only upload the
+        payload itself in one pass without retries.
+        """
+        endpoint = self.server.datasources
+        url = f"{endpoint.baseurl}/{datasource_id}/data?uploadSessionId={upload_session_id}"
+        response = endpoint.patch_request(
+            url,
+            json.dumps({"actions": actions}),
+            "application/json",
+            parameters={"headers": {"requestid": request_id}}
+        )
+        return TSC.JobItem.from_response(response.content, self.server.namespace)[0]
+
+    def _update_actions(self) -> List[dict]:
+        """
+        Actions inserting every table of the Hyper layout into the datasource
+
+        With an upsert key, each table first deletes the rows whose key
+        appears in the payload, so a re-published batch replaces itself.
+        """
+        manager = HyperFileManager(Path("."), layout=self.hyper_layout)
+        schema = manager.schema_name
+        actions = []
+        for table in manager.tables:
+            if self.upsert_key:
+                actions.append({
+                    "action": "delete",
+                    "source-schema": schema,
+                    "source-table": manager.key_table(table),
+                    "target-schema": schema,
+                    "target-table": table,
+                    "condition": {
+                        "op": "eq",
+                        "target-col": self.upsert_key,
+                        "source-col": self.upsert_key
+                    }
+                })
+            actions.append({
+                "action": "insert",
+                "source-schema": schema,
+                "source-table": table,
+                "target-schema": schema,
+                "target-table": table
+            })
+        return actions
 
     async def wait_for_job(self, job_id: str, timeout: int = 300) -> TSC.JobItem:
-        """Wait for job completion using TSC native method"""
+        """Wait for job completion without blocking the event loop"""
+        # Polling runs on the blocking I/O executor; the stop event lets a
+        # cancelled or timed-out caller end the poll loop instead of leaving
+        # a thread polling Tableau until the job finishes.
+        stop = threading.Event()
+        succeeded = False
         try:
-            with self.server.auth.sign_in(self.tableau_auth):
-                print(f"  - Waiting for job {job_id} completion (timeout: {timeout}s)")
-                # use TSC built-in wait method
-                final_job = self.server.jobs.wait_for_job(job_id, timeout=timeout)
-                
-                # print final status
-                print(f"  - Final job status:")
-                finish_code_map = {
-                    0: "Success",
-                    1: "Failed", 
-                    2: "Cancelled"
-                }
-
-                print(f"    - Finish code: {final_job.finish_code} "
-                     f"({finish_code_map.get(final_job.finish_code, 'Unknown')})")
-                print(f"    - Created at: {final_job.created_at}")
-                print(f"    - Started at: {final_job.started_at}")
-                print(f"    - Completed at: {final_job.completed_at}")
-                if final_job.notes:
-                    print(f"    - Notes: {final_job.notes}")
-                
-                return final_job
-                
+            with span("job_wait"):
+                final_job = await run_blocking(
+                    self.call_with_session,
+                    self._wait_for_job_sync,
+                    job_id,
+                    timeout,
+                    stop,
+                    timeout=timeout + self.timeout
+                )
+            succeeded = True
+            return final_job
         except TSC.ServerResponseError as e:
-            print(f"  ❌ Tableau job failed: {e}")
+            logger.error(f"Tableau job failed: {e}")
             raise Exception(f"Tableau job error: {str(e)}")
         except Exception as e:
-            print(f"  ❌ Error waiting for job: {str(e)}")
-            raise  
\ No newline at end of file
+            logger.error(f"Error waiting for job: {str(e)}")
+            raise
+        finally:
+            stop.set()
+            await self.settle_archive(job_id, succeeded)
+
+    def _wait_for_job_sync(
+        self,
+        job_id: str,
+        timeout: float,
+        stop: Optional[threading.Event] = None
+    ) -> TSC.JobItem:
+        """Poll a job with exponential backoff until it completes (blocking)"""
+        stop = stop or threading.Event()
+        logger.info(f"Waiting for job {job_id} completion (timeout: {timeout}s)")
+        deadline = time.monotonic() + timeout
+        delay = 0.5
+        final_job = self.server.jobs.get_by_id(job_id)
+        while final_job.completed_at is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Timeout after {timeout} seconds waiting for job {job_id}")
+            if stop.wait(min(delay, remaining)):
+                raise RuntimeError(f"Stopped waiting for job {job_id}")
+            delay = min(delay * 2, 30.0)
+            final_job = self.server.jobs.get_by_id(job_id)
+
+        # log final status
+        finish_code_map = {
+            0: "Success",
+            1: "Failed", 
+            2: "Cancelled"
+        }
+
+        logger.info(
+            f"Job {job_id} finished with code {final_job.finish_code} "
+            f"({finish_code_map.get(final_job.finish_code, 'Unknown')}); "
+            f"created {final_job.created_at}, started {final_job.started_at}, "
+            f"completed {final_job.completed_at}"
+        )
+        if final_job.notes:
+            logger.info(f"Job {job_id} notes: {final_job.notes}")
+
+        if final_job.finish_code == TSC.JobItem.FinishCode.Failed:
+            raise JobFailedException(final_job)
+        if final_job.finish_code == TSC.JobItem.FinishCode.Cancelled:
+            raise JobCancelledException(final_job)
+        return final_job
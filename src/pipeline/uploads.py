@@ -0,0 +1,197 @@
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Optional, TypeVar, Union
+import logging
+import os
+import threading
+import time
+
+import requests
+import tableauserverclient as TSC
+from tableauserverclient.server import RequestFactory
+
+from src.core.telemetry import RETRIES
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+BYTES_PER_MB = 1024 * 1024
+
+ProgressCallback = Callable[[int, int], None]
+# Runs one blocking TSC call on a signed-in session, renewing it when it has expired
+SessionCall = Callable[..., Any]
+
+
+class UploadError(Exception):
+    """Raised when a chunk could not be uploaded after all retries"""
+    pass
+
+
+class ChunkServerError(Exception):
+    """A chunk was rejected with a 5xx response; the response itself is not kept"""
+
+    def __init__(self, status_code: int, url: str):
+        super().__init__(f"HTTP {status_code} from {url}")
+        self.status_code = status_code
+
+
+# Transient failures worth re-sending a chunk for
+_RETRYABLE = (requests.ConnectionError, requests.Timeout, ChunkServerError)
+
+
+def _direct_call(fn: Callable[..., T], *args: Any) -> T:
+    return fn(*args)
+
+
+class ChunkedUploader:
+    """
+    Uploads files to a Tableau file upload session in fixed-size chunks.
+
+    Only one chunk is held in memory at a time, whatever the file size: each
+    chunk is sent on the server's HTTP session and its body and response are
+    released before the next one is read. Every request goes through call,
+    so an expired session is renewed for the chunk that hit it instead of
+    restarting the upload. Each chunk is retried with exponential backoff on
+    connection errors and 5xx responses before the upload fails; there is
+    no deadline for the whole upload, only request_timeout per request.
+    """
+
+    def __init__(
+        self,
+        server: TSC.Server,
+        chunk_size: int = 4 * BYTES_PER_MB,
+        max_retries: int = 3,
+        backoff: float = 1.0,
+        call: Optional[SessionCall] = None,
+        request_timeout: Optional[float] = None
+    ):
+        self.server = server
+        self.chunk_size = max(1, chunk_size)
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.call = call or _direct_call
+        self.request_timeout = request_timeout
+        self._lock = threading.Lock()
+        self.bytes_uploaded = 0
+        self.chunks_uploaded = 0
+        self.chunk_retries = 0
+        self.uploads = 0
+
+    def upload(
+        self,
+        source: Union[str, Path, BinaryIO],
+        on_progress: Optional[ProgressCallback] = None,
+        stop: Optional[threading.Event] = None
+    ) -> str:
+        """
+        Upload a file path or binary file object and return the upload session id (blocking)
+
+        on_progress is called after every chunk with (bytes_sent, total_bytes);
+        setting stop ends the upload with UploadError before the next chunk.
+        """
+        if isinstance(source, (str, Path)):
+            with open(source, "rb") as f:
+                return self._upload(f, os.path.getsize(source), on_progress, stop)
+        start = source.tell()
+        total = source.seek(0, os.SEEK_END) - start
+        source.seek(start)
+        return self._upload(source, total, on_progress, stop)
+
+    def _upload(
+        self,
+        f: BinaryIO,
+        total: int,
+        on_progress: Optional[ProgressCallback],
+        stop: Optional[threading.Event]
+    ) -> str:
+        upload_id = self.call(self.server.fileuploads.initiate)
+        sent = 0
+        while True:
+            if stop is not None and stop.is_set():
+                raise UploadError(f"Upload to session {upload_id} stopped after {sent} bytes")
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+            self._append(upload_id, chunk, sent)
+            sent += len(chunk)
+            with self._lock:
+                self.bytes_uploaded += len(chunk)
+                self.chunks_uploaded += 1
+            if on_progress is not None:
+                on_progress(sent, total)
+        with self._lock:
+            self.uploads += 1
+        logger.info(f"Uploaded {sent / BYTES_PER_MB:.1f} MB to upload session {upload_id}")
+        return upload_id
+
+    def _append(self, upload_id: str, chunk: bytes, offset: int) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.call(self._put_chunk, upload_id, chunk)
+                return
+            except _RETRYABLE as e:
+                if attempt == self.max_retries:
+                    raise UploadError(
+                        f"Chunk at offset {offset} failed after {attempt + 1} attempts: {str(e)}"
+                    ) from e
+                delay = self.backoff * (2 ** attempt)
+                with self._lock:
+                    self.chunk_retries += 1
+                RETRIES.inc(operation="upload_chunk")
+                logger.warning(
+                    f"Chunk at offset {offset} failed ({type(e).__name__}); retrying in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+    def _put_chunk(self, upload_id: str, chunk: bytes) -> None:
+        """
+        PUT one chunk to the upload session (blocking)
+
+        Sent on the session directly rather than through TSC's fileuploads
+        endpoint, whose request path keeps every response, and with it the
+        multipart body, alive in a reference cycle until the next GC.
+        """
+        url = f"{self.server.fileuploads.baseurl}/{upload_id}"
+        body, content_type = RequestFactory.Fileupload.chunk_req(chunk)
+        options = dict(self.server.http_options)
+        if self.request_timeout is not None:
+            options.setdefault("timeout", self.request_timeout)
+        headers = {**options.pop("headers", {}), "Content-Type": content_type}
+        if self.server.auth_token is not None:
+            headers["x-tableau-auth"] = self.server.auth_token
+        response = self.server.session.put(url, data=body, headers=headers, **options)
+        del body
+        try:
+            if response.status_code >= 500:
+                raise ChunkServerError(response.status_code, url)
+            if response.status_code >= 400:
+                try:
+                    error = TSC.ServerResponseError.from_response(response.content, self.server.namespace, url)
+                except Exception:
+                    # not a Tableau XML error; keep the status so 401s still renew the session
+                    error = TSC.ServerResponseError(str(response.status_code), "Chunk rejected", response.text, url)
+                raise error
+        finally:
+            response.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "uploads": self.uploads,
+            "chunks_uploaded": self.chunks_uploaded,
+            "chunk_retries": self.chunk_retries,
+            "mb_uploaded": round(self.bytes_uploaded / BYTES_PER_MB, 1),
+        }
+
+
+def log_progress(label: str, step: float = 0.1) -> ProgressCallback:
+    """Progress callback that logs roughly every step (fraction) of the upload"""
+    state = {"next": step}
+
+    def report(sent: int, total: int) -> None:
+        fraction = sent / total if total else 1.0
+        if fraction >= state["next"] or sent == total:
+            logger.info(f"{label}: {sent / BYTES_PER_MB:.1f}/{total / BYTES_PER_MB:.1f} MB ({fraction:.0%})")
+            while state["next"] <= fraction:
+                state["next"] += step
+
+    return report
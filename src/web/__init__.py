@@ -1,5 +1,11 @@
 """Web application package for Top 10 Analytics dashboard"""
 
-from .app import create_app
+__all__ = ['create_app']
 
-__all__ = ['create_app'] 
\ No newline at end of file
+
+def __getattr__(name):
+    # importing a submodule (e.g. src.web.serve) should not build the app's imports
+    if name == 'create_app':
+        from .app import create_app
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,41 @@
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
 import os
+import re
 from pathlib import Path
 from fastapi.exceptions import RequestValidationError
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from src.core.config import Settings
+from src.core.telemetry import REGISTRY, configure_logging, new_trace_id, trace_context
+from src.web.services.container import ServiceContainer
 
 def create_app() -> FastAPI:
     """Create and configure FastAPI application"""
     load_dotenv()  # Add this at the top of your app initialization
+    settings = Settings.from_env()
+    configure_logging(settings.log_level)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Start app-scoped services on startup and stop them on shutdown"""
+        services = ServiceContainer.from_settings(settings)
+        await services.start()
+        if settings.warmup_on_start:
+            await services.warm_up()
+        app.state.services = services
+        try:
+            yield
+        finally:
+            await services.aclose()
+
     app = FastAPI(
         title="Top 10 Analytics Dashboard",
         description="Web interface for generating and viewing Top 10 rankings",
-        version="0.1.0"
+        version="0.1.0",
+        lifespan=lifespan
     )
     
     # Configure CORS
@@ -25,6 +47,19 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Tag each request with a trace id (the caller's X-Request-ID when it is sane)
+    request_id_pattern = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
+
+    @app.middleware("http")
+    async def trace_requests(request, call_next):
+        trace_id = request.headers.get("x-request-id", "")
+        if not request_id_pattern.match(trace_id):
+            trace_id = new_trace_id()
+        with trace_context(trace_id):
+            response = await call_next(request)
+        response.headers["X-Request-ID"] = trace_id
+        return response
+
     # Get absolute path of static files directory
     static_dir = Path(__file__).parent / "static"
     
@@ -45,6 +80,11 @@ def create_app() -> FastAPI:
             "version": "0.1.0"
         })
     
+    @app.get("/metrics")
+    async def metrics():
+        """Stage latency histograms and counters in the Prometheus text format"""
+        return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+    
     # Import and register routes
     from .routes import api
     app.include_router(api.router, prefix="/api")
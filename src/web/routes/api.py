@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from datetime import datetime
-import os
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any, List, Literal
+from datetime import datetime, UTC
+from pathlib import Path
+import json
 import logging
 from src.web.services.ranking_service import RankingService
-from src.pipeline.tableau_cloud import TableauCloudPublisher
-from src.agent.ranking_agent import generate_ranking
-from src.pipeline.tableau import TableauDataConverter
+from src.web.services.batch_service import BatchRankingService
+from src.web.services.container import ServiceContainer
+from src.web.services.jobs import JobNotFoundError, QueueFullError
+from src.agent.history import InvalidCursorError, MAX_PAGE_SIZE, RankingHistory
+from src.core.aio import run_blocking
+from src.models.ranking import ranking_to_record
 
 # set log
 logger = logging.getLogger(__name__)
@@ -17,6 +23,22 @@ router = APIRouter()
 class TopicRequest(BaseModel):
     """Request model for topic analysis"""
     topic: str
+    stream: bool = False
+    quality: bool = Field(False, description="Skip the draft model and generate on the quality model")
+    priority: Literal["high", "normal", "low"] = Field(
+        "normal", description="Queue priority; lower priorities are rejected first when the queue fills up"
+    )
+
+class BatchTopicRequest(BaseModel):
+    """Request model for bulk topic analysis"""
+    topics: List[str] = Field(..., min_length=1, max_length=1000)
+    batch_id: Optional[str] = Field(
+        None,
+        description="Reuse the batch_id of an earlier batch to resume it from its checkpoint"
+    )
+    priority: Literal["high", "normal", "low"] = Field(
+        "low", description="Queue priority; lower priorities are rejected first when the queue fills up"
+    )
 
 class AnalysisResponse(BaseModel):
     """Response model for analysis status"""
@@ -25,36 +47,223 @@ class AnalysisResponse(BaseModel):
     timestamp: datetime
     details: Dict[str, Any]
 
-async def get_ranking_service() -> RankingService:
+class JobEventResponse(BaseModel):
+    """A single stage event of a background job"""
+    seq: int
+    stage: str
+    timestamp: datetime
+    data: Dict[str, Any]
+
+class JobResponse(BaseModel):
+    """Response model for background job status"""
+    job_id: str
+    topic: str
+    status: str
+    stage: str
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[JobEventResponse]
+
+class RankingPage(BaseModel):
+    """One page of stored rankings, newest first"""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+def queue_full(e: QueueFullError) -> HTTPException:
+    """503 when the job queue is full or shutting down, 429 when only the request's priority class is"""
+    return HTTPException(
+        status_code=503 if e.overloaded else 429,
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)}
+    )
+
+def get_services(request: Request) -> ServiceContainer:
+    """Dependency to get the app-scoped service container"""
+    return request.app.state.services
+
+async def get_ranking_service(
+    services: ServiceContainer = Depends(get_services)
+) -> RankingService:
     """Dependency to get RankingService instance"""
-    publisher = TableauCloudPublisher(
-        server_url=os.getenv("TABLEAU_SERVER_URL"),
-        site_name=os.getenv("TABLEAU_SITE_NAME"),
-        token_name=os.getenv("TABLEAU_TOKEN_NAME"),
-        token_value=os.getenv("TABLEAU_TOKEN_VALUE"),
-        datasource_name=os.getenv("TABLEAU_DATASOURCE_NAME")
+    return RankingService(
+        services.publisher,
+        batcher=services.batcher,
+        job_monitor=services.job_monitor
     )
-    return RankingService(publisher)
 
-@router.post("/analyze", response_model=AnalysisResponse)
+async def get_batch_service(
+    services: ServiceContainer = Depends(get_services)
+) -> BatchRankingService:
+    """Dependency to get BatchRankingService instance"""
+    return BatchRankingService(
+        services.publisher,
+        job_monitor=services.job_monitor,
+        concurrency=services.settings.batch_concurrency,
+        checkpoint_dir=Path(services.settings.batch_checkpoint_dir)
+    )
+
+@router.get("/stats")
+async def get_stats(services: ServiceContainer = Depends(get_services)) -> Dict[str, Any]:
+    """Runtime counters for jobs and caches"""
+    return services.stats()
+
+def get_history(services: ServiceContainer = Depends(get_services)) -> RankingHistory:
+    """Dependency to get the ranking history store"""
+    if services.history is None:
+        raise HTTPException(status_code=503, detail="Ranking history is disabled (RANKING_HISTORY_PATH)")
+    return services.history
+
+async def _ranking_page(history: RankingHistory, **kwargs: Any) -> RankingPage:
+    try:
+        items, next_cursor = await run_blocking(history.list, **kwargs)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return RankingPage(items=items, next_cursor=next_cursor)
+
+@router.get("/rankings", response_model=RankingPage)
+async def list_rankings(
+    topic: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    history: RankingHistory = Depends(get_history)
+) -> RankingPage:
+    """Stored rankings, newest first; pass next_cursor back as cursor for the next page"""
+    return await _ranking_page(history, topic=topic, limit=limit, cursor=cursor)
+
+@router.get("/rankings/latest", response_model=RankingPage)
+async def list_latest_rankings(
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    history: RankingHistory = Depends(get_history)
+) -> RankingPage:
+    """The newest ranking of every topic, most recently generated first"""
+    return await _ranking_page(history, limit=limit, cursor=cursor, latest=True)
+
+@router.get("/rankings/{batch_id:path}")
+async def get_ranking(
+    batch_id: str,
+    history: RankingHistory = Depends(get_history)
+) -> Dict[str, Any]:
+    """A stored ranking by the batch_id it was published to Tableau with"""
+    ranking = await run_blocking(history.get, batch_id)
+    if ranking is None:
+        raise HTTPException(status_code=404, detail=f"Ranking {batch_id} not found")
+    return dict(ranking_to_record(ranking), batch_id=batch_id)
+
+@router.post("/analyze", response_model=AnalysisResponse, status_code=202)
 async def analyze_topic(
     request: TopicRequest,
+    services: ServiceContainer = Depends(get_services),
     service: RankingService = Depends(get_ranking_service)
 ) -> AnalysisResponse:
     """
-    Endpoint to trigger topic analysis and ranking generation
+    Endpoint to trigger topic analysis and ranking generation.
+    The pipeline runs as a background job; poll /api/jobs/{job_id} for progress.
     """
     try:
-        result = await service.generate_and_update(request.topic)
+        job = await services.jobs.submit(
+            request.topic,
+            lambda on_stage: service.generate_and_update(
+                request.topic,
+                on_stage=on_stage,
+                stream=request.stream,
+                quality=request.quality
+            ),
+            priority=request.priority
+        )
         return AnalysisResponse(
-            status=result["status"],
-            message=result["message"],
-            timestamp=result["details"]["timestamp"],
-            details=result["details"]
+            status=job.status.value,
+            message="Analysis queued",
+            timestamp=datetime.now(UTC),
+            details={
+                "job_id": job.id,
+                "topic": request.topic,
+                "status_url": f"/api/jobs/{job.id}",
+                "events_url": f"/api/jobs/{job.id}/events"
+            }
         )
+    except QueueFullError as e:
+        logger.warning(f"Rejected analysis of '{request.topic}': {str(e)}")
+        raise queue_full(e)
     except Exception as e:
         logger.error(f"Error in analyze_topic: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=str(e)
-        ) 
\ No newline at end of file
+        )
+
+@router.post("/analyze/batch", response_model=AnalysisResponse, status_code=202)
+async def analyze_batch(
+    request: BatchTopicRequest,
+    services: ServiceContainer = Depends(get_services),
+    service: BatchRankingService = Depends(get_batch_service)
+) -> AnalysisResponse:
+    """
+    Rank many topics and publish them in one Tableau update.
+    Runs as a background job; its result lists the status of every topic.
+    """
+    try:
+        batch_id = (
+            service.validate_batch_id(request.batch_id) if request.batch_id
+            else service.new_batch_id()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    try:
+        job = await services.jobs.submit(
+            f"batch of {len(request.topics)} topics",
+            lambda on_stage: service.run(request.topics, batch_id=batch_id, on_stage=on_stage),
+            priority=request.priority
+        )
+    except QueueFullError as e:
+        logger.warning(f"Rejected batch {batch_id}: {str(e)}")
+        raise queue_full(e)
+    return AnalysisResponse(
+        status=job.status.value,
+        message="Batch queued",
+        timestamp=datetime.now(UTC),
+        details={
+            "job_id": job.id,
+            "batch_id": batch_id,
+            "topics": len(request.topics),
+            "status_url": f"/api/jobs/{job.id}",
+            "events_url": f"/api/jobs/{job.id}/events"
+        }
+    )
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> JobResponse:
+    """Return the current status and stage history of a background job"""
+    try:
+        return JobResponse(**services.jobs.get(job_id).to_dict())
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(
+    job_id: str,
+    services: ServiceContainer = Depends(get_services)
+) -> StreamingResponse:
+    """Stream job stage events as Server-Sent Events until the job finishes"""
+    try:
+        services.jobs.get(job_id)
+    except JobNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    async def event_stream():
+        async for event in services.jobs.events(job_id):
+            payload = json.dumps(jsonable_encoder(event.to_dict()))
+            yield f"id: {event.seq}\nevent: {event.stage}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,12 +1,26 @@
+"""
+Development server with auto-reload; use src.web.serve in production
+
+The app is built by uvicorn through create_app, so importing this module (as
+each reload does) costs no more than importing uvicorn.
+"""
 import uvicorn
-from src.web.app import create_app
 
-app = create_app()
+
+def __getattr__(name):
+    # keeps "uvicorn src.web.run:app" working; the app is built on first access
+    if name == "app":
+        from src.web.app import create_app
+        globals()["app"] = app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
     uvicorn.run(
-        "src.web.run:app",
+        "src.web.app:create_app",
+        factory=True,
         host="127.0.0.1",
         port=8000,
-        reload=True  
-    ) 
\ No newline at end of file
+        reload=True
+    )
@@ -0,0 +1,38 @@
+"""
+Production launcher: no reload, a single app process
+
+Usage:
+    python -m src.web.serve [--host 0.0.0.0] [--port 8000]
+
+HOST and PORT set the defaults. The app must run as one process: jobs,
+admission limits, caches and the Hyper archive lock live in its memory, so
+a second worker would answer job polls with 404 and double every limit.
+Concurrency comes from JOB_WORKERS pipelines in that process. Set
+WARMUP_ON_START=true to load the ranking agent and start the Hyper process
+before the app accepts requests.
+"""
+import argparse
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "src.web.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=1,
+        reload=False,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Optional
+import asyncio
+import json
+import logging
+import re
+import uuid
+
+from src.core.ratelimit import get_rate_limiter
+from src.core.telemetry import span
+from src.models.ranking import RankingResult, ranking_from_record, ranking_to_record
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from src.pipeline.tableau_cloud import TableauCloudPublisher
+    from src.pipeline.job_monitor import TableauJobMonitor
+
+logger = logging.getLogger(__name__)
+
+_BATCH_ID = re.compile(r"^[A-Za-z0-9_\-]{1,64}$")
+
+
+class BatchCheckpoint:
+    """
+    Append-only JSONL record of per-topic outcomes for one batch.
+
+    Each line is {"topic", "status", ...}; the last line for a topic wins, so a
+    crashed batch can be resumed by replaying the file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a crash can leave the last line half written
+                    logger.warning(f"Skipping unreadable checkpoint line in {self.path}")
+                    continue
+                records[record["topic"]] = record
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+
+
+class BatchRankingService:
+    """
+    Generates rankings for many topics and publishes them in one Tableau update.
+
+    Generations run with bounded concurrency and the model provider's rate
+    limit. Failed topics are reported and skipped; every outcome is
+    checkpointed so re-running a batch_id only redoes unfinished work.
+    """
+
+    def __init__(
+        self,
+        publisher: "TableauCloudPublisher",
+        job_monitor: Optional["TableauJobMonitor"] = None,
+        concurrency: int = 4,
+        checkpoint_dir: Path = Path("data/batches"),
+        job_timeout: int = 600
+    ):
+        self.publisher = publisher
+        self.job_monitor = job_monitor
+        self.concurrency = max(1, concurrency)
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.job_timeout = job_timeout
+        self.temp_dir = Path("data/temp")
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def new_batch_id() -> str:
+        return f"batch_{datetime.now(UTC).strftime('%Y%m%d%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def validate_batch_id(batch_id: str) -> str:
+        if not _BATCH_ID.match(batch_id):
+            raise ValueError("batch_id may only contain letters, digits, '_' and '-' (max 64)")
+        return batch_id
+
+    async def run(
+        self,
+        topics: Iterable[str],
+        batch_id: Optional[str] = None,
+        on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None
+    ) -> dict:
+        """
+        Generate and publish rankings for topics
+
+        Args:
+            topics: Topics to rank; duplicates are ignored
+            batch_id: Reuse an earlier batch_id to resume it from its checkpoint
+            on_stage: Optional async callback invoked per stage and per finished topic
+
+        Returns:
+            Status information with one entry per topic
+        """
+        # the agent and the Tableau pipeline load on the first batch, not at app import
+        from src.agent.ranking_agent import RANKING_MODEL, generate_ranking
+        from src.pipeline.tableau import TableauDataConverter
+
+        async def report(stage: str, **data: Any) -> None:
+            if on_stage is not None:
+                await on_stage(stage, data)
+
+        batch_id = self.validate_batch_id(batch_id) if batch_id else self.new_batch_id()
+        topics = list(dict.fromkeys(topic.strip() for topic in topics if topic.strip()))
+        checkpoint = BatchCheckpoint(self.checkpoint_dir / f"{batch_id}.jsonl")
+        records = checkpoint.load()
+
+        pending = [
+            topic for topic in topics
+            if records.get(topic, {}).get("status") not in ("generated", "published")
+        ]
+        logger.info(
+            f"Batch {batch_id}: {len(topics)} topics, {len(topics) - len(pending)} restored from checkpoint"
+        )
+        await report("generating", batch_id=batch_id, total=len(topics), pending=len(pending))
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limiter = get_rate_limiter(RANKING_MODEL.split(":", 1)[0])
+
+        async def generate(topic: str) -> None:
+            async with semaphore:
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    with span("generation"):
+                        result = await generate_ranking(topic)
+                except Exception as e:
+                    logger.error(f"Batch {batch_id}: ranking for '{topic}' failed: {str(e)}")
+                    record = {"topic": topic, "status": "failed", "error": str(e)}
+                else:
+                    record = {"topic": topic, "status": "generated", "ranking": ranking_to_record(result)}
+                checkpoint.append(record)
+                records[topic] = record
+                await report("topic", topic=topic, status=record["status"], error=record.get("error"))
+
+        await asyncio.gather(*(generate(topic) for topic in pending))
+
+        rankings: Dict[str, RankingResult] = {
+            topic: ranking_from_record(records[topic]["ranking"])
+            for topic in topics
+            if records[topic]["status"] == "generated"
+        }
+        job_id, rows, upload_error = None, 0, None
+        if rankings:
+            with span("conversion"):
+                tableau_data = TableauDataConverter.to_table(rankings.values())
+            rows = tableau_data.num_rows
+            await report("publishing", rows=rows, topics=len(rankings))
+            try:
+                job_id = await self._publish(tableau_data)
+            except Exception as e:
+                upload_error = f"Tableau update failed: {str(e)}"
+                logger.error(f"Batch {batch_id}: {upload_error}")
+            else:
+                for topic in rankings:
+                    record = {"topic": topic, "status": "published", "job_id": job_id}
+                    checkpoint.append(record)
+                    records[topic] = record
+
+        results = [self._topic_status(topic, records[topic], rankings.get(topic)) for topic in topics]
+        published = sum(1 for result in results if result["status"] == "published")
+        if published == len(topics):
+            status = "success"
+        elif published or rankings:
+            status = "partial"
+        else:
+            status = "failed"
+
+        return {
+            "status": status,
+            "message": f"{published} of {len(topics)} topics published to Tableau",
+            "details": {
+                "batch_id": batch_id,
+                "job_id": job_id,
+                "rows": rows,
+                "upload_error": upload_error,
+                "timestamp": datetime.now(UTC),
+                "topics": results,
+            }
+        }
+
+    async def _publish(self, tableau_data: "pa.Table") -> str:
+        """Upload all rows as one Hyper file and wait for the update job"""
+        job_id = await self.publisher.update_data(tableau_data, self.temp_dir)
+        if self.job_monitor is not None:
+            final_job = await self.job_monitor.wait(job_id, timeout=self.job_timeout)
+        else:
+            final_job = await self.publisher.wait_for_job(job_id, timeout=self.job_timeout)
+        if final_job.finish_code != 0:
+            raise Exception(f"job {job_id} finished with code {final_job.finish_code}")
+        return job_id
+
+    @staticmethod
+    def _topic_status(
+        topic: str,
+        record: Dict[str, Any],
+        ranking: Optional[RankingResult]
+    ) -> Dict[str, Any]:
+        status = {"topic": topic, "status": record["status"]}
+        if record["status"] == "failed":
+            status["error"] = record.get("error")
+        if ranking is not None:
+            status["items_count"] = len(ranking.items)
+        if record.get("job_id"):
+            status["job_id"] = record["job_id"]
+        return status
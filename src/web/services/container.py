@@ -0,0 +1,219 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from src.core.aio import configure_executor, run_blocking, shutdown_executor
+from src.core.config import Settings
+from src.core.ratelimit import (
+    configure_rate_limits,
+    configure_upstream_limits,
+    rate_limit_stats,
+    upstream_limit_stats,
+)
+from src.agent.cache import RankingCache, configure_ranking_cache
+from src.agent.history import RankingHistory, configure_ranking_history
+from src.agent.routing import ModelRouter, configure_model_router
+from src.web.services.jobs import JobManager
+
+# The Tableau pipeline (tableauserverclient, tableauhyperapi, pyarrow) and the
+# search client are imported when the services start, not when the app is built
+if TYPE_CHECKING:
+    from src.pipeline.tableau_cloud import TableauCloudPublisher
+    from src.pipeline.batching import BatchingPublisher
+    from src.pipeline.job_monitor import TableauJobMonitor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ServiceContainer:
+    """App-scoped services created once at startup and shared by all requests"""
+    settings: Settings
+    jobs: JobManager
+    ranking_cache: RankingCache
+    model_router: ModelRouter
+    history: Optional[RankingHistory] = None
+    publisher: Optional["TableauCloudPublisher"] = None
+    job_monitor: Optional["TableauJobMonitor"] = None
+    batcher: Optional["BatchingPublisher"] = None
+    _background: List[asyncio.Task] = field(default_factory=list)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ServiceContainer":
+        from src.pipeline.batching import BatchingPublisher
+        from src.pipeline.job_monitor import TableauJobMonitor
+
+        services = cls(
+            settings=settings,
+            jobs=JobManager(
+                workers=settings.job_workers,
+                history_limit=settings.job_history_limit,
+                queue_limit=settings.job_queue_limit,
+            ),
+            ranking_cache=configure_ranking_cache(
+                ttl=settings.ranking_cache_ttl,
+                max_entries=settings.ranking_cache_size,
+                path=settings.ranking_cache_path,
+                similarity_threshold=settings.ranking_similarity_threshold,
+            ),
+            model_router=configure_model_router(
+                quality_model=settings.ranking_model_quality,
+                draft_model=settings.ranking_model_draft,
+                min_sources=settings.ranking_min_sources,
+                costs=settings.model_costs,
+            ),
+        )
+        services.history = configure_ranking_history(settings.ranking_history_path)
+        # One publisher per app keeps a single signed-in session and HTTP pool
+        services.publisher = services.build_publisher()
+        services.job_monitor = TableauJobMonitor(
+            services.publisher,
+            min_interval=settings.tableau_job_poll_min_seconds,
+            max_interval=settings.tableau_job_poll_max_seconds,
+        )
+        if settings.tableau_batch_flush_seconds > 0:
+            services.batcher = BatchingPublisher(
+                services.publisher,
+                max_batch_rows=settings.tableau_batch_max_rows,
+                flush_interval=settings.tableau_batch_flush_seconds,
+                temp_dir=Path("data/temp"),
+                job_monitor=services.job_monitor,
+            )
+        return services
+
+    def build_publisher(self) -> "TableauCloudPublisher":
+        """Create a Tableau Cloud publisher from the configured credentials"""
+        from src.pipeline.hyper import HyperArchive
+        from src.pipeline.tableau_cloud import TableauCloudPublisher
+
+        settings = self.settings
+        return TableauCloudPublisher(
+            server_url=settings.tableau_server_url,
+            site_name=settings.tableau_site_name,
+            token_name=settings.tableau_token_name,
+            token_value=settings.tableau_token_value,
+            datasource_name=settings.tableau_datasource_name,
+            timeout=settings.tableau_timeout,
+            session_ttl=settings.tableau_session_ttl,
+            datasource_cache_ttl=settings.tableau_datasource_cache_ttl,
+            http_pool_size=settings.io_threads,
+            hyper_layout=settings.hyper_layout,
+            upsert_key=settings.tableau_upsert_key,
+            archive=HyperArchive(
+                Path(settings.hyper_archive_path),
+                layout=settings.hyper_layout,
+                key=settings.tableau_upsert_key,
+            ) if settings.hyper_archive_path else None,
+            keep_temp_files=settings.tableau_keep_temp_files,
+            upload_chunk_mb=settings.tableau_upload_chunk_mb,
+            upload_retries=settings.tableau_upload_retries
+        )
+
+    async def start(self) -> None:
+        from src.agent.search import configure_search
+        from src.pipeline.hyper import configure_hyper_runtime, sweep_temp_files
+
+        configure_executor(self.settings.io_threads)
+        configure_rate_limits(self.settings.provider_rate_limits)
+        configure_upstream_limits(
+            rates=self.settings.upstream_rate_limits,
+            concurrency=self.settings.upstream_concurrency,
+            cooldown=self.settings.upstream_cooldown,
+            retries=self.settings.upstream_retries,
+        )
+        configure_search(
+            timeout=self.settings.search_timeout,
+            pool_size=self.settings.search_pool_size,
+            cache_ttl=self.settings.search_cache_ttl,
+            cache_stale_ttl=self.settings.search_cache_stale_ttl,
+            cache_size=self.settings.search_cache_size,
+            cache_path=self.settings.search_cache_path,
+            fanout_concurrency=self.settings.search_fanout_concurrency,
+        )
+        # The Hyper process itself starts lazily on the first file build
+        configure_hyper_runtime(
+            pool_size=self.settings.hyper_pool_size,
+            log_dir=self.settings.hyper_log_dir,
+        )
+        if not self.settings.tableau_keep_temp_files:
+            # leftovers of earlier runs that crashed before cleaning up
+            sweep_temp_files(Path("data/temp"))
+        await self.jobs.start()
+        if self.publisher is not None and self.settings.tableau_datasource_refresh_seconds > 0:
+            self._background.append(asyncio.create_task(
+                self.publisher.refresh_datasource_index(self.settings.tableau_datasource_refresh_seconds)
+            ))
+
+    async def warm_up(self) -> None:
+        """
+        Load the ranking agent and its models and start the Hyper process
+
+        Run before the worker reports ready, so the first requests do not pay
+        for the imports, the OpenAI clients and the Hyper process start.
+        Failures are logged; the services then initialize lazily as usual.
+        """
+        started = time.perf_counter()
+        try:
+            import src.agent.ranking_agent  # noqa: F401
+            for tier in self.model_router.tiers:
+                tier.model  # builds the model's HTTP client
+        except Exception as e:
+            logger.warning(f"Ranking agent warm-up failed: {str(e)}")
+
+        def start_hyper() -> None:
+            from src.pipeline.hyper import get_hyper_runtime
+            # opens the Hyper process and one pooled connection
+            with get_hyper_runtime().connection():
+                pass
+
+        try:
+            await run_blocking(start_hyper, timeout=self.settings.tableau_timeout)
+        except Exception as e:
+            logger.warning(f"Hyper warm-up failed: {str(e)}")
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
+
+    async def aclose(self) -> None:
+        from src.agent.search import get_search_cache
+        from src.pipeline.hyper import shutdown_hyper_runtime
+
+        for task in self._background:
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        self._background.clear()
+        await self.jobs.stop()
+        if self.batcher is not None:
+            await self.batcher.aclose()
+        if self.job_monitor is not None:
+            await self.job_monitor.stop()
+        if self.publisher is not None:
+            await run_blocking(self.publisher.close, timeout=self.settings.tableau_timeout)
+        shutdown_executor(wait=False)
+        shutdown_hyper_runtime()
+        if self.history is not None:
+            configure_ranking_history(None)
+        for backend in (self.ranking_cache.backend, get_search_cache().backend):
+            close = getattr(backend, "close", None)
+            if close is not None:
+                close()
+        logger.info("Application services stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Runtime counters of app-scoped services"""
+        from src.agent.search import get_search_cache
+
+        return {
+            "jobs": self.jobs.stats(),
+            "ranking_cache": self.ranking_cache.stats(),
+            "model_tiers": self.model_router.stats(),
+            "ranking_history": self.history.stats() if self.history is not None else None,
+            "search_cache": get_search_cache().stats(),
+            "tableau_datasources_indexed": len(self.publisher.resolver) if self.publisher else 0,
+            "tableau_uploads": self.publisher.uploader.stats() if self.publisher else None,
+            "tableau_jobs": self.job_monitor.stats() if self.job_monitor is not None else None,
+            "tableau_batching": self.batcher.stats() if self.batcher is not None else None,
+            "rate_limits": rate_limit_stats(),
+            "upstreams": upstream_limit_stats(),
+        }
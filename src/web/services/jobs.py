@@ -0,0 +1,344 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from enum import Enum
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import itertools
+import logging
+import math
+import time
+import uuid
+
+from src.core.telemetry import REGISTRY, current_or_new_trace_id, trace_context
+
+logger = logging.getLogger(__name__)
+
+StageCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+JobRunner = Callable[[StageCallback], Awaitable[Dict[str, Any]]]
+
+# Priority classes, most urgent first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+# Share of the queue limit each class may fill: lower classes are turned away
+# first, leaving room for more urgent work
+QUEUE_SHARES = {"high": 1.0, "normal": 0.8, "low": 0.5}
+
+QUEUE_DEPTH = REGISTRY.gauge(
+    "top10_job_queue_depth", "Jobs waiting for a worker per priority", ["priority"]
+)
+JOBS_IN_FLIGHT = REGISTRY.gauge("top10_jobs_in_flight", "Jobs currently running")
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "top10_job_queue_wait_seconds", "Time jobs waited for a worker per priority", ["priority"]
+)
+JOBS_REJECTED = REGISTRY.counter(
+    "top10_jobs_rejected_total", "Jobs turned away by admission control", ["priority", "reason"]
+)
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of a background analysis job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobNotFoundError(Exception):
+    """Raised when a job id is unknown or has been evicted"""
+    pass
+
+
+class QueueFullError(Exception):
+    """
+    Raised when a job is not admitted because the wait queue is full
+
+    overloaded is True when the whole queue is full (HTTP 503) and False when
+    only the job's priority class has used up its share (HTTP 429);
+    retry_after is the estimated number of seconds until a slot frees up.
+    """
+
+    def __init__(self, message: str, retry_after: int, overloaded: bool):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.overloaded = overloaded
+
+
+class ShuttingDownError(QueueFullError):
+    """Raised when a job is submitted after the manager has been stopped (HTTP 503)"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message, retry_after, overloaded=True)
+
+
+@dataclass
+class JobEvent:
+    """A single stage transition reported by a running job"""
+    seq: int
+    stage: str
+    timestamp: datetime
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "stage": self.stage,
+            "timestamp": self.timestamp,
+            "data": self.data,
+        }
+
+
+@dataclass
+class Job:
+    """State of one background analysis job"""
+    id: str
+    topic: str
+    runner: JobRunner = field(repr=False)
+    priority: str = "normal"
+    trace_id: str = field(default_factory=current_or_new_trace_id)
+    status: JobStatus = JobStatus.QUEUED
+    stage: str = "queued"
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    events: List[JobEvent] = field(default_factory=list)
+    _changed: asyncio.Condition = field(default_factory=asyncio.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    async def record(self, stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """Append a stage event and wake up any subscribers"""
+        self.stage = stage
+        self.events.append(JobEvent(
+            seq=len(self.events),
+            stage=stage,
+            timestamp=datetime.now(UTC),
+            data=data or {},
+        ))
+        async with self._changed:
+            self._changed.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "topic": self.topic,
+            "priority": self.priority,
+            "trace_id": self.trace_id,
+            "status": self.status.value,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+            "events": [event.to_dict() for event in self.events],
+        }
+
+
+class JobManager:
+    """
+    Runs analysis jobs on a bounded pool of asyncio workers.
+
+    workers caps the pipelines in flight. Waiting jobs are served by priority
+    class, then in arrival order; with a queue_limit, submit() fails fast with
+    QueueFullError instead of letting the backlog grow without bound.
+    """
+
+    def __init__(self, workers: int = 4, history_limit: int = 1000, queue_limit: int = 0):
+        self.workers = max(1, workers)
+        self.history_limit = history_limit
+        self.queue_limit = max(0, queue_limit)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._waiting = {priority: 0 for priority in PRIORITIES}
+        self._in_flight = 0
+        self._rejected = {"queue_full": 0, "priority_share": 0, "shutting_down": 0}
+        # moving averages used for Retry-After and /api/stats
+        self._avg_wait: Optional[float] = None
+        self._avg_run: Optional[float] = None
+        # set by stop(); submissions are refused instead of restarting the workers
+        self._stopped = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self._waiting.values())
+
+    async def start(self) -> None:
+        """Start the worker pool (idempotent)"""
+        self._stopped = False
+        if self._tasks:
+            return
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"job-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started job manager with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel the worker pool; queued jobs are abandoned and new ones refused until start()"""
+        self._stopped = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        for priority in PRIORITIES:
+            self._waiting[priority] = 0
+            QUEUE_DEPTH.set(0, priority=priority)
+
+    async def submit(self, topic: str, runner: JobRunner, priority: str = "normal") -> Job:
+        """
+        Queue a job and return immediately
+
+        Raises QueueFullError when it is not admitted, and ShuttingDownError
+        (a QueueFullError) once the manager has been stopped.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        if self._stopped:
+            self._rejected["shutting_down"] += 1
+            JOBS_REJECTED.inc(priority=priority, reason="shutting_down")
+            raise ShuttingDownError("The server is shutting down; try again later", retry_after=self.retry_after())
+        await self.start()
+        self._admit(priority)
+        job = Job(id=uuid.uuid4().hex, topic=topic, runner=runner, priority=priority)
+        self._jobs[job.id] = job
+        self._evict()
+        # counted before the first await so concurrent submits see it
+        self._waiting[priority] += 1
+        QUEUE_DEPTH.inc(priority=priority)
+        await job.record("queued", {"topic": topic, "priority": priority, "queue_depth": self.queue_depth})
+        self._queue.put_nowait((PRIORITIES[priority], next(self._seq), job))
+        return job
+
+    def _admit(self, priority: str) -> None:
+        if not self.queue_limit:
+            return
+        depth = self.queue_depth
+        if depth >= self.queue_limit:
+            reason, overloaded = "queue_full", True
+        elif depth >= math.ceil(self.queue_limit * QUEUE_SHARES[priority]):
+            reason, overloaded = "priority_share", False
+        else:
+            return
+        self._rejected[reason] += 1
+        JOBS_REJECTED.inc(priority=priority, reason=reason)
+        raise QueueFullError(
+            f"{depth} jobs are waiting (limit {self.queue_limit}); try again later",
+            retry_after=self.retry_after(),
+            overloaded=overloaded
+        )
+
+    def retry_after(self) -> int:
+        """Estimated seconds until a queued job would start, from recent run times"""
+        rounds = (self.queue_depth + self._in_flight) / self.workers
+        estimate = rounds * (self._avg_run if self._avg_run is not None else 10.0)
+        return max(1, min(300, math.ceil(estimate)))
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise JobNotFoundError(f"Job '{job_id}' not found")
+        return job
+
+    async def events(self, job_id: str) -> AsyncIterator[JobEvent]:
+        """Yield all events of a job, waiting for new ones until it finishes"""
+        job = self.get(job_id)
+        sent = 0
+        while True:
+            while sent < len(job.events):
+                yield job.events[sent]
+                sent += 1
+            if job.done:
+                return
+            async with job._changed:
+                if sent == len(job.events) and not job.done:
+                    await job._changed.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {status.value: 0 for status in JobStatus}
+        oldest: Optional[datetime] = None
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+            if job.status == JobStatus.QUEUED and (oldest is None or job.created_at < oldest):
+                oldest = job.created_at
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_limit": self.queue_limit,
+            "queue_depth": self.queue_depth,
+            "queue_depth_by_priority": dict(self._waiting),
+            "oldest_wait_seconds": (
+                round((datetime.now(UTC) - oldest).total_seconds(), 3) if oldest is not None else 0.0
+            ),
+            "avg_wait_seconds": round(self._avg_wait or 0.0, 3),
+            "avg_run_seconds": round(self._avg_run or 0.0, 3),
+            "retry_after_seconds": self.retry_after(),
+            "rejected": dict(self._rejected),
+            "jobs": counts,
+        }
+
+    @staticmethod
+    def _average(current: Optional[float], value: float, weight: float = 0.2) -> float:
+        return value if current is None else current + weight * (value - current)
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond the history limit"""
+        excess = len(self._jobs) - self.history_limit
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job.done][:excess]:
+            del self._jobs[job_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            self._waiting[job.priority] -= 1
+            QUEUE_DEPTH.dec(priority=job.priority)
+            self._in_flight += 1
+            JOBS_IN_FLIGHT.inc()
+            started = time.perf_counter()
+            try:
+                # log lines of the job carry the trace id of the request that submitted it
+                with trace_context(job.trace_id):
+                    await self._run(job)
+            finally:
+                self._in_flight -= 1
+                JOBS_IN_FLIGHT.dec()
+                self._avg_run = self._average(self._avg_run, time.perf_counter() - started)
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now(UTC)
+        waited = (job.started_at - job.created_at).total_seconds()
+        QUEUE_WAIT_SECONDS.observe(waited, priority=job.priority)
+        self._avg_wait = self._average(self._avg_wait, waited)
+        await job.record("running", {"queue_wait_seconds": round(waited, 3)})
+        try:
+            job.result = await job.runner(job.record)
+            job.status = JobStatus.SUCCEEDED
+            job.finished_at = datetime.now(UTC)
+            await job.record("completed", {"result": job.result})
+        except asyncio.CancelledError:
+            job.status = JobStatus.FAILED
+            job.error = "Job cancelled"
+            job.finished_at = datetime.now(UTC)
+            await job.record("failed", {"error": job.error})
+            raise
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            job.finished_at = datetime.now(UTC)
+            await job.record("failed", {"error": job.error})
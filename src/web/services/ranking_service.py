@@ -1,13 +1,16 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional
 import logging
 import asyncio
 
-from src.agent.ranking_agent import generate_ranking
-from src.pipeline.tableau import TableauDataConverter
-from src.pipeline.tableau_cloud import TableauCloudPublisher
-import tableauserverclient as TSC
+from src.core.telemetry import collect_spans, get_trace_id, span, summarize_spans
+from src.models.ranking import RankingItem
+
+if TYPE_CHECKING:
+    from src.pipeline.tableau_cloud import TableauCloudPublisher
+    from src.pipeline.batching import BatchingPublisher
+    from src.pipeline.job_monitor import TableauJobMonitor
 
 
 logging.basicConfig(level=logging.INFO)
@@ -16,46 +19,108 @@ logger = logging.getLogger(__name__)
 class RankingService:
     """Service for handling ranking generation and Tableau updates"""
     
-    def __init__(self, publisher: TableauCloudPublisher):
+    def __init__(
+        self,
+        publisher: "TableauCloudPublisher",
+        batcher: Optional["BatchingPublisher"] = None,
+        job_monitor: Optional["TableauJobMonitor"] = None
+    ):
         self.publisher = publisher
+        self.batcher = batcher
+        self.job_monitor = job_monitor
         self.temp_dir = Path("data/temp")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
-    async def generate_and_update(self, topic: str) -> dict:
+    async def generate_and_update(
+        self,
+        topic: str,
+        on_stage: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        stream: bool = False,
+        quality: bool = False
+    ) -> dict:
         """
         Generate ranking for topic and update Tableau
         Returns status information about the process
+
+        Args:
+            topic: Topic to rank
+            on_stage: Optional async callback invoked as each pipeline stage starts
+            stream: Report each ranking item through on_stage ("item") as soon as it validates
+            quality: Generate on the quality model tier, bypassing the draft model and the cache
         """
+        async def report(stage: str, **data: Any) -> None:
+            if on_stage is not None:
+                await on_stage(stage, data)
+
+        with collect_spans() as spans:
+            return await self._generate_and_update(topic, report, stream, quality, spans)
+
+    async def _generate_and_update(
+        self,
+        topic: str,
+        report: Callable[..., Awaitable[None]],
+        stream: bool,
+        quality: bool,
+        spans: list
+    ) -> dict:
+        # the agent and the Tableau pipeline load on the first ranking, not at app import
+        from src.agent.ranking_agent import generate_ranking, generate_ranking_stream
+        from src.pipeline.tableau import TableauDataConverter
+
         try:
             # Generate ranking
-            logger.info(f"\n3. Generating ranking data...")
+            await report("generating")
+            logger.info(f"3. Generating ranking data...")
             logger.info(f"🔍 Query: {topic}")
-            ranking_result = await generate_ranking(topic)
+            with span("generation"):
+                if stream:
+                    ranking_result = None
+                    async for update in generate_ranking_stream(topic, quality=quality):
+                        if isinstance(update, RankingItem):
+                            await report("item", item=update.model_dump())
+                        else:
+                            ranking_result = update
+                    await report("ranked", items=[item.model_dump() for item in ranking_result.items])
+                else:
+                    ranking_result = await generate_ranking(topic, quality=quality)
             logger.info(f"✅ Generated ranking with {len(ranking_result.items)} items")
             logger.info(f"📝 Topic: {ranking_result.topic}")
 
 
             # convert data to Tableau format
-            logger.info("\n4. Converting data to Tableau format...")
-            tableau_data = TableauDataConverter.convert(ranking_result)
+            await report("converting", items_count=len(ranking_result.items))
+            logger.info("4. Converting data to Tableau format...")
+            with span("conversion"):
+                tableau_data = TableauDataConverter.convert(ranking_result)
             logger.info(f"✅ Converted {len(tableau_data)} rows")
             
             # update Tableau Cloud
-            logger.info("\n5. Updating data in Tableau Cloud...")
-            job_id = await self.publisher.update_data(tableau_data, self.temp_dir)
-            logger.info(f"✅ Update job started with ID: {job_id}")
-
-
-            # wait for job completion
-            logger.info("\n6. Waiting for job completion...")
+            await report("publishing", rows=len(tableau_data), batched=self.batcher is not None)
+            logger.info("5. Updating data in Tableau Cloud...")
             try:
+                if self.batcher is not None:
+                    # rows share one update job with other rankings; this waits for that job
+                    with span("batch_publish"):
+                        final_job = await self.batcher.publish(tableau_data)
+                    job_id = final_job.id
+                    logger.info(f"✅ Batched update job {job_id} finished")
+                else:
+                    job_id = await self.publisher.update_data(tableau_data, self.temp_dir)
+                    logger.info(f"✅ Update job started with ID: {job_id}")
+
+                    # wait for job completion
+                    await report("waiting", tableau_job_id=job_id)
+                    logger.info("6. Waiting for job completion...")
 
-                # use TSC built-in wait method
-                final_job = await self.publisher.wait_for_job(job_id, timeout=300)
+                    if self.job_monitor is not None:
+                        # shared poller tracks this job alongside all other outstanding ones
+                        final_job = await self.job_monitor.wait(job_id, timeout=300)
+                    else:
+                        final_job = await self.publisher.wait_for_job(job_id, timeout=300)
                 
 
                 if final_job.finish_code == 0:
-                    logger.info("\n✅ Data successfully updated in Tableau Cloud")
+                    logger.info("✅ Data successfully updated in Tableau Cloud")
                     logger.info(f"📊 Updated datasource: {self.publisher.datasource_name}")
                     logger.info(f"📈 Total rows updated: {len(tableau_data)}")
                     
@@ -66,6 +131,11 @@ class RankingService:
                             "topic": topic,
                             "items_count": len(ranking_result.items),
                             "job_id": job_id,
+                            "batch_id": TableauDataConverter.generate_batch_id(
+                                ranking_result.topic, ranking_result.generated_at
+                            ),
+                            "trace_id": get_trace_id(),
+                            "timings": summarize_spans(spans),
                             "timestamp": datetime.utcnow(),
                             "items": [
                                 {
@@ -80,14 +150,14 @@ class RankingService:
                     }
                 else:
                     error_msg = f"Tableau update failed with code {final_job.finish_code}"
-                    logger.error(f"\n❌ {error_msg}")
+                    logger.error(f"❌ {error_msg}")
                     raise Exception(error_msg)
 
             except Exception as e:
-                logger.error(f"\n❌ Error waiting for job: {str(e)}")
+                logger.error(f"❌ Error waiting for job: {str(e)}")
                 raise Exception(f"Tableau update failed: {str(e)}")
                 
         except Exception as e:
-            logger.error(f"\n❌ Error in generate_and_update: {str(e)}")
-            logger.error("\nStack trace:", exc_info=True)
+            logger.error(f"❌ Error in generate_and_update: {str(e)}")
+            logger.error("Stack trace:", exc_info=True)
             raise Exception(f"Failed to generate ranking: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,98 @@
+"""Admission control at the API: 429 for a full priority share, 503 when overloaded or shutting down"""
+import asyncio
+
+import httpx
+import pytest
+
+QUEUE_LIMIT = 4
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    for name, value in {
+        "TABLEAU_SERVER_URL": "http://tableau.invalid",
+        "TABLEAU_SITE_NAME": "stub",
+        "TABLEAU_TOKEN_NAME": "test",
+        "TABLEAU_TOKEN_VALUE": "test",
+        "TABLEAU_DATASOURCE_NAME": "Top10 Rankings",
+        "OPENAI_API_KEY": "offline-test",
+        "RANKING_HISTORY_PATH": str(tmp_path / "rankings.sqlite"),
+        "JOB_WORKERS": "1",
+        "JOB_QUEUE_LIMIT": str(QUEUE_LIMIT),
+        "LOG_LEVEL": "WARNING",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+    from src.web.app import create_app
+    return create_app()
+
+
+async def fill(jobs, count, priority="high"):
+    """Occupy the only worker, then queue count jobs behind it"""
+    release = asyncio.Event()
+
+    async def gated(report):
+        await release.wait()
+        return {}
+
+    await jobs.submit("running", gated)
+    await asyncio.sleep(0)
+    for index in range(count):
+        await jobs.submit(f"waiting {index}", gated, priority=priority)
+    return release
+
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_full_priority_share_returns_429_with_retry_after(app):
+    async with app.router.lifespan_context(app), client(app) as http:
+        jobs = app.state.services.jobs
+        # low priority may fill half of the queue
+        release = await fill(jobs, QUEUE_LIMIT // 2)
+
+        response = await http.post("/api/analyze", json={"topic": "Electric cars", "priority": "low"})
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        # more urgent work is still admitted
+        response = await http.post("/api/analyze", json={"topic": "Electric cars", "priority": "high"})
+        assert response.status_code == 202
+        release.set()
+
+    assert jobs.stats()["rejected"]["priority_share"] == 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_returns_503_with_retry_after(app):
+    async with app.router.lifespan_context(app), client(app) as http:
+        jobs = app.state.services.jobs
+        release = await fill(jobs, QUEUE_LIMIT)
+
+        for path, body in [
+            ("/api/analyze", {"topic": "Electric cars", "priority": "high"}),
+            ("/api/analyze/batch", {"topics": ["Electric cars", "Bikes"], "priority": "high"}),
+        ]:
+            response = await http.post(path, json=body)
+            assert response.status_code == 503
+            assert int(response.headers["Retry-After"]) >= 1
+        release.set()
+
+    assert jobs.stats()["rejected"]["queue_full"] == 2
+
+
+@pytest.mark.asyncio
+async def test_shutdown_returns_503(app):
+    async with app.router.lifespan_context(app):
+        jobs = app.state.services.jobs
+    assert not jobs.running
+
+    async with client(app) as http:
+        response = await http.post("/api/analyze", json={"topic": "Electric cars"})
+
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    # the rejected submission did not restart the workers
+    assert not jobs.running
+    assert jobs.stats()["rejected"]["shutting_down"] == 1
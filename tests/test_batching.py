@@ -0,0 +1,88 @@
+"""BatchingPublisher: combined jobs, bisection on rejected data, fail-fast on Tableau errors"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import tableauserverclient as TSC
+from tableauserverclient.server.endpoint.exceptions import JobFailedException
+
+from src.pipeline.batching import BatchingPublisher
+
+
+class FakePublisher:
+    """update_data/wait_for_job of TableauCloudPublisher; jobs containing a "bad" row fail"""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.jobs = []
+        self.running = 0
+        self.max_running = 0
+
+    async def update_data(self, rows, temp_dir=None):
+        self.jobs.append(list(rows))
+        return str(len(self.jobs))
+
+    async def wait_for_job(self, job_id, timeout=300):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            if self.error is not None:
+                raise self.error
+            job = SimpleNamespace(id=job_id, finish_code=0, notes=["Invalid row"])
+            if any(row.startswith("bad") for row in self.jobs[int(job_id) - 1]):
+                raise JobFailedException(job)
+            return job
+        finally:
+            self.running -= 1
+
+
+async def publish_all(batcher, rankings):
+    """Publish every ranking's rows through one batch; outcome per ranking"""
+    results = await asyncio.gather(
+        *(batcher.publish(rows) for rows in rankings), return_exceptions=True
+    )
+    return ["failed" if isinstance(result, Exception) else "ok" for result in results]
+
+
+def rankings(count, bad=()):
+    return [[f"{'bad' if index in bad else 'row'}-{index}-{item}" for item in range(10)] for index in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_rankings_share_one_job():
+    publisher = FakePublisher()
+    batcher = BatchingPublisher(publisher, max_batch_rows=80, flush_interval=10)
+
+    assert await publish_all(batcher, rankings(8)) == ["ok"] * 8
+    assert len(publisher.jobs) == 1
+    assert batcher.stats()["requests_published"] == 8
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_is_bisected_one_job_at_a_time():
+    publisher = FakePublisher()
+    batcher = BatchingPublisher(publisher, max_batch_rows=80, flush_interval=10)
+
+    outcomes = await publish_all(batcher, rankings(8, bad={5}))
+
+    assert outcomes == ["ok"] * 5 + ["failed"] + ["ok"] * 2
+    # 8 -> 4 + 4 -> 2 + 2 -> 1 + 1: far fewer than one job per ranking after the first
+    assert len(publisher.jobs) == 7
+    assert publisher.max_running == 1
+    assert batcher.stats()["requests_published"] == 7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("error", [
+    TimeoutError("Timeout after 300 seconds waiting for job"),
+    TSC.ServerResponseError("500000", "Internal Server Error", "Tableau is down"),
+    TSC.ServerResponseError("429000", "Too Many Requests", "Slow down"),
+])
+async def test_tableau_failures_fail_the_batch_without_more_jobs(error):
+    publisher = FakePublisher(error=error)
+    batcher = BatchingPublisher(publisher, max_batch_rows=80, flush_interval=10)
+
+    assert await publish_all(batcher, rankings(8)) == ["failed"] * 8
+    assert len(publisher.jobs) == 1
+    assert batcher.stats()["batch_splits"] == 0
@@ -0,0 +1,173 @@
+"""Caches: TTL expiry, LRU eviction on both backends and single-flight generation"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.stubs import ranking_payload
+from src.agent.cache import RankingCache
+from src.core import cache
+from src.core.cache import MemoryCache, SqliteCache
+from src.models.ranking import RankingResult
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Wall clock of the cache module; advances a millisecond per reading so accesses never tie"""
+    clock = FakeClock()
+
+    def time():
+        clock.advance(0.001)
+        return clock.now
+
+    monkeypatch.setattr(cache, "time", SimpleNamespace(time=time))
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite", "sqlite without RETURNING"])
+def backend(request, tmp_path, monkeypatch, clock):
+    if request.param == "memory":
+        yield MemoryCache(max_entries=3)
+        return
+    if request.param == "sqlite without RETURNING":
+        monkeypatch.setattr(cache, "_DELETE_RETURNING", False)
+    backend = SqliteCache(tmp_path / "cache.sqlite", max_entries=3)
+    yield backend
+    backend.close()
+
+
+def ranking(topic):
+    return RankingResult.model_validate(ranking_payload(topic))
+
+
+def test_lru_evicts_the_least_recently_used(backend):
+    evicted = []
+    backend.on_evict = evicted.append
+    for key in "abc":
+        backend.set(key, {"key": key})
+
+    # reading "a" makes "b" the least recently used
+    assert backend.get("a").value == {"key": "a"}
+    backend.set("d", {"key": "d"})
+    backend.set("e", {"key": "e"})
+
+    assert sorted(backend.keys()) == ["a", "d", "e"]
+    assert evicted == ["b", "c"]
+    assert backend.get("b") is None and len(backend) == 3
+
+    # delete and clear are not evictions
+    backend.delete("a")
+    backend.clear()
+    assert evicted == ["b", "c"] and len(backend) == 0
+
+
+def test_sqlite_entries_survive_reopening(tmp_path, clock):
+    first = SqliteCache(tmp_path / "cache.sqlite")
+    first.set("electric cars", {"items": [1, 2]}, stored_at=clock.now - 60)
+    first.close()
+
+    second = SqliteCache(tmp_path / "cache.sqlite")
+    entry = second.get("electric cars")
+    second.close()
+
+    assert entry.value == {"items": [1, 2]}
+    assert entry.age == pytest.approx(60, abs=1)
+
+
+def test_rankings_expire_after_the_ttl(backend, clock):
+    rankings = RankingCache(backend, ttl=60)
+    rankings.set("Electric cars", ranking("Electric cars"))
+
+    clock.advance(59)
+    assert rankings.get("top 10 electric cars").topic == "Electric cars"
+
+    clock.advance(2)
+    assert rankings.get("Electric cars") is None
+    # the expired entry is dropped, not kept around
+    assert len(rankings.backend) == 0
+
+
+def test_evicted_rankings_leave_the_similarity_index(clock):
+    rankings = RankingCache(MemoryCache(max_entries=2), ttl=60, similarity_threshold=0.5)
+    for topic in ("Electric cars", "Hiking trails", "Coffee shops in Berlin"):
+        rankings.set(topic, ranking(topic))
+
+    assert "electric cars" not in rankings.index
+    # "electric car" has the same shingles as the evicted "electric cars"
+    assert rankings.get_similar("Electric car") is None
+    assert rankings.get_similar("Hiking trail").topic == "Hiking trails"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_generation():
+    rankings = RankingCache(MemoryCache(), ttl=60)
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = []
+
+    async def generate(topic):
+        calls.append(topic)
+        started.set()
+        await release.wait()
+        return ranking(topic)
+
+    first = asyncio.create_task(rankings.get_or_generate("Electric cars", generate))
+    await started.wait()
+    # same normalized topic: joins the running generation
+    others = [
+        asyncio.create_task(rankings.get_or_generate(topic, generate))
+        for topic in ("Top 10 electric cars", "electric  CARS")
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(first, *others)
+
+    assert calls == ["Electric cars"]
+    assert {result.topic for result in results} == {"Electric cars"}
+    # joiners get copies, not the instance the first caller may mutate
+    assert results[1] is not results[0] and results[2] is not results[1]
+    stats = rankings.stats()
+    assert stats["misses"] == 1 and stats["coalesced"] == 2
+
+    await rankings.get_or_generate("Electric cars", generate)
+    assert len(calls) == 1 and rankings.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_generation_fails_every_waiter_and_is_not_cached():
+    rankings = RankingCache(MemoryCache(), ttl=60)
+    release = asyncio.Event()
+    calls = []
+
+    async def failing(topic):
+        calls.append(topic)
+        await release.wait()
+        raise RuntimeError("model unavailable")
+
+    waiters = [asyncio.create_task(rankings.get_or_generate("Electric cars", failing)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(rankings.backend) == 0
+
+    async def generate(topic):
+        calls.append(topic)
+        return ranking(topic)
+
+    # the next miss runs a fresh generation
+    assert (await rankings.get_or_generate("Electric cars", generate)).topic == "Electric cars"
+    assert len(calls) == 2
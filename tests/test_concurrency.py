@@ -0,0 +1,96 @@
+"""
+Concurrent analyses overlap: N parallel /api/analyze jobs against stubbed
+upstreams (benchmarks/stubs.py) finish in about the time of a single one.
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from benchmarks import stubs
+
+PARALLEL = 8
+LLM_LATENCY = 0.3
+SEARCH_LATENCY = 0.2
+JOB_SECONDS = 0.5
+
+
+@pytest.fixture
+def stub_tableau():
+    with stubs.StubTableau(latency=0.0, job_seconds=JOB_SECONDS) as stub:
+        yield stub
+
+
+@pytest.fixture
+def app(stub_tableau, monkeypatch, tmp_path):
+    for name, value in {
+        "TABLEAU_SERVER_URL": stub_tableau.url,
+        "TABLEAU_SITE_NAME": "stub",
+        "TABLEAU_TOKEN_NAME": "test",
+        "TABLEAU_TOKEN_VALUE": "test",
+        "TABLEAU_DATASOURCE_NAME": "Top10 Rankings",
+        "OPENAI_API_KEY": "offline-test",
+        "RANKING_CACHE_TTL": "0",
+        "RANKING_HISTORY_PATH": str(tmp_path / "rankings.sqlite"),
+        "JOB_WORKERS": str(PARALLEL),
+        # the stub searches are not rate limited; the default DuckDuckGo ceilings would serialize them
+        "SEARCH_POOL_SIZE": str(4 * PARALLEL),
+        "UPSTREAM_CONCURRENCY": f"duckduckgo={4 * PARALLEL}",
+        "TABLEAU_JOB_POLL_MIN_SECONDS": "0.1",
+        "TABLEAU_JOB_POLL_MAX_SECONDS": "0.5",
+        "TABLEAU_BATCH_FLUSH_SECONDS": "0.2",
+        "LOG_LEVEL": "WARNING",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+    from src.agent import search
+    from src.web.app import create_app
+
+    monkeypatch.setattr(stubs.FakeDDGS, "latency", SEARCH_LATENCY)
+    monkeypatch.setattr(search, "DDGS", stubs.FakeDDGS)
+    return create_app()
+
+
+async def analyze(client: httpx.AsyncClient, topic: str) -> dict:
+    """Submit an analysis and poll its job until it finishes"""
+    response = await client.post("/api/analyze", json={"topic": topic})
+    response.raise_for_status()
+    job_id = response.json()["details"]["job_id"]
+    while True:
+        await asyncio.sleep(0.05)
+        job = (await client.get(f"/api/jobs/{job_id}")).json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+
+
+async def timed(coroutine) -> float:
+    started = time.perf_counter()
+    await coroutine
+    return time.perf_counter() - started
+
+
+@pytest.mark.asyncio
+async def test_parallel_analyses_take_about_as_long_as_one(app):
+    from src.agent.ranking_agent import ranking_agent
+
+    with ranking_agent.override(model=stubs.ranking_model(LLM_LATENCY)):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=None) as client:
+                # the first run starts the Hyper process and loads the agent
+                assert (await analyze(client, "Warm-up topic"))["status"] == "succeeded"
+                single = await timed(analyze(client, "Single topic"))
+
+                jobs = []
+
+                async def run(index: int) -> None:
+                    jobs.append(await analyze(client, f"Parallel topic {index}"))
+
+                parallel = await timed(asyncio.gather(*(run(index) for index in range(PARALLEL))))
+
+    assert [job["status"] for job in jobs] == ["succeeded"] * PARALLEL
+    # serial execution would take PARALLEL times as long
+    assert parallel < 2 * single, (
+        f"{PARALLEL} parallel analyses took {parallel:.2f}s, one took {single:.2f}s"
+    )
@@ -0,0 +1,118 @@
+"""DatasourceResolver against a fake TSC server with thousands of datasources"""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import tableauserverclient as TSC
+
+from src.pipeline.datasources import DatasourceResolver
+
+SITE_SIZE = 5000
+PAGE_SIZE = 1000
+TARGET = "Top10 Rankings"
+
+
+class FakeDatasources:
+    """datasources endpoint of a TSC server: paginated listing and an optional name filter"""
+
+    def __init__(self, names, filter_supported=True):
+        self.items = []
+        for index, name in enumerate(names):
+            item = TSC.DatasourceItem(project_id="project", name=name)
+            item._id = f"ds-{index}"
+            self.items.append(item)
+        self.filter_supported = filter_supported
+        self.filtered_requests = 0
+        self.page_requests = 0
+
+    def get(self, options=None):
+        options = options or TSC.RequestOptions()
+        names = [f.value for f in options.filter if f.field == TSC.RequestOptions.Field.Name]
+        if names:
+            self.filtered_requests += 1
+            if not self.filter_supported:
+                raise TSC.ServerResponseError("400065", "Bad Request", "Unsupported filter")
+            matches = [item for item in self.items if item.name in names]
+            return matches, self._pagination(1, options.pagesize, len(matches))
+        self.page_requests += 1
+        start = (options.pagenumber - 1) * options.pagesize
+        page = self.items[start:start + options.pagesize]
+        return page, self._pagination(options.pagenumber, options.pagesize, len(self.items))
+
+    __call__ = get
+
+    @staticmethod
+    def _pagination(number, size, total):
+        pagination = TSC.PaginationItem()
+        pagination._page_number = number
+        pagination._page_size = size
+        pagination._total_available = total
+        return pagination
+
+
+def site(filter_supported=True):
+    names = [f"Datasource {index}" for index in range(SITE_SIZE - 1)] + [TARGET]
+    return FakeDatasources(names, filter_supported)
+
+
+def test_filtered_lookup_does_not_list_the_site():
+    datasources = site()
+    resolver = DatasourceResolver(SimpleNamespace(datasources=datasources), page_size=PAGE_SIZE)
+
+    assert resolver.resolve(TARGET).id == f"ds-{SITE_SIZE - 1}"
+    assert resolver.resolve(TARGET).id == f"ds-{SITE_SIZE - 1}"
+
+    assert datasources.filtered_requests == 1
+    assert datasources.page_requests == 0
+    assert resolver.filter_supported
+
+
+def test_rejected_filter_falls_back_to_one_paginated_scan():
+    datasources = site(filter_supported=False)
+    resolver = DatasourceResolver(SimpleNamespace(datasources=datasources), page_size=PAGE_SIZE)
+
+    assert resolver.resolve(TARGET).name == TARGET
+    assert not resolver.filter_supported
+    assert datasources.page_requests == SITE_SIZE // PAGE_SIZE
+    assert len(resolver) == SITE_SIZE
+
+    # every other datasource is now served from the index
+    assert resolver.resolve("Datasource 42").id == "ds-42"
+    assert datasources.filtered_requests == 1
+    assert datasources.page_requests == SITE_SIZE // PAGE_SIZE
+
+
+def test_missing_datasource_raises():
+    resolver = DatasourceResolver(SimpleNamespace(datasources=site()), page_size=PAGE_SIZE)
+    with pytest.raises(ValueError):
+        resolver.resolve("Missing")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("filter_supported", [True, False])
+async def test_background_refresh_only_scans_without_the_filter(filter_supported):
+    from src.pipeline.tableau_cloud import TableauCloudPublisher
+
+    datasources = site(filter_supported)
+    server = SimpleNamespace(
+        datasources=datasources,
+        is_signed_in=lambda: True,
+        use_server_version=lambda: None,
+        auth=SimpleNamespace(sign_in=lambda auth: None, sign_out=lambda: None),
+    )
+    publisher = TableauCloudPublisher(
+        "http://tableau.invalid", "site", "token", "secret", TARGET, server=server
+    )
+    publisher.resolver.page_size = PAGE_SIZE
+    await publisher._get_datasource_id()
+    scans = datasources.page_requests
+
+    refresh = asyncio.create_task(publisher.refresh_datasource_index(0.01))
+    await asyncio.sleep(0.2)
+    refresh.cancel()
+    await asyncio.gather(refresh, return_exceptions=True)
+
+    if filter_supported:
+        assert datasources.page_requests == scans == 0
+    else:
+        assert datasources.page_requests > scans
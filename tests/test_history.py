@@ -0,0 +1,101 @@
+"""RankingHistory: keyset cursor pagination, ties, tampered cursors and the last page"""
+import base64
+import json
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from benchmarks.stubs import ranking_payload
+from src.agent.history import InvalidCursorError, RankingHistory
+from src.models.ranking import RankingResult
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RankingHistory(tmp_path / "rankings.sqlite")
+    yield history
+    history.close()
+
+
+def save(history, topic, generated_at):
+    return history.save(RankingResult.model_validate(dict(ranking_payload(topic), generated_at=generated_at)))
+
+
+def walk(history, limit, **options):
+    """batch_ids of every page, following next_cursor to the end"""
+    pages, cursor = [], None
+    while True:
+        items, cursor = history.list(limit=limit, cursor=cursor, **options)
+        pages.append([item["batch_id"] for item in items])
+        if cursor is None:
+            return pages
+
+
+def cursor_of(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+def test_pages_are_newest_first_and_end_without_a_cursor(history):
+    batch_ids = [save(history, f"Topic {n}", START + timedelta(minutes=n)) for n in range(7)]
+
+    pages = walk(history, limit=3)
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == batch_ids[::-1]
+
+
+def test_full_last_page_has_no_next_cursor(history):
+    for n in range(6):
+        save(history, f"Topic {n}", START + timedelta(minutes=n))
+
+    assert [len(page) for page in walk(history, limit=3)] == [3, 3]
+    assert history.list(limit=10)[1] is None
+
+
+def test_equal_timestamps_are_neither_skipped_nor_repeated(history):
+    batch_ids = [save(history, f"Topic {n}", START) for n in range(5)]
+
+    pages = walk(history, limit=2)
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == sorted(batch_ids, reverse=True)
+
+
+def test_pages_stay_stable_while_rankings_are_added(history):
+    for n in range(4):
+        save(history, f"Topic {n}", START + timedelta(minutes=n))
+    first, cursor = history.list(limit=2)
+
+    save(history, "Newer topic", START + timedelta(hours=1))
+    second, cursor = history.list(limit=2, cursor=cursor)
+
+    assert [item["topic"] for item in first + second] == ["Topic 3", "Topic 2", "Topic 1", "Topic 0"]
+    assert cursor is None
+
+
+def test_topic_and_latest_listings_paginate(history):
+    newest = {}
+    for n in range(3):
+        for topic in ("Electric cars", "Bikes"):
+            newest[topic] = save(history, topic, START + timedelta(minutes=n))
+
+    assert [len(page) for page in walk(history, limit=2, topic="electric  CARS")] == [2, 1]
+    assert sorted(sum(walk(history, limit=1, latest=True), [])) == sorted(newest.values())
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    cursor_of(42),
+    cursor_of(["2026-01-01T00:00:00.000000"]),
+    cursor_of({"generated_at": "2026-01-01T00:00:00.000000", "batch_id": "b"}),
+    cursor_of(["2026-01-01T00:00:00.000000", 7]),
+    cursor_of(["yesterday", "Topic 1_20260101000000000000"]),
+    cursor_of(["2026-01-01 00:00:00", "Topic 1_20260101000000000000"]),
+])
+def test_invalid_or_tampered_cursors_are_rejected(history, cursor):
+    save(history, "Topic 1", START)
+    with pytest.raises(InvalidCursorError):
+        history.list(cursor=cursor)
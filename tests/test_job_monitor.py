@@ -0,0 +1,80 @@
+"""TableauJobMonitor polls: bounded jobs listing, per-id fallback, request accounting"""
+from datetime import datetime, UTC
+from types import SimpleNamespace
+
+import tableauserverclient as TSC
+
+from src.pipeline.job_monitor import TableauJobMonitor
+
+PAGE_SIZE = 100
+
+
+class FakeJobs:
+    """jobs endpoint of a TSC server: a paginated site listing and lookups by id"""
+
+    def __init__(self, site_jobs, finished):
+        now = datetime.now(UTC)
+        self.listing = [
+            TSC.BackgroundJobItem(
+                job_id, now, 50, "update_uploaded_file", "Success" if job_id in finished else "InProgress"
+            )
+            for job_id in site_jobs
+        ]
+        self.finished = finished
+        self.page_requests = 0
+        self.lookups = 0
+
+    def get(self, job_id=None, req_options=None):
+        self.page_requests += 1
+        start = (req_options.pagenumber - 1) * req_options.pagesize
+        pagination = TSC.PaginationItem()
+        pagination._page_number = req_options.pagenumber
+        pagination._page_size = req_options.pagesize
+        pagination._total_available = len(self.listing)
+        return self.listing[start:start + req_options.pagesize], pagination
+
+    def get_by_id(self, job_id):
+        self.lookups += 1
+        completed = datetime.now(UTC) if job_id in self.finished else None
+        return TSC.JobItem(job_id, "RefreshExtract", "100", datetime.now(UTC), completed_at=completed)
+
+
+def poll(site_jobs, tracked, finished, max_pages=3):
+    jobs = FakeJobs(site_jobs, finished)
+    monitor = TableauJobMonitor(
+        SimpleNamespace(server=SimpleNamespace(jobs=jobs)), page_size=PAGE_SIZE, max_pages=max_pages
+    )
+    done = monitor._poll(tracked, datetime.now(UTC))
+    return sorted(job.id for job in done), jobs, monitor
+
+
+def test_small_listing_is_read_page_by_page():
+    tracked = ["job-10", "job-150", "job-220"]
+    done, jobs, monitor = poll([f"job-{n}" for n in range(250)], tracked, {"job-10", "job-220"})
+
+    assert done == ["job-10", "job-220"]
+    assert jobs.page_requests == 3
+    # only the finished jobs are fetched in full
+    assert jobs.lookups == 2
+    assert monitor.requests == 5
+
+
+def test_large_listing_falls_back_to_lookups_by_id():
+    tracked = ["job-10", "job-4990"]
+    done, jobs, monitor = poll([f"job-{n}" for n in range(5000)], tracked, {"job-4990"})
+
+    assert done == ["job-4990"]
+    # one page shows the listing is longer than the two lookups it would save
+    assert jobs.page_requests == 1
+    assert jobs.lookups == 2
+    assert monitor.requests == 3
+
+
+def test_pages_are_capped_by_max_pages():
+    tracked = [f"job-{n}" for n in range(0, 1000, 100)]
+    done, jobs, monitor = poll([f"job-{n}" for n in range(1000)], tracked, {"job-900"}, max_pages=2)
+
+    assert done == ["job-900"]
+    assert jobs.page_requests == 1
+    assert jobs.lookups == len(tracked)
+    assert monitor.requests == 1 + len(tracked)
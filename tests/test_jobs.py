@@ -0,0 +1,146 @@
+"""JobManager: submission, lookup, event streams, history eviction and failures"""
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from src.web.services.jobs import JobManager, JobNotFoundError, JobStatus
+
+
+async def finish(manager: JobManager, job_id: str) -> list:
+    """Stages of every event of a job, once it has finished"""
+    return [event.stage async for event in manager.events(job_id)]
+
+
+async def succeed(report):
+    await report("working", {"step": 1})
+    return {"status": "success"}
+
+
+@pytest_asyncio.fixture
+async def manager():
+    manager = JobManager(workers=2, history_limit=3)
+    yield manager
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_submit_runs_the_job(manager):
+    job = await manager.submit("electric cars", succeed)
+
+    assert job.status == JobStatus.QUEUED
+    assert manager.running
+    assert await finish(manager, job.id) == ["queued", "running", "working", "completed"]
+    assert job.status == JobStatus.SUCCEEDED
+    assert job.result == {"status": "success"}
+    assert job.started_at is not None and job.finished_at is not None
+    assert job.events[2].data == {"step": 1}
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_unknown_priority(manager):
+    with pytest.raises(ValueError):
+        await manager.submit("electric cars", succeed, priority="urgent")
+
+
+@pytest.mark.asyncio
+async def test_get(manager):
+    job = await manager.submit("electric cars", succeed)
+    assert manager.get(job.id) is job
+    with pytest.raises(JobNotFoundError):
+        manager.get("missing")
+
+
+@pytest.mark.asyncio
+async def test_events_stream_until_the_job_finishes(manager):
+    release = asyncio.Event()
+
+    async def gated(report):
+        await report("waiting")
+        await release.wait()
+        return {}
+
+    job = await manager.submit("electric cars", gated)
+    stream = manager.events(job.id)
+    stages = [(await anext(stream)).stage for _ in range(3)]
+    assert stages == ["queued", "running", "waiting"]
+    assert not job.done
+
+    release.set()
+    assert [event.stage async for event in stream] == ["completed"]
+    assert [event.seq for event in job.events] == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_events_of_unknown_job(manager):
+    with pytest.raises(JobNotFoundError):
+        await anext(manager.events("missing"))
+
+
+@pytest.mark.asyncio
+async def test_failed_runner(manager):
+    async def fail(report):
+        raise RuntimeError("search quota exhausted")
+
+    job = await manager.submit("electric cars", fail)
+
+    assert await finish(manager, job.id) == ["queued", "running", "failed"]
+    assert job.status == JobStatus.FAILED
+    assert job.error == "search quota exhausted"
+    assert job.events[-1].data == {"error": "search quota exhausted"}
+    # the worker survives and keeps serving jobs
+    retry = await manager.submit("bikes", succeed)
+    assert (await finish(manager, retry.id))[-1] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job(manager):
+    started = asyncio.Event()
+
+    async def hang(report):
+        started.set()
+        await asyncio.Event().wait()
+
+    job = await manager.submit("electric cars", hang)
+    await started.wait()
+    await manager.stop()
+
+    assert job.status == JobStatus.FAILED
+    assert job.error == "Job cancelled"
+    assert job.finished_at is not None
+    assert [event.stage for event in job.events] == ["queued", "running", "failed"]
+
+
+@pytest.mark.asyncio
+async def test_evict_drops_the_oldest_finished_jobs(manager):
+    finished = []
+    for index in range(3):
+        job = await manager.submit(f"topic {index}", succeed)
+        await finish(manager, job.id)
+        finished.append(job.id)
+
+    release = asyncio.Event()
+
+    async def gated(report):
+        await release.wait()
+        return {}
+
+    pending = [await manager.submit(f"pending {index}", gated) for index in range(3)]
+
+    # each new job evicted one finished job, oldest first
+    for job_id in finished:
+        with pytest.raises(JobNotFoundError):
+            manager.get(job_id)
+    # unfinished jobs are kept even beyond the history limit
+    extra = await manager.submit("extra", gated)
+    assert [manager.get(job.id) for job in pending + [extra]] == pending + [extra]
+
+    release.set()
+    for job in pending + [extra]:
+        await finish(manager, job.id)
+    # the next submission trims the history back to the limit
+    latest = await manager.submit("latest", succeed)
+    assert len(manager._jobs) == manager.history_limit
+    assert manager.get(latest.id) is latest
+    with pytest.raises(JobNotFoundError):
+        manager.get(pending[0].id)
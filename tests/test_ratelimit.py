@@ -0,0 +1,283 @@
+"""AdaptiveLimiter on a fake clock: AIMD window, pauses, token refill, retries and the upstream wrappers"""
+import pytest
+import requests
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+from pydantic_ai.models.function import FunctionModel
+
+from src.agent.throttling import RateLimitedModel
+from src.core import ratelimit
+from src.core.ratelimit import _MAX_WAIT, AdaptiveLimiter
+from src.pipeline.tableau_cloud import RateLimitedSession
+
+PROMPT = [ModelRequest(parts=[UserPromptPart("rank")])]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class Throttled(Exception):
+    """An upstream error carrying HTTP 429"""
+
+    def __init__(self, retry_after=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.headers = {} if retry_after is None else {"retry-after": str(retry_after)}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def wait_for_slot(limiter):
+    """Seconds until the next call may start, taking the slot when that is 0"""
+    with limiter._cond:
+        return limiter._try_acquire()
+
+
+def test_successes_widen_the_window_up_to_the_ceiling(clock):
+    limiter = AdaptiveLimiter("test", max_concurrency=4, clock=clock)
+    limiter.acquire_sync()
+    limiter.release(Throttled())
+    clock.advance(limiter.cooldown)
+    assert limiter.limit == 2
+
+    # two calls fit the halved window, a third waits for a release
+    assert wait_for_slot(limiter) == 0 and wait_for_slot(limiter) == 0
+    assert wait_for_slot(limiter) == _MAX_WAIT
+
+    limits = []
+    for _ in range(8):
+        limiter.release()
+        limits.append(round(limiter.limit, 2))
+        limiter.acquire_sync()
+    # +1/limit per success: about one slot per window of calls, capped at max_concurrency
+    assert limits == [2.5, 2.9, 3.24, 3.55, 3.83, 4.0, 4.0, 4.0]
+    assert limiter.stats()["in_flight"] == 2
+
+
+def test_failures_other_than_rate_limits_keep_the_window(clock):
+    limiter = AdaptiveLimiter("test", max_concurrency=4, clock=clock)
+    limiter.acquire_sync()
+
+    assert limiter.release(RuntimeError("boom")) is False
+
+    assert limiter.limit == 4 and limiter.throttled == 0
+    assert wait_for_slot(limiter) == 0
+
+
+def test_rate_limit_backs_off_once_and_pauses_for_retry_after(clock):
+    limiter = AdaptiveLimiter("test", max_concurrency=8, cooldown=5, clock=clock)
+    for _ in range(3):
+        limiter.acquire_sync()
+
+    assert limiter.release(Throttled(retry_after=3)) is True
+    # the other calls in flight hit the same limit: counted, but no second backoff
+    limiter.release(Throttled(retry_after=3))
+    assert limiter.limit == 4 and limiter.throttled == 2
+    assert wait_for_slot(limiter) == 3
+    assert limiter.stats()["paused_seconds"] == 3
+
+    clock.advance(2)
+    assert wait_for_slot(limiter) == 1
+    clock.advance(1)
+    assert wait_for_slot(limiter) == 0
+
+    # a later rate limit without Retry-After backs off again and pauses for the cooldown
+    limiter.release(Throttled())
+    assert limiter.limit == 2
+    assert wait_for_slot(limiter) == 5
+    assert limiter.stats()["in_flight"] == 1
+
+
+def test_window_never_drops_below_one(clock):
+    limiter = AdaptiveLimiter("test", max_concurrency=2, cooldown=1, clock=clock)
+    for _ in range(3):
+        limiter.acquire_sync()
+        limiter.release(Throttled())
+        clock.advance(1)
+    assert limiter.limit == 1
+
+
+def test_token_bucket_refills_at_the_rate(clock):
+    limiter = AdaptiveLimiter("test", max_concurrency=8, rate=60, period=60, burst=2, clock=clock)
+
+    assert wait_for_slot(limiter) == 0 and wait_for_slot(limiter) == 0
+    assert wait_for_slot(limiter) == pytest.approx(1.0)
+    clock.advance(0.25)
+    assert wait_for_slot(limiter) == pytest.approx(0.75)
+    clock.advance(0.75)
+    assert wait_for_slot(limiter) == 0
+
+    # idle time refills up to the burst, not beyond
+    clock.advance(100)
+    assert wait_for_slot(limiter) == 0 and wait_for_slot(limiter) == 0
+    assert wait_for_slot(limiter) == pytest.approx(1.0)
+    assert limiter.calls == 5
+
+
+@pytest.mark.asyncio
+async def test_call_retries_rate_limited_calls():
+    # no cooldown: the retries run straight away on the real clock
+    limiter = AdaptiveLimiter("test", max_concurrency=4, cooldown=0, retries=2)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Throttled()
+        return "ok"
+
+    assert await limiter.call(flaky) == "ok"
+    assert len(attempts) == 3 and limiter.throttled == 2
+    assert limiter.stats()["in_flight"] == 0
+
+    async def always_throttled():
+        raise Throttled()
+
+    with pytest.raises(Throttled):
+        await limiter.call(always_throttled)
+    assert limiter.throttled == 5
+
+
+def test_call_sync_retries_rate_limited_responses():
+    limiter = AdaptiveLimiter("test", max_concurrency=4, cooldown=0, retries=2)
+    statuses = [429, 200]
+
+    def fetch():
+        return response(statuses.pop(0))
+
+    assert limiter.call_sync(fetch).status_code == 200
+    assert limiter.throttled == 1 and limiter.stats()["in_flight"] == 0
+
+    # other errors are raised without a retry
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call_sync(broken)
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def upstreams(monkeypatch):
+    """Process-wide upstream limiters without cooldown; restored afterwards"""
+    limiters = {
+        name: AdaptiveLimiter(name, max_concurrency=4, cooldown=0, retries=2)
+        for name in ("openai", "tableau")
+    }
+    monkeypatch.setattr(ratelimit, "_upstreams", limiters)
+    return limiters
+
+
+def throttled_model(failures):
+    """FunctionModel that is rate limited failures times before it answers"""
+    calls = []
+
+    def respond(messages, info):
+        calls.append(messages)
+        if len(calls) <= failures:
+            raise Throttled()
+        return ModelResponse(parts=[TextPart("ranked")])
+
+    async def stream(messages, info):
+        calls.append(messages)
+        if len(calls) <= failures:
+            raise Throttled()
+        yield "ranked"
+
+    model = FunctionModel(respond, stream_function=stream)
+    model.calls = calls
+    return model
+
+
+async def agent_model(model):
+    return await RateLimitedModel(model, "openai").agent_model(
+        function_tools=[], allow_text_result=True, result_tools=[]
+    )
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_model_retries_requests(upstreams):
+    model = throttled_model(failures=2)
+
+    reply, _ = await (await agent_model(model)).request(PROMPT, None)
+
+    assert reply.parts[0].content == "ranked"
+    assert len(model.calls) == 3
+    stats = upstreams["openai"].stats()
+    assert stats["throttled"] == 2 and stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_model_retries_opening_streams(upstreams):
+    model = throttled_model(failures=1)
+    limiter = upstreams["openai"]
+
+    async with (await agent_model(model)).request_stream(PROMPT, None):
+        # the slot is held while the stream is read
+        assert limiter.stats()["in_flight"] == 1
+
+    assert len(model.calls) == 2
+    assert limiter.throttled == 1 and limiter.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_model_gives_up_after_the_retries(upstreams):
+    model = throttled_model(failures=10)
+
+    with pytest.raises(Throttled):
+        await (await agent_model(model)).request(PROMPT, None)
+
+    assert len(model.calls) == 3
+    assert upstreams["openai"].stats()["in_flight"] == 0
+
+
+def response(status, request=None):
+    result = requests.Response()
+    result.status_code = status
+    result._content = b""
+    result.request = request
+    return result
+
+
+class StatusAdapter(requests.adapters.BaseAdapter):
+    """Answers requests with the given statuses in turn"""
+
+    def __init__(self, *statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        return response(self.statuses.pop(0), request)
+
+    def close(self):
+        pass
+
+
+def test_rate_limited_session_retries_429_before_tsc_sees_it(upstreams):
+    session = RateLimitedSession()
+    adapter = StatusAdapter(429, 429, 200)
+    session.mount("http://", adapter)
+
+    assert session.get("http://tableau.invalid/api/3.22/sites").status_code == 200
+    assert adapter.sent == 3
+    assert upstreams["tableau"].throttled == 2
+
+    # past the retries the 429 is returned for TSC to raise
+    session.mount("http://", StatusAdapter(429, 429, 429))
+    assert session.get("http://tableau.invalid/api/3.22/sites").status_code == 429
+    assert upstreams["tableau"].stats()["in_flight"] == 0
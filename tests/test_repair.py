@@ -0,0 +1,119 @@
+"""Repair of malformed rankings: deterministic fixes, item regeneration, full retries"""
+import pytest
+from pydantic_ai.exceptions import UnexpectedModelBehavior
+from pydantic_ai.messages import ModelResponse, RetryPromptPart, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from benchmarks.stubs import ranking_payload
+from src.agent.ranking_agent import RankingDependencies, ranking_agent
+from src.agent.repair import repair_draft
+from src.models.ranking import RankingDraft
+
+TOPIC = "Street food"
+
+
+class StubModel:
+    """Answers ranking requests with drafts in turn and item repair requests with replacement items"""
+
+    def __init__(self, *drafts, replacements=()):
+        self.drafts = list(drafts)
+        self.replacements = list(replacements)
+        self.prompts = []
+        self.retries = 0
+
+    async def respond(self, messages, info: AgentInfo) -> ModelResponse:
+        prompt = messages[0].parts[-1].content
+        self.prompts.append(prompt)
+        self.retries += sum(isinstance(part, RetryPromptPart) for part in messages[-1].parts)
+        if prompt.startswith("Topic:"):
+            args = {"response": self.replacements}
+        else:
+            args = self.drafts.pop(0) if len(self.drafts) > 1 else self.drafts[0]
+        return ModelResponse(parts=[ToolCallPart.from_raw_args(info.result_tools[0].name, args)])
+
+    async def run(self):
+        deps = RankingDependencies(search_client=None, db_connector=None)
+        with ranking_agent.override(model=FunctionModel(self.respond)):
+            result = await ranking_agent.run(f"Generate top 10 ranking for: {TOPIC}", deps=deps)
+        return result.data
+
+
+def item(rank, name, **fields):
+    return {
+        "rank": rank,
+        "name": name,
+        "description": f"{name} is sold at stalls across the city and is easily worth the queue.",
+        "advantages": ["Cheap", "Quick", "Filling"],
+        "metrics": {"popularity": 8.0},
+        "score": 8.0,
+        **fields,
+    }
+
+
+def malformed_draft():
+    draft = ranking_payload(TOPIC)
+    draft["items"][0].update(name="Fish & Chips", score=85, advantages=["Crispy", "crispy", "Hot", "Classic"])
+    draft["items"][1]["metrics"] = {"popularity": "9.1 / 10", "stalls": "1,200", "origin": "UK"}
+    # out of order, a rank used twice and the same item twice
+    draft["items"][2]["rank"] = 2
+    draft["items"].reverse()
+    draft["items"].append(dict(draft["items"][0]))
+    return draft
+
+
+@pytest.mark.asyncio
+async def test_malformed_draft_is_repaired_without_a_retry():
+    model = StubModel(malformed_draft())
+
+    ranking = await model.run()
+
+    assert len(model.prompts) == 1 and model.retries == 0
+    assert [entry.rank for entry in ranking.items] == list(range(1, 11))
+    # tied ranks keep the order the model listed the items in
+    assert [entry.name for entry in ranking.items] == ["Fish and Chips", "Item 3", "Item 2"] + [
+        f"Item {rank}" for rank in range(4, 11)
+    ]
+    fish = ranking.items[0]
+    assert fish.score == 8.5
+    assert fish.advantages == ["Crispy", "Hot", "Classic"]
+    assert ranking.items[2].metrics == {"popularity": 9.1, "stalls": 1200.0}
+
+
+@pytest.mark.asyncio
+async def test_invalid_items_are_regenerated_on_their_own():
+    draft = ranking_payload(TOPIC)
+    draft["items"][3]["description"] = "Too short"
+    draft["items"][6]["advantages"] = ["Only one"]
+    _, report = repair_draft(RankingDraft.model_validate(draft))
+    assert sorted(report.invalid_items) == [4, 7]
+
+    model = StubModel(draft, replacements=[item(1, "Tacos"), item(2, "Ramen")])
+    ranking = await model.run()
+
+    assert len(model.prompts) == 2 and model.retries == 0
+    assert "rank(s) 4, 7" in model.prompts[1]
+    names = [entry.name for entry in ranking.items]
+    assert names[3] == "Tacos" and names[6] == "Ramen"
+    assert [entry.rank for entry in ranking.items] == list(range(1, 11))
+    assert names[:3] == ["Item 1", "Item 2", "Item 3"]
+
+
+@pytest.mark.asyncio
+async def test_unrepairable_draft_is_regenerated():
+    unrepairable = dict(ranking_payload(TOPIC), methodology="Vibes.", sources=[])
+    model = StubModel(unrepairable, ranking_payload(TOPIC))
+
+    ranking = await model.run()
+
+    assert len(model.prompts) == 2 and model.retries == 1
+    assert ranking.methodology == ranking_payload(TOPIC)["methodology"]
+
+
+@pytest.mark.asyncio
+async def test_unrepairable_drafts_stop_at_the_retry_limit():
+    model = StubModel(dict(ranking_payload(TOPIC), methodology="Vibes."))
+
+    with pytest.raises(UnexpectedModelBehavior):
+        await model.run()
+
+    assert len(model.prompts) == 2 and model.retries == 1
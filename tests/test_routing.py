@@ -0,0 +1,136 @@
+"""ModelRouter: tier selection, coverage checks and escalation from the draft to the quality tier"""
+from types import SimpleNamespace
+
+import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from benchmarks.stubs import ranking_payload
+from src.agent import routing
+from src.agent.ranking_agent import RankingError, _run_ranking_agent
+from src.agent.routing import DRAFT_TIER, QUALITY_TIER, ModelRouter, ModelTier, configure_model_router
+
+TOPIC = "Hiking trails"
+
+
+def stub_model(*sources, methodology=None):
+    """Model that answers every request with the same ranking and counts its calls"""
+    calls = []
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        calls.append(messages)
+        payload = dict(ranking_payload(TOPIC), sources=list(sources))
+        if methodology is not None:
+            payload["methodology"] = methodology
+        return ModelResponse(parts=[ToolCallPart.from_raw_args(info.result_tools[0].name, payload)])
+
+    model = FunctionModel(respond)
+    model.calls = calls
+    return model
+
+
+@pytest.fixture
+def router(monkeypatch):
+    """The process-wide router with a draft and a quality tier; restored afterwards"""
+    monkeypatch.setattr(routing, "_model_router", None)
+    return configure_model_router("test:quality", "test:draft", min_sources=2, costs={"test:draft": (1.0, 2.0)})
+
+
+def use_models(router, draft, quality):
+    router.tiers[0]._model = draft
+    router.tiers[1]._model = quality
+
+
+def test_tiers(monkeypatch):
+    monkeypatch.setattr(routing, "_model_router", None)
+    router = configure_model_router("test:quality", "test:draft")
+    assert [tier.name for tier in router.tiers_for()] == [DRAFT_TIER, QUALITY_TIER]
+    assert [tier.name for tier in router.tiers_for(quality=True)] == [QUALITY_TIER]
+
+    single = configure_model_router("test:quality", "")
+    assert [tier.name for tier in single.tiers_for()] == [QUALITY_TIER]
+    assert single.tiers_for(quality=True) == single.tiers_for()
+
+    with pytest.raises(ValueError):
+        ModelRouter([])
+
+
+def test_coverage_counts_distinct_domains():
+    router = ModelRouter([ModelTier(QUALITY_TIER, "test:quality")], min_sources=2)
+    assert not router.has_coverage(["https://a.example.com/1", "https://www.a.example.com/2"])
+    assert router.has_coverage(["https://a.example.com/1", "https://b.example.com/1"])
+
+
+def test_runs_are_costed_per_tier():
+    tier = ModelTier(DRAFT_TIER, "test:draft", request_cost=1.0, response_cost=2.0)
+    router = ModelRouter([tier])
+    router.record_run(tier, 0.5, SimpleNamespace(request_tokens=1_000_000, response_tokens=500_000))
+    router.record_decision(tier, "accepted")
+
+    stats = router.stats()[DRAFT_TIER]
+    assert stats["runs"] == 1 and stats["accepted"] == 1
+    assert stats["cost_usd"] == 2.0
+    assert stats["avg_seconds"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_good_draft_stays_on_the_draft_tier(router):
+    draft = stub_model("https://a.example.com", "https://b.example.com")
+    quality = stub_model("https://a.example.com", "https://b.example.com")
+    use_models(router, draft, quality)
+
+    await _run_ranking_agent(TOPIC)
+
+    assert len(draft.calls) == 1 and not quality.calls
+    assert router.stats()[DRAFT_TIER]["accepted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_draft_citing_too_few_sources_escalates(router):
+    draft = stub_model("https://a.example.com/1", "https://a.example.com/2")
+    quality = stub_model("https://a.example.com", "https://b.example.com")
+    use_models(router, draft, quality)
+
+    ranking = await _run_ranking_agent(TOPIC)
+
+    assert len(draft.calls) == 1 and len(quality.calls) == 1
+    assert ranking.sources == ["https://a.example.com", "https://b.example.com"]
+    stats = router.stats()
+    assert stats[DRAFT_TIER]["escalated_coverage"] == 1
+    assert stats[QUALITY_TIER]["accepted"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_draft_escalates(router):
+    draft = stub_model("https://a.example.com", "https://b.example.com", methodology="Too short.")
+    quality = stub_model("https://a.example.com", "https://b.example.com")
+    use_models(router, draft, quality)
+
+    await _run_ranking_agent(TOPIC)
+
+    # the draft tier used up its retry before escalating
+    assert len(draft.calls) == 2 and len(quality.calls) == 1
+    assert router.stats()[DRAFT_TIER]["escalated_validation"] == 1
+
+
+@pytest.mark.asyncio
+async def test_quality_requests_skip_the_draft_tier(router):
+    draft = stub_model("https://a.example.com", "https://b.example.com")
+    quality = stub_model("https://a.example.com/1", "https://a.example.com/2")
+    use_models(router, draft, quality)
+
+    # the last tier is accepted even with too few sources
+    await _run_ranking_agent(TOPIC, quality=True)
+
+    assert not draft.calls and len(quality.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalid_ranking_on_the_last_tier_fails(router):
+    invalid = stub_model("https://a.example.com", methodology="Too short.")
+    use_models(router, invalid, invalid)
+
+    with pytest.raises(RankingError):
+        await _run_ranking_agent(TOPIC)
+
+    assert router.stats()[QUALITY_TIER]["failed"] == 1
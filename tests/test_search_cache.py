@@ -0,0 +1,122 @@
+"""SearchCache stale-while-revalidate: fresh hits, stale serving, one background refresh, failures"""
+import asyncio
+import time
+
+import pytest
+
+from src.agent.search import SearchCache, SearchError
+from src.core.cache import MemoryCache
+
+TTL = 60
+STALE_TTL = 600
+QUERY = "Electric cars"
+
+
+class FakeSearch:
+    """Returns numbered results, or raises while failing; release gates each call"""
+
+    def __init__(self, gated=False):
+        self.calls = []
+        self.failing = False
+        self.release = asyncio.Event()
+        if not gated:
+            self.release.set()
+
+    async def __call__(self, query):
+        self.calls.append(query)
+        await self.release.wait()
+        if self.failing:
+            raise SearchError("Search API error: ratelimit")
+        return [{"title": f"result {len(self.calls)}", "link": f"https://example.com/{len(self.calls)}"}]
+
+
+def cached(age):
+    """A cache holding results for QUERY stored age seconds ago"""
+    cache = SearchCache(MemoryCache(), ttl=TTL, stale_ttl=STALE_TTL)
+    cache.backend.set("electric cars", [{"title": "cached"}], stored_at=time.time() - age)
+    return cache
+
+
+async def refreshed(cache):
+    """Wait for the background refreshes started so far"""
+    await asyncio.gather(*cache._refreshes)
+
+
+@pytest.mark.asyncio
+async def test_fresh_results_are_served_without_a_search():
+    cache = cached(age=TTL - 10)
+    search = FakeSearch()
+
+    assert await cache.get_or_fetch("electric  CARS", search) == [{"title": "cached"}]
+    assert not search.calls and cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_results_are_served_while_one_refresh_runs():
+    cache = cached(age=TTL + 10)
+    search = FakeSearch(gated=True)
+
+    # every stale read answers at once from the cache
+    results = [await cache.get_or_fetch(QUERY, search) for _ in range(3)]
+    assert results == [[{"title": "cached"}]] * 3
+
+    await asyncio.sleep(0)
+    assert search.calls == [QUERY]
+    search.release.set()
+    await refreshed(cache)
+
+    assert await cache.get_or_fetch(QUERY, search) == [{"title": "result 1", "link": "https://example.com/1"}]
+    assert len(search.calls) == 1
+    stats = cache.stats()
+    assert stats["stale_hits"] == 3 and stats["hits"] == 1 and stats["misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_the_stale_results():
+    cache = cached(age=TTL + 10)
+    search = FakeSearch()
+    search.failing = True
+
+    assert await cache.get_or_fetch(QUERY, search) == [{"title": "cached"}]
+    await refreshed(cache)
+    assert cache.stats()["refresh_errors"] == 1
+
+    # the entry is still stale, so the next read serves it and tries again
+    search.failing = False
+    assert await cache.get_or_fetch(QUERY, search) == [{"title": "cached"}]
+    await refreshed(cache)
+    assert len(search.calls) == 2
+    assert (await cache.get_or_fetch(QUERY, search))[0]["title"] == "result 2"
+
+
+@pytest.mark.asyncio
+async def test_expired_results_are_fetched_and_served_when_the_search_fails():
+    cache = cached(age=TTL + STALE_TTL + 10)
+    search = FakeSearch()
+    search.failing = True
+
+    # past the stale window the search runs inline, but a failure still falls back
+    assert await cache.get_or_fetch(QUERY, search) == [{"title": "cached"}]
+    assert cache.stats()["errors_served_stale"] == 1
+
+    search.failing = False
+    assert (await cache.get_or_fetch(QUERY, search))[0]["title"] == "result 2"
+    assert cache.stats()["misses"] == 2 and not cache._refreshes
+
+
+@pytest.mark.asyncio
+async def test_misses_without_cached_results_raise_and_empty_results_are_not_cached():
+    cache = SearchCache(MemoryCache(), ttl=TTL, stale_ttl=STALE_TTL)
+    search = FakeSearch()
+    search.failing = True
+
+    with pytest.raises(SearchError):
+        await cache.get_or_fetch(QUERY, search)
+
+    async def no_results(query):
+        search.calls.append(query)
+        return []
+
+    assert await cache.get_or_fetch(QUERY, no_results) == []
+    assert await cache.get_or_fetch(QUERY, no_results) == []
+    assert len(search.calls) == 3 and len(cache.backend) == 0
@@ -0,0 +1,25 @@
+"""Importing and building the web app must not load the heavy Tableau and Arrow libraries"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("tableauserverclient", "tableauhyperapi", "pyarrow")
+
+
+def loaded_modules(code: str) -> list:
+    """Heavy modules present in a fresh interpreter after running code"""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_import_app_does_not_load_heavy_modules():
+    assert loaded_modules("import src.web.app") == []
+
+
+def test_create_app_does_not_load_heavy_modules():
+    assert loaded_modules("from src.web.app import create_app\ncreate_app()") == []
@@ -0,0 +1,89 @@
+"""Chunked upload of a multi-GB Hyper file to a stub of Tableau's file upload endpoints"""
+import asyncio
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import tableauserverclient as TSC
+
+from benchmarks import stubs
+from src.pipeline.tableau_cloud import TableauCloudPublisher
+from src.pipeline.uploads import ChunkedUploader
+
+ROOT = Path(__file__).resolve().parents[1]
+SIZE = 2 * 1024 ** 3
+CHUNK_MB = 4
+
+
+def test_multi_gb_upload_arrives_whole_in_bounded_memory():
+    # a fresh interpreter, so the peak RSS is the upload's and not the test run's
+    probe = (
+        "import json\n"
+        "from benchmarks.bench_chunked_upload import run_upload\n"
+        f"print(json.dumps(run_upload({SIZE}, {CHUNK_MB}, fail_every=7)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    upload = json.loads(result.stdout.splitlines()[-1])
+
+    assert upload["received"] == SIZE
+    assert upload["chunks"] == SIZE // (CHUNK_MB * 1024 ** 2)
+    assert upload["chunk_retries"] > 0
+    assert upload["rss_growth_mb"] < 8 * CHUNK_MB
+
+
+def publish_large_file(tmp_path, stub, size, **publisher_options):
+    """Publish a sparse file of size bytes through TableauCloudPublisher.update_data"""
+    publisher = TableauCloudPublisher(
+        stub.url, "stub", "test", "test", "Top10 Rankings", upload_chunk_mb=1, **publisher_options
+    )
+    extract = tmp_path / "backfill.hyper"
+
+    async def create_temp_hyper_file(data, temp_dir):
+        with open(extract, "wb") as f:
+            f.truncate(size)
+        return extract
+
+    publisher._create_temp_hyper_file = create_temp_hyper_file
+    job_id = asyncio.run(publisher.update_data([], tmp_path))
+    return publisher, job_id, extract
+
+
+def test_upload_longer_than_the_call_timeout_starts_one_job(tmp_path):
+    chunks = 40
+    # 40 chunk requests at 25 ms each take about twice the 0.5 s call timeout
+    with stubs.StubTableau(latency=0.025) as stub:
+        publisher, job_id, extract = publish_large_file(tmp_path, stub, chunks * 1024 ** 2, timeout=0.5)
+        counts = stub.counts()
+
+    assert job_id
+    assert counts["PATCH /datasources/(?P<id>[^/]+)/data"] == 1
+    assert counts["POST /fileUploads"] == 1
+    assert counts["PUT /fileUploads/(?P<id>[^/]+)"] == chunks
+    assert publisher.uploader.chunks_uploaded == chunks
+    assert not extract.exists()
+
+
+def test_expired_session_renews_for_the_chunk_not_the_upload(tmp_path, monkeypatch):
+    chunks = 8
+    put_chunk = ChunkedUploader._put_chunk
+    calls = []
+
+    def expire_once(self, upload_id, chunk):
+        calls.append(upload_id)
+        if len(calls) == 5:
+            raise TSC.ServerResponseError("401002", "Unauthorized", "Session expired")
+        return put_chunk(self, upload_id, chunk)
+
+    monkeypatch.setattr(ChunkedUploader, "_put_chunk", expire_once)
+    with stubs.StubTableau(latency=0.0) as stub:
+        publish_large_file(tmp_path, stub, chunks * 1024 ** 2)
+        counts = stub.counts()
+
+    # one more sign-in and the fifth chunk sent again, in the same upload session
+    assert counts["POST /auth/signin"] == 2
+    assert counts["POST /fileUploads"] == 1
+    assert counts["PUT /fileUploads/(?P<id>[^/]+)"] == chunks
+    assert counts["PATCH /datasources/(?P<id>[^/]+)/data"] == 1